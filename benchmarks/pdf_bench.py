@@ -0,0 +1,274 @@
+"""PDF rendering benchmarks over synthetic POs.
+
+Renders each case with ``build_pdf`` and records median wall time, peak
+Python memory (tracemalloc) and output size as JSON. Pass ``--baseline`` to
+compare with an earlier results file; the exit code is 1 when any case is
+slower, hungrier or larger than the allowed ratios.
+
+    python benchmarks/pdf_bench.py --output bench.json
+    python benchmarks/pdf_bench.py --baseline bench.json --max-time-ratio 1.2
+    python benchmarks/pdf_bench.py --cases items_10,long_text --repeat 5
+
+Everything is generated locally; no network or database is needed.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+from typing import Callable
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from po_app.services.pdf import PDF_RENDERER_VERSION, build_pdf  # noqa: E402
+
+DENSITIES = ("compact", "normal", "comfortable")
+TABLE_THEMES = ("zebra", "solid")
+DEFAULT_THRESHOLDS = {"time": 1.25, "memory": 1.25, "size": 1.10}
+
+BASE_FIELDS = {
+    "formNo": "BENCH-0001",
+    "date": "2026-01-15",
+    "to": "Synthetic Supplier Ltd.",
+    "companyName": "Benchmark Manufacturing Co.",
+    "companyLine1": "Industrial Zone, Block 7",
+    "companyLine2": "Building 12",
+    "companyLine3": "Erbil",
+    "postalCode": "44001",
+    "formCreator": "Form Creator",
+    "productionManager": "Production Manager",
+    "manager": "General Manager",
+}
+
+Case = tuple[dict, list[dict], dict, dict]
+
+
+def synthetic_items(count: int, *, words: int = 6, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    vocabulary = (
+        "bolt nut washer bearing gasket flange valve seal hose clamp bracket "
+        "stainless galvanized hex socket m8 m10 m12 x40 x60 heavy duty spare"
+    ).split()
+    return [
+        {
+            "model": f"CAT-{index:05d}",
+            "item": " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, words))),
+            "qty": str(rng.randint(1, 500)),
+            "unit": rng.choice(("pcs", "box", "set", "m", "kg")),
+            "plan": f"PL-{rng.randint(1, 99):02d}",
+        }
+        for index in range(count)
+    ]
+
+
+def synthetic_image_data_url(width: int, height: int, *, seed: int = 1) -> str:
+    """A noisy RGBA PNG, which compresses badly like a real scan or canvas."""
+    from PIL import Image
+
+    rng = random.Random(seed)
+    image = Image.frombytes(
+        "RGBA",
+        (width, height),
+        rng.randbytes(width * height * 4),
+    )
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def build_cases() -> dict[str, Callable[[], Case]]:
+    def simple(items: list[dict], style: dict | None = None) -> Callable[[], Case]:
+        return lambda: (BASE_FIELDS, items, {}, dict(style or {}))
+
+    def long_text() -> Case:
+        paragraph = " ".join(["corrosion-resistant fastener assembly for outdoor use"] * 40)
+        unbroken = "X" * 1500
+        items = [
+            {"model": f"LONG-{index}", "item": paragraph if index % 2 else unbroken, "qty": "1"}
+            for index in range(40)
+        ]
+        return BASE_FIELDS, items, {}, {"showSignatures": True}
+
+    def large_images() -> Case:
+        signatures = {
+            key: synthetic_image_data_url(1200, 400, seed=index)
+            for index, key in enumerate(("formCreator", "productionManager", "manager"))
+        }
+        style = {"showSignatures": True, "logoDataUrl": synthetic_image_data_url(800, 400, seed=9)}
+        return BASE_FIELDS, synthetic_items(10), signatures, style
+
+    cases: dict[str, Callable[[], Case]] = {
+        "empty": simple([]),
+        "items_10": simple(synthetic_items(10)),
+        "items_500": simple(synthetic_items(500)),
+        "items_10k": simple(synthetic_items(10_000)),
+        "long_text": long_text,
+        "large_images": large_images,
+    }
+    style_items = synthetic_items(60, words=12)
+    for density in DENSITIES:
+        for theme in TABLE_THEMES:
+            cases[f"style_{density}_{theme}"] = simple(
+                style_items,
+                {"density": density, "tableTheme": theme, "showSignatures": True},
+            )
+    return cases
+
+
+def measure(case: Case, *, repeat: int) -> dict[str, object]:
+    fields, items, signatures, report_style = case
+    pdf_bytes = build_pdf(fields, items, signatures, report_style)  # warm caches
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build_pdf(fields, items, signatures, report_style)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        build_pdf(fields, items, signatures, report_style)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "items": len(items),
+        "seconds": round(statistics.median(timings), 6),
+        "seconds_min": round(min(timings), 6),
+        "peak_bytes": peak,
+        "output_bytes": len(pdf_bytes),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return result.stdout.strip()
+
+
+def run_benchmarks(names: list[str] | None = None, *, repeat: int = 3) -> dict[str, object]:
+    cases = build_cases()
+    unknown = sorted(set(names or []) - set(cases))
+    if unknown:
+        raise SystemExit(f"Unknown cases: {', '.join(unknown)} (choose from {', '.join(cases)})")
+    results: dict[str, object] = {}
+    for name in names or list(cases):
+        results[name] = measure(cases[name](), repeat=max(1, repeat))
+    return {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "renderer_version": PDF_RENDERER_VERSION,
+        "repeat": repeat,
+        "cases": results,
+    }
+
+
+def compare_results(
+    baseline: dict,
+    current: dict,
+    thresholds: dict[str, float] | None = None,
+) -> list[dict[str, object]]:
+    """Cases whose time, peak memory or output size grew past the ratio."""
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    metrics = {"time": "seconds", "memory": "peak_bytes", "size": "output_bytes"}
+    regressions: list[dict[str, object]] = []
+    for name, result in (current.get("cases") or {}).items():
+        before = (baseline.get("cases") or {}).get(name)
+        if not before:
+            continue
+        for metric, key in metrics.items():
+            old_value = float(before.get(key) or 0)
+            new_value = float(result.get(key) or 0)
+            if old_value <= 0:
+                continue
+            ratio = new_value / old_value
+            if ratio > thresholds[metric]:
+                regressions.append(
+                    {
+                        "case": name,
+                        "metric": metric,
+                        "baseline": before.get(key),
+                        "current": result.get(key),
+                        "ratio": round(ratio, 3),
+                        "limit": thresholds[metric],
+                    }
+                )
+    return regressions
+
+
+def _print_table(results: dict, baseline: dict | None) -> None:
+    print(f"{'case':<28} {'items':>6} {'ms':>10} {'peak KiB':>10} {'size KiB':>10} {'time vs base':>13}")
+    base_cases = (baseline or {}).get("cases") or {}
+    for name, result in results["cases"].items():
+        delta = ""
+        before = base_cases.get(name)
+        if before and before.get("seconds"):
+            delta = f"{result['seconds'] / before['seconds']:.2f}x"
+        print(
+            f"{name:<28} {result['items']:>6} {result['seconds'] * 1000:>10.1f} "
+            f"{result['peak_bytes'] / 1024:>10.0f} {result['output_bytes'] / 1024:>10.1f} {delta:>13}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark build_pdf on synthetic POs.")
+    parser.add_argument("--cases", default="", help="comma-separated case names (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed renders per case")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare against")
+    parser.add_argument("--max-time-ratio", type=float, default=DEFAULT_THRESHOLDS["time"])
+    parser.add_argument("--max-memory-ratio", type=float, default=DEFAULT_THRESHOLDS["memory"])
+    parser.add_argument("--max-size-ratio", type=float, default=DEFAULT_THRESHOLDS["size"])
+    parser.add_argument("--list", action="store_true", help="list case names and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(build_cases()))
+        return 0
+    names = [name.strip() for name in args.cases.split(",") if name.strip()] or None
+    results = run_benchmarks(names, repeat=args.repeat)
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+    _print_table(results, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if baseline is None:
+        return 0
+    regressions = compare_results(
+        baseline,
+        results,
+        {
+            "time": args.max_time_ratio,
+            "memory": args.max_memory_ratio,
+            "size": args.max_size_ratio,
+        },
+    )
+    for item in regressions:
+        print(
+            f"REGRESSION {item['case']} {item['metric']}: "
+            f"{item['baseline']} -> {item['current']} ({item['ratio']}x > {item['limit']}x)"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,52 @@
+"""Time build_pdf on growing item counts to check table layout stays linear.
+
+Usage: python benchmarks/table_scaling.py [--sizes 1000,2500,5000,10000]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from po_app.services.pdf import build_pdf  # noqa: E402
+
+
+def synthetic_items(count: int) -> list[dict]:
+    return [
+        {
+            "model": f"CAT-{index:05d}",
+            "item": f"Catalog line {index} stainless hex bolt with washer and nut" * (1 + index % 3),
+            "qty": str(1 + index % 50),
+            "unit": "pcs",
+            "plan": f"PL-{index % 97}",
+        }
+        for index in range(count)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,2500,5000,10000")
+    args = parser.parse_args()
+    sizes = [int(value) for value in args.sizes.split(",") if value.strip()]
+    fields = {"formNo": "BENCH-1", "date": "2026-01-01", "companyName": "Bench Co", "to": "Supplier"}
+
+    build_pdf(fields, synthetic_items(10))  # warm fonts and glyph widths
+    baseline = None
+    print(f"{'items':>8} {'seconds':>9} {'ms/item':>8} {'vs first':>9}")
+    for size in sizes:
+        items = synthetic_items(size)
+        started = time.perf_counter()
+        build_pdf(fields, items, {}, {"showSignatures": True})
+        elapsed = time.perf_counter() - started
+        per_item = elapsed / size * 1000
+        baseline = baseline or per_item
+        print(f"{size:>8} {elapsed:>9.3f} {per_item:>8.4f} {per_item / baseline:>8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,9 +3,10 @@ import os
 
 bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
 workers = int(os.getenv("GUNICORN_WORKERS", max(2, multiprocessing.cpu_count())))
-threads = int(os.getenv("GUNICORN_THREADS", "2"))
+# Each open /api/events stream holds a thread; keep headroom above
+# EVENT_STREAM_MAX_CLIENTS (default 8) for ordinary requests.
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
 timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
 graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
 keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
 worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
-
@@ -13,9 +13,15 @@ from .config import (
     SESSION_COOKIE_SECURE,
     TRUST_PROXY_HEADERS,
 )
-from .db import init_db
+from .db import (
+    commit_unit_of_work,
+    get_db_pragma_report,
+    init_db,
+    teardown_unit_of_work,
+)
 from .routes.api import bp as api_bp
 from .routes.main import bp as main_bp
+from .services.pdf import warm_image_cache, warm_pdf_template
 
 
 def create_app() -> Flask:
@@ -41,6 +47,35 @@ def create_app() -> Flask:
 
     app.register_blueprint(main_bp)
     app.register_blueprint(api_bp, url_prefix="/api")
+    app.after_request(commit_unit_of_work)
+    app.teardown_appcontext(teardown_unit_of_work)
 
-    init_db()
+    applied_migrations = init_db()
+    if applied_migrations:
+        app.logger.info("Applied schema migrations: %s", applied_migrations)
+    _log_db_pragma_report(app)
+    warm_image_cache()
+    warm_pdf_template()
     return app
+
+
+def _log_db_pragma_report(app: Flask) -> None:
+    try:
+        report = get_db_pragma_report()
+    except Exception as exc:
+        app.logger.warning("Could not read SQLite pragma report: %s", exc)
+        return
+    app.config["DB_PRAGMA_REPORT"] = report
+    if report.get("backend") != "sqlite":
+        return
+    rows = report.get("pragmas") or []
+    summary = ", ".join(f"{row['pragma']}={row['effective']}" for row in rows)
+    app.logger.info("SQLite profile '%s': %s", report.get("profile"), summary or "driver defaults")
+    for row in rows:
+        if not row["applied"]:
+            app.logger.warning(
+                "SQLite pragma %s requested %s but is %s",
+                row["pragma"],
+                row["requested"],
+                row["effective"],
+            )
@@ -51,6 +51,42 @@ class AppSettings:
     trust_proxy_headers: bool
     auth_disabled: bool
     auth_code_only: bool
+    db_pool_enabled: bool
+    db_pool_min_size: int
+    db_pool_max_size: int
+    db_pool_timeout_seconds: int
+    db_pool_max_lifetime_seconds: int
+    db_pool_health_check_seconds: int
+    sqlite_profile: str
+    sqlite_busy_timeout_ms: int
+    event_stream_enabled: bool
+    event_stream_max_clients: int
+    pdf_cache_enabled: bool
+    pdf_cache_dir: Path
+    pdf_cache_max_mb: int
+    image_cache_max_mb: int
+    report_style_cache_size: int
+    pdf_image_dpi: int
+    pdf_image_jpeg_quality: int
+    pdf_template_mode: str
+    pdf_spool_max_mb: int
+    pdf_sendfile: str
+    pdf_accel_redirect_prefix: str
+    pdf_pool_enabled: bool
+    pdf_pool_workers: int
+    pdf_pool_max_queue: int
+    pdf_pool_job_timeout_seconds: int
+    pdf_pool_recycle_after: int
+    export_job_dir: Path
+    export_job_ttl_seconds: int
+    export_job_workers: int
+    export_job_cleanup_interval_seconds: int
+    thumbnail_dir: Path
+    thumbnail_cache_max_mb: int
+    thumbnail_width: int
+    thumbnail_warm_interval_seconds: int
+    thumbnail_warm_limit: int
+    blob_prune_grace_hours: int
 
 
 def load_settings() -> AppSettings:
@@ -71,6 +107,15 @@ def load_settings() -> AppSettings:
     same_site = os.getenv("SESSION_COOKIE_SAMESITE", "Lax").strip().title() or "Lax"
     if same_site not in {"Lax", "Strict", "None"}:
         same_site = "Lax"
+    sqlite_profile = os.getenv("SQLITE_PROFILE", "performance").strip().lower() or "performance"
+    if sqlite_profile not in {"performance", "durable", "off"}:
+        sqlite_profile = "performance"
+    pdf_template_mode = os.getenv("PDF_TEMPLATE_MODE", "off").strip().lower()
+    if pdf_template_mode not in {"off", "overlay"}:
+        pdf_template_mode = "off"
+    pdf_sendfile = os.getenv("PDF_SENDFILE", "").strip().lower()
+    if pdf_sendfile not in {"", "x-sendfile", "x-accel-redirect"}:
+        pdf_sendfile = ""
 
     return AppSettings(
         base_dir=base_dir,
@@ -111,6 +156,56 @@ def load_settings() -> AppSettings:
         trust_proxy_headers=_env_bool("TRUST_PROXY_HEADERS", is_production),
         auth_disabled=_env_bool("AUTH_DISABLED", False),
         auth_code_only=_env_bool("AUTH_CODE_ONLY", False),
+        db_pool_enabled=_env_bool("DB_POOL_ENABLED", True),
+        db_pool_min_size=_env_int("DB_POOL_MIN_SIZE", 1, minimum=0),
+        db_pool_max_size=_env_int("DB_POOL_MAX_SIZE", 10, minimum=1),
+        db_pool_timeout_seconds=_env_int("DB_POOL_TIMEOUT_SECONDS", 30, minimum=1),
+        db_pool_max_lifetime_seconds=_env_int(
+            "DB_POOL_MAX_LIFETIME_SECONDS",
+            1800,
+            minimum=0,
+        ),
+        db_pool_health_check_seconds=_env_int(
+            "DB_POOL_HEALTH_CHECK_SECONDS",
+            30,
+            minimum=0,
+        ),
+        sqlite_profile=sqlite_profile,
+        sqlite_busy_timeout_ms=_env_int("SQLITE_BUSY_TIMEOUT_MS", 5000, minimum=0),
+        event_stream_enabled=_env_bool("EVENT_STREAM_ENABLED", True),
+        event_stream_max_clients=_env_int("EVENT_STREAM_MAX_CLIENTS", 8, minimum=0),
+        pdf_cache_enabled=_env_bool("PDF_CACHE_ENABLED", True),
+        pdf_cache_dir=base_dir / (os.getenv("PDF_CACHE_DIR", "").strip() or "cache/pdf"),
+        pdf_cache_max_mb=_env_int("PDF_CACHE_MAX_MB", 256, minimum=1),
+        image_cache_max_mb=_env_int("IMAGE_CACHE_MAX_MB", 64, minimum=0),
+        report_style_cache_size=_env_int("REPORT_STYLE_CACHE_SIZE", 64, minimum=0),
+        pdf_image_dpi=_env_int("PDF_IMAGE_DPI", 200, minimum=0),
+        pdf_image_jpeg_quality=min(95, _env_int("PDF_IMAGE_JPEG_QUALITY", 85, minimum=30)),
+        pdf_template_mode=pdf_template_mode,
+        pdf_spool_max_mb=_env_int("PDF_SPOOL_MAX_MB", 8, minimum=0),
+        pdf_sendfile=pdf_sendfile,
+        pdf_accel_redirect_prefix=(
+            os.getenv("PDF_ACCEL_REDIRECT_PREFIX", "").strip() or "/_pdf_cache/"
+        ),
+        pdf_pool_enabled=_env_bool("PDF_POOL_ENABLED", True),
+        pdf_pool_workers=_env_int("PDF_POOL_WORKERS", min(4, os.cpu_count() or 1), minimum=1),
+        pdf_pool_max_queue=_env_int("PDF_POOL_MAX_QUEUE", 16, minimum=0),
+        pdf_pool_job_timeout_seconds=_env_int("PDF_POOL_JOB_TIMEOUT_SECONDS", 60, minimum=1),
+        pdf_pool_recycle_after=_env_int("PDF_POOL_RECYCLE_AFTER", 200, minimum=0),
+        export_job_dir=base_dir / (os.getenv("EXPORT_JOB_DIR", "").strip() or "cache/exports"),
+        export_job_ttl_seconds=_env_int("EXPORT_JOB_TTL_SECONDS", 3600, minimum=60),
+        export_job_workers=_env_int("EXPORT_JOB_WORKERS", 2, minimum=1),
+        export_job_cleanup_interval_seconds=_env_int(
+            "EXPORT_JOB_CLEANUP_INTERVAL_SECONDS",
+            300,
+            minimum=0,
+        ),
+        thumbnail_dir=base_dir / (os.getenv("THUMBNAIL_DIR", "").strip() or "cache/thumbnails"),
+        thumbnail_cache_max_mb=_env_int("THUMBNAIL_CACHE_MAX_MB", 64, minimum=1),
+        thumbnail_width=min(1200, _env_int("THUMBNAIL_WIDTH", 240, minimum=32)),
+        thumbnail_warm_interval_seconds=_env_int("THUMBNAIL_WARM_INTERVAL_SECONDS", 300, minimum=0),
+        thumbnail_warm_limit=_env_int("THUMBNAIL_WARM_LIMIT", 50, minimum=0),
+        blob_prune_grace_hours=_env_int("BLOB_PRUNE_GRACE_HOURS", 24, minimum=0),
     )
 
 
@@ -143,3 +238,39 @@ SESSION_COOKIE_SAMESITE = settings.session_cookie_samesite
 TRUST_PROXY_HEADERS = settings.trust_proxy_headers
 AUTH_DISABLED = settings.auth_disabled
 AUTH_CODE_ONLY = settings.auth_code_only
+DB_POOL_ENABLED = settings.db_pool_enabled
+DB_POOL_MIN_SIZE = settings.db_pool_min_size
+DB_POOL_MAX_SIZE = settings.db_pool_max_size
+DB_POOL_TIMEOUT_SECONDS = settings.db_pool_timeout_seconds
+DB_POOL_MAX_LIFETIME_SECONDS = settings.db_pool_max_lifetime_seconds
+DB_POOL_HEALTH_CHECK_SECONDS = settings.db_pool_health_check_seconds
+SQLITE_PROFILE = settings.sqlite_profile
+SQLITE_BUSY_TIMEOUT_MS = settings.sqlite_busy_timeout_ms
+EVENT_STREAM_ENABLED = settings.event_stream_enabled
+EVENT_STREAM_MAX_CLIENTS = settings.event_stream_max_clients
+PDF_CACHE_ENABLED = settings.pdf_cache_enabled
+PDF_CACHE_DIR = settings.pdf_cache_dir
+PDF_CACHE_MAX_MB = settings.pdf_cache_max_mb
+IMAGE_CACHE_MAX_MB = settings.image_cache_max_mb
+REPORT_STYLE_CACHE_SIZE = settings.report_style_cache_size
+PDF_IMAGE_DPI = settings.pdf_image_dpi
+PDF_IMAGE_JPEG_QUALITY = settings.pdf_image_jpeg_quality
+PDF_TEMPLATE_MODE = settings.pdf_template_mode
+PDF_SPOOL_MAX_MB = settings.pdf_spool_max_mb
+PDF_SENDFILE = settings.pdf_sendfile
+PDF_ACCEL_REDIRECT_PREFIX = settings.pdf_accel_redirect_prefix
+PDF_POOL_ENABLED = settings.pdf_pool_enabled
+PDF_POOL_WORKERS = settings.pdf_pool_workers
+PDF_POOL_MAX_QUEUE = settings.pdf_pool_max_queue
+PDF_POOL_JOB_TIMEOUT_SECONDS = settings.pdf_pool_job_timeout_seconds
+PDF_POOL_RECYCLE_AFTER = settings.pdf_pool_recycle_after
+EXPORT_JOB_DIR = settings.export_job_dir
+EXPORT_JOB_TTL_SECONDS = settings.export_job_ttl_seconds
+EXPORT_JOB_WORKERS = settings.export_job_workers
+EXPORT_JOB_CLEANUP_INTERVAL_SECONDS = settings.export_job_cleanup_interval_seconds
+THUMBNAIL_DIR = settings.thumbnail_dir
+THUMBNAIL_CACHE_MAX_MB = settings.thumbnail_cache_max_mb
+THUMBNAIL_WIDTH = settings.thumbnail_width
+THUMBNAIL_WARM_INTERVAL_SECONDS = settings.thumbnail_warm_interval_seconds
+THUMBNAIL_WARM_LIMIT = settings.thumbnail_warm_limit
+BLOB_PRUNE_GRACE_HOURS = settings.blob_prune_grace_hours
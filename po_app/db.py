@@ -1,9 +1,27 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+import time
+from collections import deque
 from datetime import datetime, timezone
 
-from .config import DB_PATH, DB_URL, USE_POSTGRES
+from flask import current_app, g, has_app_context, jsonify
+
+from .config import (
+    DB_PATH,
+    DB_POOL_ENABLED,
+    DB_POOL_HEALTH_CHECK_SECONDS,
+    DB_POOL_MAX_LIFETIME_SECONDS,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_URL,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_PROFILE,
+    USE_POSTGRES,
+)
+from .migrations import MigrationRunner, epoch_us
 
 try:
     import psycopg2
@@ -19,12 +37,532 @@ except Exception:
     psycopg = None
     dict_row = None
 
+_DRIVER_ERRORS: tuple[type[BaseException], ...] = tuple(
+    error
+    for error in (
+        sqlite3.Error,
+        getattr(psycopg2, "Error", None),
+        getattr(psycopg, "Error", None),
+    )
+    if error is not None
+)
+
+SQLITE_PRAGMA_PROFILES: dict[str, tuple[tuple[str, object], ...]] = {
+    "off": (),
+    "performance": (
+        ("journal_mode", "WAL"),
+        ("busy_timeout", 5000),
+        ("synchronous", "NORMAL"),
+        ("cache_size", -16000),
+        ("mmap_size", 268435456),
+        ("temp_store", "MEMORY"),
+        ("foreign_keys", "ON"),
+    ),
+    "durable": (
+        ("journal_mode", "WAL"),
+        ("busy_timeout", 5000),
+        ("synchronous", "FULL"),
+        ("cache_size", -8000),
+        ("mmap_size", 0),
+        ("temp_store", "DEFAULT"),
+        ("foreign_keys", "ON"),
+    ),
+}
+
+# SQLite reports these pragmas as integers; map them back to the names used
+# in the profiles so the startup report compares like with like.
+_SQLITE_PRAGMA_NAMES: dict[str, dict[int, str]] = {
+    "synchronous": {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"},
+    "temp_store": {0: "DEFAULT", 1: "FILE", 2: "MEMORY"},
+    "foreign_keys": {0: "OFF", 1: "ON"},
+}
+
+
+class PoolTimeoutError(RuntimeError):
+    pass
+
+
+class _PooledConnection:
+    __slots__ = ("conn", "created_at", "last_used", "generation", "in_use", "pooled")
+
+    def __init__(self, conn, *, generation: int = 0, pooled: bool = True):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+        self.generation = generation
+        self.in_use = False
+        self.pooled = pooled
+
+
+class ConnectionLease:
+    """A checked-out connection; ``close()`` hands it back to its pool.
+
+    Attribute access is forwarded to the underlying driver connection, and
+    ``with lease:`` commits or rolls back without closing (psycopg2 semantics
+    for both drivers).
+    """
+
+    def __init__(self, pool, entry: _PooledConnection):
+        self._pool = pool
+        self._entry = entry
+
+    @property
+    def raw(self):
+        if self._entry is None:
+            raise RuntimeError("Connection lease was already released")
+        return self._entry.conn
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.raw.commit()
+        else:
+            self.raw.rollback()
+        return False
+
+    def close(self) -> None:
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool.release(entry)
+
+
+def _close_quietly(conn) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _connection_is_closed(conn) -> bool:
+    # psycopg2 exposes an int, psycopg 3 a bool; sqlite3 has no flag.
+    return bool(getattr(conn, "closed", False))
+
+
+class _ConnectionPoolBase:
+    """Shared counters and lifecycle checks for connection sources.
+
+    Pools that enable health checks define ``_ping(conn)`` for their driver.
+    """
+
+    def __init__(
+        self,
+        connect,
+        *,
+        max_lifetime_seconds: int = 0,
+        health_check_seconds: int = 0,
+    ):
+        self._connect = connect
+        self._max_lifetime = max(0, int(max_lifetime_seconds))
+        self._health_check = max(0, int(health_check_seconds))
+        self._stats_lock = threading.Lock()
+        self._counters = {
+            "created": 0,
+            "recycled": 0,
+            "discarded": 0,
+            "acquired": 0,
+            "health_checks": 0,
+            "health_check_failures": 0,
+        }
+
+    def _bump(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def _open(self, *, generation: int = 0, pooled: bool = True) -> _PooledConnection:
+        conn = self._connect()
+        self._bump("created")
+        return _PooledConnection(conn, generation=generation, pooled=pooled)
+
+    def _expired(self, entry: _PooledConnection, now: float) -> bool:
+        return bool(self._max_lifetime) and (now - entry.created_at) >= self._max_lifetime
+
+    @staticmethod
+    def _reset(conn) -> None:
+        conn.rollback()
+
+    def _healthy(self, entry: _PooledConnection, now: float) -> bool:
+        if _connection_is_closed(entry.conn):
+            return False
+        if not self._health_check or (now - entry.last_used) < self._health_check:
+            return True
+        self._bump("health_checks")
+        try:
+            self._ping(entry.conn)
+        except Exception:
+            self._bump("health_check_failures")
+            return False
+        return True
+
+    def _reusable_after_release(self, entry: _PooledConnection) -> bool:
+        try:
+            self._reset(entry.conn)
+        except Exception:
+            return False
+        return not _connection_is_closed(entry.conn)
+
+    def _counter_snapshot(self) -> dict[str, int]:
+        with self._stats_lock:
+            return dict(self._counters)
+
+
+class PostgresConnectionPool(_ConnectionPoolBase):
+    """Thread-safe bounded pool of reusable PostgreSQL connections."""
+
+    def __init__(
+        self,
+        connect,
+        *,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout_seconds: int = 30,
+        max_lifetime_seconds: int = 0,
+        health_check_seconds: int = 0,
+    ):
+        super().__init__(
+            connect,
+            max_lifetime_seconds=max_lifetime_seconds,
+            health_check_seconds=health_check_seconds,
+        )
+        self._max_size = max(1, int(max_size))
+        self._min_size = max(0, min(int(min_size), self._max_size))
+        self._timeout = max(1, int(timeout_seconds))
+        self._cond = threading.Condition()
+        self._idle: deque[_PooledConnection] = deque()
+        self._size = 0
+        self._waits = 0
+        self._timeouts = 0
+
+    @staticmethod
+    def _ping(conn) -> None:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+            cur.fetchone()
+        conn.rollback()
+
+    def _fill_min_size(self) -> None:
+        while True:
+            with self._cond:
+                if self._size >= self._min_size:
+                    return
+                self._size += 1
+            try:
+                entry = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                return
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def acquire(self) -> ConnectionLease:
+        if self._size < self._min_size:
+            self._fill_min_size()
+        deadline = time.monotonic() + self._timeout
+        entry = None
+        reserved = False
+        with self._cond:
+            waited = False
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    candidate = self._idle.pop()
+                    if self._expired(candidate, now):
+                        self._size -= 1
+                        self._bump("recycled")
+                        _close_quietly(candidate.conn)
+                        continue
+                    entry = candidate
+                    break
+                if entry is not None:
+                    break
+                if self._size < self._max_size:
+                    self._size += 1
+                    reserved = True
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self._timeout}s waiting for a database connection"
+                    )
+                if not waited:
+                    self._waits += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+        if entry is not None and not self._healthy(entry, time.monotonic()):
+            self._bump("discarded")
+            _close_quietly(entry.conn)
+            entry = None
+            reserved = True
+        if reserved:
+            try:
+                entry = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+        entry.in_use = True
+        self._bump("acquired")
+        return ConnectionLease(self, entry)
+
+    def release(self, entry: _PooledConnection) -> None:
+        entry.in_use = False
+        reusable = self._reusable_after_release(entry)
+        now = time.monotonic()
+        if reusable and self._expired(entry, now):
+            self._bump("recycled")
+            reusable = False
+        elif not reusable:
+            self._bump("discarded")
+        with self._cond:
+            if reusable:
+                entry.last_used = now
+                self._idle.append(entry)
+            else:
+                self._size -= 1
+            self._cond.notify()
+        if not reusable:
+            _close_quietly(entry.conn)
+
+    def close_all(self) -> None:
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            _close_quietly(entry.conn)
+
+    def stats(self) -> dict[str, object]:
+        with self._cond:
+            size = self._size
+            idle = len(self._idle)
+            waits = self._waits
+            timeouts = self._timeouts
+        return {
+            "backend": "postgres",
+            "pooled": True,
+            "min_size": self._min_size,
+            "max_size": self._max_size,
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "waits": waits,
+            "timeouts": timeouts,
+            **self._counter_snapshot(),
+        }
+
+
+class SQLiteThreadConnectionPool(_ConnectionPoolBase):
+    """Keeps one reusable SQLite connection per thread.
+
+    sqlite3 connections are bound to the thread that opened them, so reuse is
+    per thread rather than shared.  Nested checkouts on the same thread get a
+    short-lived extra connection.
+    """
+
+    def __init__(self, connect, *, max_lifetime_seconds: int = 0, health_check_seconds: int = 0):
+        super().__init__(
+            connect,
+            max_lifetime_seconds=max_lifetime_seconds,
+            health_check_seconds=health_check_seconds,
+        )
+        self._local = threading.local()
+        self._generation = 0
+        self._open_count = 0
+        self._in_use = 0
+
+    @staticmethod
+    def _ping(conn) -> None:
+        conn.execute("SELECT 1").fetchone()
+
+    def _discard_thread_entry(self, entry: _PooledConnection) -> None:
+        self._local.entry = None
+        with self._stats_lock:
+            self._open_count -= 1
+        _close_quietly(entry.conn)
+
+    def acquire(self) -> ConnectionLease:
+        entry = getattr(self._local, "entry", None)
+        now = time.monotonic()
+        if entry is not None and entry.in_use:
+            overflow = self._open(pooled=False)
+            overflow.in_use = True
+            with self._stats_lock:
+                self._in_use += 1
+            self._bump("acquired")
+            return ConnectionLease(self, overflow)
+        if entry is not None:
+            if entry.generation != self._generation or self._expired(entry, now):
+                self._bump("recycled")
+                self._discard_thread_entry(entry)
+                entry = None
+            elif not self._healthy(entry, now):
+                self._bump("discarded")
+                self._discard_thread_entry(entry)
+                entry = None
+        if entry is None:
+            entry = self._open(generation=self._generation)
+            self._local.entry = entry
+            with self._stats_lock:
+                self._open_count += 1
+        entry.in_use = True
+        with self._stats_lock:
+            self._in_use += 1
+        self._bump("acquired")
+        return ConnectionLease(self, entry)
+
+    def release(self, entry: _PooledConnection) -> None:
+        entry.in_use = False
+        with self._stats_lock:
+            self._in_use -= 1
+        if not entry.pooled:
+            _close_quietly(entry.conn)
+            return
+        if getattr(self._local, "entry", None) is not entry:
+            _close_quietly(entry.conn)
+            return
+        if not self._reusable_after_release(entry):
+            self._bump("discarded")
+            self._discard_thread_entry(entry)
+            return
+        entry.last_used = time.monotonic()
+
+    def close_all(self) -> None:
+        # Connections belong to their threads; bumping the generation makes
+        # each thread reopen on its next checkout.
+        with self._stats_lock:
+            self._generation += 1
+
+    def stats(self) -> dict[str, object]:
+        counters = self._counter_snapshot()
+        with self._stats_lock:
+            size = self._open_count
+            in_use = self._in_use
+        return {
+            "backend": "sqlite",
+            "pooled": True,
+            "size": size,
+            "idle": max(0, size - in_use),
+            "in_use": in_use,
+            **counters,
+        }
+
+
+class _UnpooledConnectionSource(_ConnectionPoolBase):
+    def __init__(self, connect, *, backend: str):
+        super().__init__(connect)
+        self._backend = backend
+
+    def acquire(self) -> ConnectionLease:
+        entry = self._open(pooled=False)
+        entry.in_use = True
+        self._bump("acquired")
+        return ConnectionLease(self, entry)
+
+    def release(self, entry: _PooledConnection) -> None:
+        entry.in_use = False
+        _close_quietly(entry.conn)
+
+    def close_all(self) -> None:
+        return None
+
+    def stats(self) -> dict[str, object]:
+        return {"backend": self._backend, "pooled": False, **self._counter_snapshot()}
+
 
 class DatabaseManager:
-    def __init__(self, *, db_url: str, db_path, use_postgres: bool):
+    def __init__(
+        self,
+        *,
+        db_url: str,
+        db_path,
+        use_postgres: bool,
+        pool_enabled: bool = False,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_timeout_seconds: int = 30,
+        pool_max_lifetime_seconds: int = 0,
+        pool_health_check_seconds: int = 0,
+        sqlite_profile: str = "off",
+        sqlite_busy_timeout_ms: int | None = None,
+    ):
+        self._pool = None
+        self._pool_lock = threading.Lock()
         self.db_url = db_url
         self.db_path = db_path
         self.use_postgres = use_postgres
+        self.pool_enabled = pool_enabled
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_timeout_seconds = pool_timeout_seconds
+        self.pool_max_lifetime_seconds = pool_max_lifetime_seconds
+        self.pool_health_check_seconds = pool_health_check_seconds
+        self.sqlite_profile = sqlite_profile
+        self.sqlite_busy_timeout_ms = sqlite_busy_timeout_ms
+
+    def __setattr__(self, name, value):
+        # Re-pointing the manager (tests, backup restore) must not hand out
+        # connections opened against the previous target.
+        if name in {"db_url", "db_path", "use_postgres", "pool_enabled", "sqlite_profile"}:
+            self.dispose_pool()
+        super().__setattr__(name, value)
+
+    def _build_pool(self):
+        if not self.pool_enabled:
+            return _UnpooledConnectionSource(
+                self.connect,
+                backend="postgres" if self.use_postgres else "sqlite",
+            )
+        if self.use_postgres:
+            return PostgresConnectionPool(
+                self.connect,
+                min_size=self.pool_min_size,
+                max_size=self.pool_max_size,
+                timeout_seconds=self.pool_timeout_seconds,
+                max_lifetime_seconds=self.pool_max_lifetime_seconds,
+                health_check_seconds=self.pool_health_check_seconds,
+            )
+        return SQLiteThreadConnectionPool(
+            self.connect,
+            max_lifetime_seconds=self.pool_max_lifetime_seconds,
+            health_check_seconds=self.pool_health_check_seconds,
+        )
+
+    @property
+    def pool(self):
+        pool = self._pool
+        if pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = self._build_pool()
+                pool = self._pool
+        return pool
+
+    def dispose_pool(self) -> None:
+        lock = self.__dict__.get("_pool_lock")
+        if lock is None:
+            return
+        with lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close_all()
+
+    def lease(self) -> ConnectionLease:
+        return self.pool.acquire()
+
+    def pool_stats(self) -> dict[str, object]:
+        return self.pool.stats()
 
     def connect(self):
         if self.use_postgres:
@@ -37,374 +575,270 @@ class DatabaseManager:
             )
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
+        self._apply_sqlite_pragmas(conn)
         return conn
 
-    def init_db(self) -> None:
+    def sqlite_pragmas(self) -> list[tuple[str, object]]:
+        pragmas = list(SQLITE_PRAGMA_PROFILES.get(self.sqlite_profile, ()))
+        if self.sqlite_busy_timeout_ms is not None:
+            pragmas = [
+                (name, self.sqlite_busy_timeout_ms if name == "busy_timeout" else value)
+                for name, value in pragmas
+            ]
+        return pragmas
+
+    def _apply_sqlite_pragmas(self, conn) -> None:
+        for name, value in self.sqlite_pragmas():
+            try:
+                conn.execute(f"PRAGMA {name} = {value}").fetchall()
+            except sqlite3.Error:
+                # A pragma the build or filesystem rejects (e.g. WAL on a
+                # network share) must not make the database unusable; the
+                # startup report shows what actually took effect.
+                continue
+
+    def sqlite_pragma_report(self) -> dict[str, object]:
+        if self.use_postgres:
+            return {"backend": "postgres", "profile": None, "pragmas": []}
         conn = self.connect()
         try:
-            if self.use_postgres:
-                self._init_postgres(conn)
-            else:
-                self._init_sqlite(conn)
+            rows = []
+            for name, requested in self.sqlite_pragmas():
+                try:
+                    row = conn.execute(f"PRAGMA {name}").fetchone()
+                    effective = row[0] if row else None
+                except sqlite3.Error:
+                    effective = None
+                if isinstance(effective, int) and name in _SQLITE_PRAGMA_NAMES:
+                    effective = _SQLITE_PRAGMA_NAMES[name].get(effective, effective)
+                applied = str(effective).strip().lower() == str(requested).strip().lower()
+                rows.append(
+                    {
+                        "pragma": name,
+                        "requested": requested,
+                        "effective": effective,
+                        "applied": applied,
+                    }
+                )
         finally:
             conn.close()
+        return {"backend": "sqlite", "profile": self.sqlite_profile, "pragmas": rows}
 
-    def _init_postgres(self, conn):
-        with conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS purchase_orders (
-                        id SERIAL PRIMARY KEY,
-                        created_at TIMESTAMPTZ NOT NULL,
-                        updated_at TIMESTAMPTZ NOT NULL,
-                        form_no TEXT,
-                        po_date TEXT,
-                        to_name TEXT,
-                        company_name TEXT,
-                        items_count INTEGER DEFAULT 0,
-                        payload TEXT NOT NULL,
-                        UNIQUE (form_no)
-                    )
-                    """
-                )
-                cur.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS deleted_purchase_orders (
-                        id SERIAL PRIMARY KEY,
-                        original_po_id INTEGER,
-                        deleted_at TIMESTAMPTZ NOT NULL,
-                        created_at TIMESTAMPTZ,
-                        updated_at TIMESTAMPTZ,
-                        form_no TEXT,
-                        po_date TEXT,
-                        to_name TEXT,
-                        company_name TEXT,
-                        items_count INTEGER DEFAULT 0,
-                        payload TEXT NOT NULL
-                    )
-                    """
-                )
-                cur.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS passkey_credentials (
-                        id SERIAL PRIMARY KEY,
-                        username TEXT NOT NULL,
-                        user_handle TEXT NOT NULL,
-                        credential_id TEXT NOT NULL UNIQUE,
-                        public_key TEXT NOT NULL,
-                        sign_count BIGINT NOT NULL DEFAULT 0,
-                        is_approval_device BOOLEAN NOT NULL DEFAULT FALSE,
-                        created_at TIMESTAMPTZ NOT NULL,
-                        updated_at TIMESTAMPTZ NOT NULL
-                    )
-                    """
-                )
-                cur.execute(
-                    """
-                    ALTER TABLE passkey_credentials
-                    ADD COLUMN IF NOT EXISTS is_approval_device BOOLEAN NOT NULL DEFAULT FALSE
-                    """
-                )
-                cur.execute(
-                    """
-                    UPDATE passkey_credentials
-                    SET is_approval_device = TRUE
-                    WHERE id = (
-                        SELECT id
-                        FROM passkey_credentials
-                        ORDER BY created_at ASC NULLS LAST, id ASC
-                        LIMIT 1
-                    )
-                      AND NOT EXISTS (
-                          SELECT 1
-                          FROM passkey_credentials
-                          WHERE is_approval_device = TRUE
-                      )
-                    """
-                )
-                cur.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS active_auth_sessions (
-                        session_id TEXT PRIMARY KEY,
-                        username TEXT NOT NULL,
-                        can_manage_login_requests BOOLEAN NOT NULL DEFAULT FALSE,
-                        last_seen TIMESTAMPTZ NOT NULL
-                    )
-                    """
-                )
-                cur.execute(
-                    """
-                    ALTER TABLE active_auth_sessions
-                    ADD COLUMN IF NOT EXISTS can_manage_login_requests BOOLEAN NOT NULL DEFAULT FALSE
-                    """
-                )
-                cur.execute(
-                    """
-                    WITH chosen AS (
-                        SELECT session_id
-                        FROM active_auth_sessions
-                        WHERE can_manage_login_requests = TRUE
-                        ORDER BY last_seen DESC, session_id ASC
-                        LIMIT 1
-                    )
-                    UPDATE active_auth_sessions
-                    SET can_manage_login_requests = CASE
-                        WHEN session_id = (SELECT session_id FROM chosen) THEN TRUE
-                        ELSE FALSE
-                    END
-                    WHERE can_manage_login_requests = TRUE
-                    """
-                )
-                cur.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS login_approval_requests (
-                        id TEXT PRIMARY KEY,
-                        username TEXT NOT NULL,
-                        credential_id TEXT NOT NULL,
-                        requester_session_id TEXT NOT NULL,
-                        ip TEXT,
-                        user_agent TEXT,
-                        created_at TIMESTAMPTZ NOT NULL,
-                        expires_at TIMESTAMPTZ NOT NULL,
-                        status TEXT NOT NULL,
-                        decision_by TEXT,
-                        decision_at TIMESTAMPTZ,
-                        reason TEXT
-                    )
-                    """
-                )
-                self._create_postgres_indexes(cur)
-
-    def _create_postgres_indexes(self, cur):
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_purchase_orders_updated_at
-            ON purchase_orders (updated_at DESC)
-            """
-        )
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_deleted_purchase_orders_deleted_at
-            ON deleted_purchase_orders (deleted_at DESC)
-            """
-        )
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_active_auth_sessions_last_seen
-            ON active_auth_sessions (last_seen DESC)
-            """
-        )
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_active_auth_sessions_manage_last_seen
-            ON active_auth_sessions (can_manage_login_requests, last_seen DESC)
-            """
-        )
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_login_approval_requests_status_created
-            ON login_approval_requests (status, created_at DESC)
-            """
-        )
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_login_approval_requests_expires_at
-            ON login_approval_requests (expires_at)
-            """
-        )
+    def migration_runner(self) -> MigrationRunner:
+        return MigrationRunner(connect=self.connect, use_postgres=self.use_postgres)
 
-    def _init_sqlite(self, conn):
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS purchase_orders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                form_no TEXT,
-                po_date TEXT,
-                to_name TEXT,
-                company_name TEXT,
-                items_count INTEGER DEFAULT 0,
-                payload TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS deleted_purchase_orders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                original_po_id INTEGER,
-                deleted_at TEXT NOT NULL,
-                created_at TEXT,
-                updated_at TEXT,
-                form_no TEXT,
-                po_date TEXT,
-                to_name TEXT,
-                company_name TEXT,
-                items_count INTEGER DEFAULT 0,
-                payload TEXT NOT NULL
-            )
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS passkey_credentials (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL,
-                user_handle TEXT NOT NULL,
-                credential_id TEXT NOT NULL UNIQUE,
-                public_key TEXT NOT NULL,
-                sign_count INTEGER NOT NULL DEFAULT 0,
-                is_approval_device INTEGER NOT NULL DEFAULT 0,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-            """
-        )
-        columns = {
-            str(row[1]).strip().lower()
-            for row in conn.execute("PRAGMA table_info(passkey_credentials)").fetchall()
-        }
-        if "is_approval_device" not in columns:
-            conn.execute(
-                """
-                ALTER TABLE passkey_credentials
-                ADD COLUMN is_approval_device INTEGER NOT NULL DEFAULT 0
-                """
-            )
-        has_approval = conn.execute(
-            """
-            SELECT 1
-            FROM passkey_credentials
-            WHERE is_approval_device = 1
-            LIMIT 1
-            """
-        ).fetchone()
-        if not has_approval:
-            conn.execute(
-                """
-                UPDATE passkey_credentials
-                SET is_approval_device = 1
-                WHERE id = (
-                    SELECT id
-                    FROM passkey_credentials
-                    ORDER BY datetime(created_at) ASC, id ASC
-                    LIMIT 1
-                )
-                """
-            )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS active_auth_sessions (
-                session_id TEXT PRIMARY KEY,
-                username TEXT NOT NULL,
-                can_manage_login_requests INTEGER NOT NULL DEFAULT 0,
-                last_seen TEXT NOT NULL
-            )
-            """
-        )
-        active_columns = {
-            str(row[1]).strip().lower()
-            for row in conn.execute("PRAGMA table_info(active_auth_sessions)").fetchall()
-        }
-        if "can_manage_login_requests" not in active_columns:
-            conn.execute(
-                """
-                ALTER TABLE active_auth_sessions
-                ADD COLUMN can_manage_login_requests INTEGER NOT NULL DEFAULT 0
-                """
-            )
-        conn.execute(
-            """
-            WITH chosen AS (
-                SELECT session_id
-                FROM active_auth_sessions
-                WHERE can_manage_login_requests = 1
-                ORDER BY datetime(last_seen) DESC, session_id ASC
-                LIMIT 1
-            )
-            UPDATE active_auth_sessions
-            SET can_manage_login_requests = CASE
-                WHEN session_id = (SELECT session_id FROM chosen) THEN 1
-                ELSE 0
-            END
-            WHERE can_manage_login_requests = 1
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS login_approval_requests (
-                id TEXT PRIMARY KEY,
-                username TEXT NOT NULL,
-                credential_id TEXT NOT NULL,
-                requester_session_id TEXT NOT NULL,
-                ip TEXT,
-                user_agent TEXT,
-                created_at TEXT NOT NULL,
-                expires_at TEXT NOT NULL,
-                status TEXT NOT NULL,
-                decision_by TEXT,
-                decision_at TEXT,
-                reason TEXT
-            )
-            """
-        )
-        self._create_sqlite_indexes(conn)
-        conn.commit()
-
-    def _create_sqlite_indexes(self, conn):
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_purchase_orders_updated_at
-            ON purchase_orders (updated_at)
-            """
-        )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_deleted_purchase_orders_deleted_at
-            ON deleted_purchase_orders (deleted_at)
-            """
-        )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_active_auth_sessions_last_seen
-            ON active_auth_sessions (last_seen)
-            """
-        )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_active_auth_sessions_manage_last_seen
-            ON active_auth_sessions (can_manage_login_requests, last_seen)
-            """
-        )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_login_approval_requests_status_created
-            ON login_approval_requests (status, created_at)
-            """
-        )
-        conn.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_login_approval_requests_expires_at
-            ON login_approval_requests (expires_at)
-            """
-        )
+    def init_db(self) -> list[int]:
+        return self.migration_runner().migrate()
+
+    def schema_status(self) -> dict[str, int]:
+        runner = self.migration_runner()
+        return {"version": runner.current_version(), "latest": runner.latest_version}
+
+
+class UnitOfWorkFailedError(RuntimeError):
+    def __init__(self):
+        super().__init__("A database error rolled back this request's transaction")
+
+
+class _UnitOfWorkConnection:
+    """Connection handle given to repositories inside a unit of work.
+
+    ``commit()`` and ``close()`` are deferred to the unit of work, so every
+    repository call in a request shares one connection and one transaction.
+    A driver error rolls back that whole transaction, including writes made
+    by earlier repository calls, so it also fails the unit of work.
+    """
+
+    def __init__(self, unit_of_work: "UnitOfWork"):
+        self._unit_of_work = unit_of_work
+
+    def __getattr__(self, name):
+        return getattr(self._unit_of_work.raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and issubclass(exc_type, _DRIVER_ERRORS):
+            self._unit_of_work.fail()
+        return False
+
+    def execute(self, *args, **kwargs):
+        try:
+            return self._unit_of_work.raw.execute(*args, **kwargs)
+        except _DRIVER_ERRORS:
+            self._unit_of_work.fail()
+            raise
+
+    def executemany(self, *args, **kwargs):
+        try:
+            return self._unit_of_work.raw.executemany(*args, **kwargs)
+        except _DRIVER_ERRORS:
+            self._unit_of_work.fail()
+            raise
+
+    def commit(self) -> None:
+        return None
+
+    def rollback(self) -> None:
+        self._unit_of_work.fail()
+
+    def close(self) -> None:
+        return None
+
+
+class UnitOfWork:
+    """Request-scoped connection lease with a single batched commit.
+
+    Once ``fail()`` has rolled the transaction back the unit of work stays
+    failed: it commits nothing more and ``connection()`` raises, so a route
+    that swallowed the driver error cannot report its lost writes as saved.
+    """
+
+    def __init__(self, manager: DatabaseManager):
+        self._manager = manager
+        self._lease: ConnectionLease | None = None
+        self.failed = False
+
+    @property
+    def active(self) -> bool:
+        return self._lease is not None
+
+    @property
+    def raw(self):
+        if self._lease is None:
+            self._lease = self._manager.lease()
+        return self._lease.raw
+
+    def connection(self) -> _UnitOfWorkConnection:
+        if self.failed:
+            raise UnitOfWorkFailedError()
+        return _UnitOfWorkConnection(self)
+
+    def commit(self) -> None:
+        if self._lease is not None:
+            self._lease.raw.commit()
+
+    def rollback(self) -> None:
+        if self._lease is not None:
+            self._lease.raw.rollback()
+
+    def fail(self) -> None:
+        self.failed = True
+        self.rollback()
+
+    def close(self, *, commit: bool) -> None:
+        lease, self._lease = self._lease, None
+        if lease is None:
+            return
+        try:
+            if commit and not self.failed:
+                lease.raw.commit()
+            else:
+                lease.raw.rollback()
+        finally:
+            lease.close()
 
 
 _database_manager = DatabaseManager(
     db_url=DB_URL,
     db_path=DB_PATH,
     use_postgres=USE_POSTGRES,
+    pool_enabled=DB_POOL_ENABLED,
+    pool_min_size=DB_POOL_MIN_SIZE,
+    pool_max_size=DB_POOL_MAX_SIZE,
+    pool_timeout_seconds=DB_POOL_TIMEOUT_SECONDS,
+    pool_max_lifetime_seconds=DB_POOL_MAX_LIFETIME_SECONDS,
+    pool_health_check_seconds=DB_POOL_HEALTH_CHECK_SECONDS,
+    sqlite_profile=SQLITE_PROFILE,
+    sqlite_busy_timeout_ms=SQLITE_BUSY_TIMEOUT_MS,
 )
 
 
+_UNIT_OF_WORK_KEY = "_po_unit_of_work"
+
+
+def _current_unit_of_work() -> UnitOfWork:
+    unit_of_work = g.get(_UNIT_OF_WORK_KEY)
+    if unit_of_work is None:
+        unit_of_work = UnitOfWork(_database_manager)
+        setattr(g, _UNIT_OF_WORK_KEY, unit_of_work)
+    return unit_of_work
+
+
 def get_db():
+    if has_app_context():
+        return _current_unit_of_work().connection()
+    return _database_manager.lease()
+
+
+def open_db_connection():
+    """Dedicated unpooled connection for long-lived listeners (LISTEN)."""
     return _database_manager.connect()
 
 
-def init_db() -> None:
-    _database_manager.init_db()
+def release_unit_of_work() -> None:
+    """Commit pending request writes and return the connection early.
+
+    Use before slow work (PDF rendering, backup scripts) so the request does
+    not hold a pooled connection or an open write transaction meanwhile; a
+    later ``get_db()`` in the same request starts a fresh unit of work.
+    """
+    if not has_app_context():
+        return
+    unit_of_work = g.get(_UNIT_OF_WORK_KEY)
+    if unit_of_work is not None:
+        unit_of_work.close(commit=True)
+        if unit_of_work.failed:
+            raise UnitOfWorkFailedError()
+
+
+def commit_unit_of_work(response):
+    """``after_request`` hook: commit before the response is sent.
+
+    A failed unit of work turns the response into a ``500``.
+    """
+    unit_of_work = g.get(_UNIT_OF_WORK_KEY)
+    if unit_of_work is None:
+        return response
+    if unit_of_work.failed:
+        unit_of_work.close(commit=False)
+        if response.status_code < 500:
+            current_app.logger.error(
+                "Database error was handled but rolled back the request; returning 500"
+            )
+            response = jsonify({"error": "Database error; changes were not saved"})
+            response.status_code = 500
+        return response
+    if unit_of_work.active:
+        unit_of_work.close(commit=response.status_code < 500)
+    return response
+
+
+def teardown_unit_of_work(exc=None) -> None:
+    unit_of_work = g.pop(_UNIT_OF_WORK_KEY, None)
+    if unit_of_work is not None:
+        unit_of_work.close(commit=False)
+
+
+def get_db_pool_stats() -> dict[str, object]:
+    return _database_manager.pool_stats()
+
+
+def get_db_pragma_report() -> dict[str, object]:
+    return _database_manager.sqlite_pragma_report()
+
+
+def dispose_db_pool() -> None:
+    _database_manager.dispose_pool()
+
+
+def get_db_schema_status() -> dict[str, int]:
+    return _database_manager.schema_status()
+
+
+def init_db() -> list[int]:
+    return _database_manager.init_db()
 
 
 def iso(value):
@@ -0,0 +1,847 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Union
+
+MigrationStep = Union[str, Callable[[Any], None]]
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    sqlite: tuple[MigrationStep, ...] = ()
+    postgres: tuple[MigrationStep, ...] = ()
+
+
+def _baseline_postgres(cur) -> None:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS purchase_orders (
+            id SERIAL PRIMARY KEY,
+            created_at TIMESTAMPTZ NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL,
+            form_no TEXT,
+            po_date TEXT,
+            to_name TEXT,
+            company_name TEXT,
+            items_count INTEGER DEFAULT 0,
+            payload TEXT NOT NULL,
+            UNIQUE (form_no)
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS deleted_purchase_orders (
+            id SERIAL PRIMARY KEY,
+            original_po_id INTEGER,
+            deleted_at TIMESTAMPTZ NOT NULL,
+            created_at TIMESTAMPTZ,
+            updated_at TIMESTAMPTZ,
+            form_no TEXT,
+            po_date TEXT,
+            to_name TEXT,
+            company_name TEXT,
+            items_count INTEGER DEFAULT 0,
+            payload TEXT NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS passkey_credentials (
+            id SERIAL PRIMARY KEY,
+            username TEXT NOT NULL,
+            user_handle TEXT NOT NULL,
+            credential_id TEXT NOT NULL UNIQUE,
+            public_key TEXT NOT NULL,
+            sign_count BIGINT NOT NULL DEFAULT 0,
+            is_approval_device BOOLEAN NOT NULL DEFAULT FALSE,
+            created_at TIMESTAMPTZ NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        ALTER TABLE passkey_credentials
+        ADD COLUMN IF NOT EXISTS is_approval_device BOOLEAN NOT NULL DEFAULT FALSE
+        """
+    )
+    cur.execute(
+        """
+        UPDATE passkey_credentials
+        SET is_approval_device = TRUE
+        WHERE id = (
+            SELECT id
+            FROM passkey_credentials
+            ORDER BY created_at ASC NULLS LAST, id ASC
+            LIMIT 1
+        )
+          AND NOT EXISTS (
+              SELECT 1
+              FROM passkey_credentials
+              WHERE is_approval_device = TRUE
+          )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS active_auth_sessions (
+            session_id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            can_manage_login_requests BOOLEAN NOT NULL DEFAULT FALSE,
+            last_seen TIMESTAMPTZ NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        ALTER TABLE active_auth_sessions
+        ADD COLUMN IF NOT EXISTS can_manage_login_requests BOOLEAN NOT NULL DEFAULT FALSE
+        """
+    )
+    cur.execute(
+        """
+        WITH chosen AS (
+            SELECT session_id
+            FROM active_auth_sessions
+            WHERE can_manage_login_requests = TRUE
+            ORDER BY last_seen DESC, session_id ASC
+            LIMIT 1
+        )
+        UPDATE active_auth_sessions
+        SET can_manage_login_requests = CASE
+            WHEN session_id = (SELECT session_id FROM chosen) THEN TRUE
+            ELSE FALSE
+        END
+        WHERE can_manage_login_requests = TRUE
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS login_approval_requests (
+            id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            credential_id TEXT NOT NULL,
+            requester_session_id TEXT NOT NULL,
+            ip TEXT,
+            user_agent TEXT,
+            created_at TIMESTAMPTZ NOT NULL,
+            expires_at TIMESTAMPTZ NOT NULL,
+            status TEXT NOT NULL,
+            decision_by TEXT,
+            decision_at TIMESTAMPTZ,
+            reason TEXT
+        )
+        """
+    )
+    _create_postgres_indexes(cur)
+
+
+def _create_postgres_indexes(cur) -> None:
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_purchase_orders_updated_at
+        ON purchase_orders (updated_at DESC)
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_deleted_purchase_orders_deleted_at
+        ON deleted_purchase_orders (deleted_at DESC)
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_active_auth_sessions_last_seen
+        ON active_auth_sessions (last_seen DESC)
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_active_auth_sessions_manage_last_seen
+        ON active_auth_sessions (can_manage_login_requests, last_seen DESC)
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_login_approval_requests_status_created
+        ON login_approval_requests (status, created_at DESC)
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_login_approval_requests_expires_at
+        ON login_approval_requests (expires_at)
+        """
+    )
+
+
+def _baseline_sqlite(conn) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS purchase_orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            form_no TEXT,
+            po_date TEXT,
+            to_name TEXT,
+            company_name TEXT,
+            items_count INTEGER DEFAULT 0,
+            payload TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS deleted_purchase_orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            original_po_id INTEGER,
+            deleted_at TEXT NOT NULL,
+            created_at TEXT,
+            updated_at TEXT,
+            form_no TEXT,
+            po_date TEXT,
+            to_name TEXT,
+            company_name TEXT,
+            items_count INTEGER DEFAULT 0,
+            payload TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS passkey_credentials (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            user_handle TEXT NOT NULL,
+            credential_id TEXT NOT NULL UNIQUE,
+            public_key TEXT NOT NULL,
+            sign_count INTEGER NOT NULL DEFAULT 0,
+            is_approval_device INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+    columns = {
+        str(row[1]).strip().lower()
+        for row in conn.execute("PRAGMA table_info(passkey_credentials)").fetchall()
+    }
+    if "is_approval_device" not in columns:
+        conn.execute(
+            """
+            ALTER TABLE passkey_credentials
+            ADD COLUMN is_approval_device INTEGER NOT NULL DEFAULT 0
+            """
+        )
+    has_approval = conn.execute(
+        """
+        SELECT 1
+        FROM passkey_credentials
+        WHERE is_approval_device = 1
+        LIMIT 1
+        """
+    ).fetchone()
+    if not has_approval:
+        conn.execute(
+            """
+            UPDATE passkey_credentials
+            SET is_approval_device = 1
+            WHERE id = (
+                SELECT id
+                FROM passkey_credentials
+                ORDER BY datetime(created_at) ASC, id ASC
+                LIMIT 1
+            )
+            """
+        )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS active_auth_sessions (
+            session_id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            can_manage_login_requests INTEGER NOT NULL DEFAULT 0,
+            last_seen TEXT NOT NULL
+        )
+        """
+    )
+    active_columns = {
+        str(row[1]).strip().lower()
+        for row in conn.execute("PRAGMA table_info(active_auth_sessions)").fetchall()
+    }
+    if "can_manage_login_requests" not in active_columns:
+        conn.execute(
+            """
+            ALTER TABLE active_auth_sessions
+            ADD COLUMN can_manage_login_requests INTEGER NOT NULL DEFAULT 0
+            """
+        )
+    conn.execute(
+        """
+        WITH chosen AS (
+            SELECT session_id
+            FROM active_auth_sessions
+            WHERE can_manage_login_requests = 1
+            ORDER BY datetime(last_seen) DESC, session_id ASC
+            LIMIT 1
+        )
+        UPDATE active_auth_sessions
+        SET can_manage_login_requests = CASE
+            WHEN session_id = (SELECT session_id FROM chosen) THEN 1
+            ELSE 0
+        END
+        WHERE can_manage_login_requests = 1
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS login_approval_requests (
+            id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            credential_id TEXT NOT NULL,
+            requester_session_id TEXT NOT NULL,
+            ip TEXT,
+            user_agent TEXT,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            status TEXT NOT NULL,
+            decision_by TEXT,
+            decision_at TEXT,
+            reason TEXT
+        )
+        """
+    )
+    _create_sqlite_indexes(conn)
+
+
+def _create_sqlite_indexes(conn) -> None:
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_purchase_orders_updated_at
+        ON purchase_orders (updated_at)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_deleted_purchase_orders_deleted_at
+        ON deleted_purchase_orders (deleted_at)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_active_auth_sessions_last_seen
+        ON active_auth_sessions (last_seen)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_active_auth_sessions_manage_last_seen
+        ON active_auth_sessions (can_manage_login_requests, last_seen)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_login_approval_requests_status_created
+        ON login_approval_requests (status, created_at)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_login_approval_requests_expires_at
+        ON login_approval_requests (expires_at)
+        """
+    )
+
+
+def epoch_us(value) -> int | None:
+    """Normalize a stored timestamp to integer microseconds since the epoch."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        text = str(value).strip()
+        if not text:
+            return None
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        try:
+            parsed = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    delta = parsed - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _sqlite_backfill_epoch_column(conn, table: str, source: str, target: str) -> None:
+    rows = conn.execute(f"SELECT id, {source} FROM {table} WHERE {target} IS NULL").fetchall()
+    conn.executemany(
+        f"UPDATE {table} SET {target} = ? WHERE id = ?",
+        [(epoch_us(row[1]) or 0, row[0]) for row in rows],
+    )
+
+
+def _sqlite_listing_sort_keys(conn) -> None:
+    conn.execute("ALTER TABLE purchase_orders ADD COLUMN updated_ts INTEGER")
+    conn.execute("ALTER TABLE deleted_purchase_orders ADD COLUMN deleted_ts INTEGER")
+    _sqlite_backfill_epoch_column(conn, "purchase_orders", "updated_at", "updated_ts")
+    _sqlite_backfill_epoch_column(conn, "deleted_purchase_orders", "deleted_at", "deleted_ts")
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_purchase_orders_updated_ts_id
+        ON purchase_orders (updated_ts DESC, id DESC)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_deleted_purchase_orders_deleted_ts_id
+        ON deleted_purchase_orders (deleted_ts DESC, id DESC)
+        """
+    )
+
+
+_INLINE_IMAGE_BATCH = 200
+
+
+def _intern_inline_images(select, execute, placeholder: str, insert_blob: str, now) -> None:
+    """Move inline image data URLs in stored POs and presets into ``blobs``.
+
+    ``select`` returns ``(id, text)`` tuples.  Each rewritten row adds one
+    reference to every blob it newly points at.
+    """
+    from .services.blob_store import intern_payload_images, payload_blob_refs
+
+    def put(data: bytes, mime: str) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        execute(insert_blob, (digest, mime, data, len(data), now, now))
+        return digest
+
+    sources = (
+        ("purchase_orders", "payload", False),
+        ("deleted_purchase_orders", "payload", False),
+        ("report_styles", "style", True),
+    )
+    for table, column, is_style in sources:
+        last_id = 0
+        while True:
+            rows = select(
+                f"""
+                SELECT id, {column} AS body FROM {table}
+                WHERE id > {placeholder} AND {column} LIKE {placeholder}
+                ORDER BY id LIMIT {_INLINE_IMAGE_BATCH}
+                """,
+                (last_id, "%data:image/%"),
+            )
+            if not rows:
+                break
+            for row_id, text in rows:
+                last_id = row_id
+                try:
+                    stored = json.loads(text or "{}")
+                except ValueError:
+                    continue
+                if not isinstance(stored, dict):
+                    continue
+                payload = {"reportStyle": stored} if is_style else stored
+                interned = intern_payload_images(payload, put)
+                if interned == payload:
+                    continue
+                execute(
+                    f"UPDATE {table} SET {column} = {placeholder} WHERE id = {placeholder}",
+                    (json.dumps(interned["reportStyle"] if is_style else interned), row_id),
+                )
+                for digest in sorted(payload_blob_refs(interned) - payload_blob_refs(payload)):
+                    execute(
+                        "UPDATE blobs SET refcount = refcount + 1, released_at = NULL "
+                        f"WHERE sha256 = {placeholder}",
+                        (digest,),
+                    )
+
+
+def _sqlite_intern_inline_images(conn) -> None:
+    _intern_inline_images(
+        lambda sql, params: [(row[0], row[1]) for row in conn.execute(sql, params)],
+        conn.execute,
+        "?",
+        """
+        INSERT OR IGNORE INTO blobs (sha256, mime, data, size_bytes, refcount, created_at, released_at)
+        VALUES (?, ?, ?, ?, 0, ?, ?)
+        """,
+        datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def _postgres_intern_inline_images(cur) -> None:
+    def select(sql, params):
+        cur.execute(sql, params)
+        return [(row["id"], row["body"]) for row in cur.fetchall()]
+
+    _intern_inline_images(
+        select,
+        cur.execute,
+        "%s",
+        """
+        INSERT INTO blobs (sha256, mime, data, size_bytes, refcount, created_at, released_at)
+        VALUES (%s, %s, %s, %s, 0, %s, %s)
+        ON CONFLICT (sha256) DO NOTHING
+        """,
+        datetime.now(timezone.utc),
+    )
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        1,
+        "baseline schema",
+        sqlite=(_baseline_sqlite,),
+        postgres=(_baseline_postgres,),
+    ),
+    Migration(
+        2,
+        "index-ordered listing sort keys",
+        sqlite=(_sqlite_listing_sort_keys,),
+        postgres=(
+            """
+            CREATE INDEX IF NOT EXISTS idx_purchase_orders_updated_at_id
+            ON purchase_orders (updated_at DESC, id DESC)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_deleted_purchase_orders_deleted_at_id
+            ON deleted_purchase_orders (deleted_at DESC, id DESC)
+            """,
+        ),
+    ),
+    Migration(
+        3,
+        "purchase order change log",
+        sqlite=(
+            """
+            CREATE TABLE IF NOT EXISTS po_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                po_id INTEGER,
+                trash_id INTEGER,
+                changed_at TEXT NOT NULL
+            )
+            """,
+        ),
+        postgres=(
+            """
+            CREATE TABLE IF NOT EXISTS po_changes (
+                seq BIGSERIAL PRIMARY KEY,
+                kind TEXT NOT NULL,
+                po_id INTEGER,
+                trash_id INTEGER,
+                changed_at TIMESTAMPTZ NOT NULL
+            )
+            """,
+        ),
+    ),
+    Migration(
+        4,
+        "export jobs",
+        sqlite=(
+            """
+            CREATE TABLE IF NOT EXISTS export_jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                po_id INTEGER,
+                params TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL,
+                progress INTEGER NOT NULL DEFAULT 0,
+                error TEXT NOT NULL DEFAULT '',
+                filename TEXT NOT NULL DEFAULT '',
+                artifact TEXT NOT NULL DEFAULT '',
+                size_bytes INTEGER NOT NULL DEFAULT 0,
+                created_by TEXT NOT NULL DEFAULT '',
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                finished_at TEXT,
+                expires_at TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_export_jobs_expires_at
+            ON export_jobs (expires_at)
+            """,
+        ),
+        postgres=(
+            """
+            CREATE TABLE IF NOT EXISTS export_jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                po_id INTEGER,
+                params TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL,
+                progress INTEGER NOT NULL DEFAULT 0,
+                error TEXT NOT NULL DEFAULT '',
+                filename TEXT NOT NULL DEFAULT '',
+                artifact TEXT NOT NULL DEFAULT '',
+                size_bytes BIGINT NOT NULL DEFAULT 0,
+                created_by TEXT NOT NULL DEFAULT '',
+                created_at TIMESTAMPTZ NOT NULL,
+                updated_at TIMESTAMPTZ NOT NULL,
+                finished_at TIMESTAMPTZ,
+                expires_at TIMESTAMPTZ NOT NULL
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_export_jobs_expires_at
+            ON export_jobs (expires_at)
+            """,
+        ),
+    ),
+    Migration(
+        5,
+        "report style presets",
+        sqlite=(
+            """
+            CREATE TABLE IF NOT EXISTS report_styles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                style TEXT NOT NULL DEFAULT '{}',
+                version INTEGER NOT NULL DEFAULT 1,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                deleted_at TEXT
+            )
+            """,
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_report_styles_live_name
+            ON report_styles (name) WHERE deleted_at IS NULL
+            """,
+        ),
+        postgres=(
+            """
+            CREATE TABLE IF NOT EXISTS report_styles (
+                id SERIAL PRIMARY KEY,
+                name TEXT NOT NULL,
+                style TEXT NOT NULL DEFAULT '{}',
+                version INTEGER NOT NULL DEFAULT 1,
+                created_at TIMESTAMPTZ NOT NULL,
+                updated_at TIMESTAMPTZ NOT NULL,
+                deleted_at TIMESTAMPTZ
+            )
+            """,
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_report_styles_live_name
+            ON report_styles (name) WHERE deleted_at IS NULL
+            """,
+        ),
+    ),
+    Migration(
+        6,
+        "blob store",
+        sqlite=(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                mime TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size_bytes INTEGER NOT NULL DEFAULT 0,
+                refcount INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                released_at TEXT
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_blobs_released_at
+            ON blobs (released_at) WHERE refcount <= 0
+            """,
+        ),
+        postgres=(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                mime TEXT NOT NULL,
+                data BYTEA NOT NULL,
+                size_bytes BIGINT NOT NULL DEFAULT 0,
+                refcount INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMPTZ NOT NULL,
+                released_at TIMESTAMPTZ
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_blobs_released_at
+            ON blobs (released_at) WHERE refcount <= 0
+            """,
+        ),
+    ),    Migration(
+        7,
+        "move inline images into the blob store",
+        sqlite=(_sqlite_intern_inline_images,),
+        postgres=(_postgres_intern_inline_images,),
+    ),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+# "PO_M" as a 32-bit integer; any constant shared by all workers works.
+POSTGRES_MIGRATION_LOCK_KEY = 0x504F5F4D
+
+
+class MigrationRunner:
+    """Applies pending ``MIGRATIONS`` and records them in ``schema_version``.
+
+    When the schema is current ``migrate()`` costs one query.  Otherwise it
+    takes a cross-process lock (``BEGIN IMMEDIATE`` on SQLite, an advisory
+    lock on PostgreSQL) and re-checks before applying, so only one gunicorn
+    worker migrates at deploy time.
+    """
+
+    def __init__(self, *, connect, use_postgres: bool, migrations=MIGRATIONS):
+        self._connect = connect
+        self._use_postgres = use_postgres
+        self._migrations = tuple(sorted(migrations, key=lambda m: m.version))
+
+    @property
+    def latest_version(self) -> int:
+        return self._migrations[-1].version if self._migrations else 0
+
+    def _pending(self, current: int) -> list[Migration]:
+        return [migration for migration in self._migrations if migration.version > current]
+
+    @staticmethod
+    def _run_step(target, step: MigrationStep) -> None:
+        if isinstance(step, str):
+            target.execute(step)
+        else:
+            step(target)
+
+    def current_version(self) -> int:
+        conn = self._connect()
+        try:
+            if self._use_postgres:
+                with conn.cursor() as cur:
+                    version = self._postgres_version(cur)
+                conn.rollback()
+                return version
+            return self._sqlite_version(conn)
+        finally:
+            conn.close()
+
+    def migrate(self) -> list[int]:
+        conn = self._connect()
+        try:
+            if self._use_postgres:
+                return self._migrate_postgres(conn)
+            return self._migrate_sqlite(conn)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _sqlite_version(conn) -> int:
+        try:
+            row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        except sqlite3.OperationalError:
+            return 0
+        return int(row[0] or 0) if row else 0
+
+    def _migrate_sqlite(self, conn) -> list[int]:
+        if not self._pending(self._sqlite_version(conn)):
+            return []
+        applied: list[int] = []
+        previous_isolation = conn.isolation_level
+        conn.isolation_level = None
+        try:
+            # BEGIN IMMEDIATE takes the database write lock up front, so a
+            # second process blocks (busy_timeout) and then sees the new
+            # version instead of racing the same DDL.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        applied_at TEXT NOT NULL
+                    )
+                    """
+                )
+                for migration in self._pending(self._sqlite_version(conn)):
+                    for step in migration.sqlite:
+                        self._run_step(conn, step)
+                    conn.execute(
+                        "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                        (
+                            migration.version,
+                            migration.name,
+                            datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                        ),
+                    )
+                    applied.append(migration.version)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.isolation_level = previous_isolation
+        return applied
+
+    @staticmethod
+    def _postgres_version(cur) -> int:
+        cur.execute("SELECT to_regclass('schema_version') IS NOT NULL AS present")
+        row = cur.fetchone()
+        if not row or not row["present"]:
+            return 0
+        cur.execute("SELECT COALESCE(MAX(version), 0) AS version FROM schema_version")
+        row = cur.fetchone()
+        return int(row["version"] or 0) if row else 0
+
+    def _migrate_postgres(self, conn) -> list[int]:
+        with conn.cursor() as cur:
+            current = self._postgres_version(cur)
+        conn.commit()
+        if not self._pending(current):
+            return []
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_lock(%s)", (POSTGRES_MIGRATION_LOCK_KEY,))
+        conn.commit()
+        applied: list[int] = []
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        applied_at TIMESTAMPTZ NOT NULL
+                    )
+                    """
+                )
+                current = self._postgres_version(cur)
+            conn.commit()
+            for migration in self._pending(current):
+                try:
+                    with conn.cursor() as cur:
+                        for step in migration.postgres:
+                            self._run_step(cur, step)
+                        cur.execute(
+                            """
+                            INSERT INTO schema_version (version, name, applied_at)
+                            VALUES (%s, %s, %s)
+                            """,
+                            (migration.version, migration.name, datetime.now(timezone.utc)),
+                        )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                applied.append(migration.version)
+        finally:
+            conn.rollback()
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_unlock(%s)", (POSTGRES_MIGRATION_LOCK_KEY,))
+            conn.commit()
+        return applied
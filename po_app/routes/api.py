@@ -9,7 +9,17 @@ from functools import wraps
 
 from io import BytesIO
 
-from flask import Blueprint, jsonify, request, send_file, session
+from flask import (
+    Blueprint,
+    Response,
+    jsonify,
+    request,
+    send_file,
+    session,
+    stream_with_context,
+    url_for,
+)
+from werkzeug.utils import send_file as werkzeug_send_file
 
 from ..config import (
     AUTH_DISABLED,
@@ -17,14 +27,51 @@ from ..config import (
     AUTO_BACKUP_INTERVAL_HOURS,
     AUTO_BACKUP_RETENTION_DAYS,
     BASE_DIR,
+    EVENT_STREAM_ENABLED,
+    EVENT_STREAM_MAX_CLIENTS,
     FIRST_ADMIN_SETUP_CODE,
     PASSKEY_RP_ID,
     PASSKEY_RP_NAME,
+    PDF_ACCEL_REDIRECT_PREFIX,
+    PDF_POOL_WORKERS,
+    PDF_SENDFILE,
     USE_POSTGRES,
 )
-from ..db import get_db, iso
+from ..db import (
+    get_db,
+    get_db_pool_stats,
+    get_db_pragma_report,
+    get_db_schema_status,
+    iso,
+    release_unit_of_work,
+)
 from ..services.auth_flow import AuthFlowService, PasskeyRepository
-from ..services.pdf import build_pdf
+from ..services.batch_export import BatchExportService
+from ..services.blob_store import BlobStore
+from ..services.change_feed import ChangeFeed, ChangeFeedBusyError
+from ..services.export_jobs import ExportJobNotFoundError, ExportJobService
+from ..services.pdf import (
+    PdfExport,
+    get_image_cache_stats,
+    get_pdf_cache_stats,
+    get_pdf_template_stats,
+    invalidate_cached_pdf,
+    layout_pdf,
+    open_pdf_export,
+)
+from ..services.pdf_pool import (
+    PdfRenderBusyError,
+    PdfRenderTimeoutError,
+    get_render_pool_stats,
+    render_pdf_to_path,
+)
+from ..services.report_style import get_report_style_cache_stats
+from ..services.style_presets import (
+    ReportStylePresetRepository,
+    StylePresetNameConflictError,
+    StylePresetNotFoundError,
+)
+from ..services.thumbnails import ThumbnailService
 from ..services.maintenance import (
     BackupService,
     BackupValidationError,
@@ -32,7 +79,12 @@ from ..services.maintenance import (
     MaintenanceScriptRunner,
     PackageUpdateService,
 )
-from ..services.po_repository import POFormNoConflictError, PONotFoundError, PORepository
+from ..services.po_repository import (
+    POFormNoConflictError,
+    POInvalidCursorError,
+    PONotFoundError,
+    PORepository,
+)
 
 bp = Blueprint("api", __name__)
 BACKUP_DIR = BASE_DIR / "backups"
@@ -47,7 +99,24 @@ LOGIN_APPROVAL_TTL_SECONDS = 120
 LOGIN_APPROVAL_DECISION_TTL_SECONDS = 180
 ACTIVE_AUTH_SESSION_TTL_SECONDS = 300
 APPROVER_ONLINE_WINDOW_SECONDS = 12
-_po_repository = PORepository(use_postgres=USE_POSTGRES)
+LIST_PAGE_DEFAULT_LIMIT = 100
+LIST_PAGE_MAX_LIMIT = 500
+# Heartbeats refresh the session's last_seen, so they must stay inside the
+# approver online window or approvers would look offline while streaming.
+EVENT_STREAM_HEARTBEAT_SECONDS = 10
+EVENT_STREAM_MAX_SECONDS = 300
+EVENT_STREAM_RETRY_MS = 3000
+EVENT_STREAM_BUSY_RETRY_SECONDS = 30
+_blob_store = BlobStore(use_postgres=USE_POSTGRES)
+_style_preset_repository = ReportStylePresetRepository(
+    use_postgres=USE_POSTGRES,
+    blob_store=_blob_store,
+)
+_po_repository = PORepository(
+    use_postgres=USE_POSTGRES,
+    style_presets=_style_preset_repository,
+    blob_store=_blob_store,
+)
 _passkey_repository = PasskeyRepository(use_postgres=USE_POSTGRES)
 _auth_flow_service = AuthFlowService(
     passkey_repository=_passkey_repository,
@@ -57,6 +126,13 @@ _auth_flow_service = AuthFlowService(
     active_auth_session_ttl_seconds=ACTIVE_AUTH_SESSION_TTL_SECONDS,
     approver_online_window_seconds=APPROVER_ONLINE_WINDOW_SECONDS,
 )
+_batch_export_service = BatchExportService(
+    po_repository=_po_repository,
+    parallelism=PDF_POOL_WORKERS,
+)
+_export_job_service = ExportJobService(po_repository=_po_repository, use_postgres=USE_POSTGRES)
+_thumbnail_service = ThumbnailService(po_repository=_po_repository)
+_change_feed = ChangeFeed(use_postgres=USE_POSTGRES, max_subscribers=EVENT_STREAM_MAX_CLIENTS)
 _maintenance_runner = MaintenanceScriptRunner(base_dir=BASE_DIR, script_dir=SCRIPT_DIR)
 _backup_service = BackupService(
     backup_dir=BACKUP_DIR,
@@ -1051,10 +1127,31 @@ def reject_login_approval_request(request_id: str):
     return jsonify({"ok": True, "status": "rejected", "request_id": request_id})
 
 
+def _wants_full_list() -> bool:
+    return str(request.args.get("all") or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _page_limit() -> int:
+    try:
+        limit = int(request.args.get("limit", LIST_PAGE_DEFAULT_LIMIT))
+    except (TypeError, ValueError):
+        limit = LIST_PAGE_DEFAULT_LIMIT
+    return max(1, min(LIST_PAGE_MAX_LIMIT, limit))
+
+
 @bp.get("/po")
 @require_auth
 def list_pos():
-    return jsonify(_po_repository.list_pos())
+    if _wants_full_list():
+        return jsonify(_po_repository.list_pos())
+    try:
+        page = _po_repository.list_pos_page(
+            limit=_page_limit(),
+            after=request.args.get("after") or None,
+        )
+    except POInvalidCursorError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(page)
 
 
 @bp.get("/sync/status")
@@ -1063,10 +1160,85 @@ def sync_status():
     return jsonify(_po_repository.sync_status())
 
 
+@bp.get("/sync/changes")
+@require_auth
+def sync_changes():
+    try:
+        since = int(str(request.args.get("since") or "").strip())
+    except ValueError:
+        since = None
+    if since is not None and since < 0:
+        since = None
+    return jsonify(_po_repository.sync_changes(since))
+
+
+def _sse_message(event: str, data: dict[str, object]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@bp.get("/events")
+@require_auth
+def event_stream():
+    if not EVENT_STREAM_ENABLED:
+        return jsonify({"error": "Live updates are disabled"}), 404
+    try:
+        subscription = _change_feed.subscribe()
+    except ChangeFeedBusyError as exc:
+        return (
+            jsonify({"error": str(exc)}),
+            503,
+            {"Retry-After": str(EVENT_STREAM_BUSY_RETRY_SECONDS)},
+        )
+    # The stream outlives the request; do not hold its connection open.
+    release_unit_of_work()
+    auth_user = str(session.get("auth_user") or "")
+
+    def generate():
+        with subscription:
+            yield f"retry: {EVENT_STREAM_RETRY_MS}\n\n"
+            yield _sse_message("ready", {"token": str(subscription.po_seq)})
+            started = time.monotonic()
+            next_heartbeat = started + EVENT_STREAM_HEARTBEAT_SECONDS
+            while True:
+                now = time.monotonic()
+                if now - started >= EVENT_STREAM_MAX_SECONDS:
+                    # Let the browser reconnect so auth is re-checked and
+                    # server threads are recycled.
+                    return
+                for event, data in subscription.wait(max(0.0, next_heartbeat - now)):
+                    if event == "login-requests" and not session.get("can_manage_login_requests"):
+                        continue
+                    yield _sse_message(event, data)
+                if time.monotonic() >= next_heartbeat:
+                    if not AUTH_DISABLED and auth_user:
+                        _touch_active_auth_session(auth_user)
+                        release_unit_of_work()
+                    next_heartbeat = time.monotonic() + EVENT_STREAM_HEARTBEAT_SECONDS
+                    yield ": ping\n\n"
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Frees the slot even if the client disconnects before the first chunk.
+    response.call_on_close(subscription.close)
+    return response
+
+
 @bp.get("/po/trash")
 @require_auth
 def list_trash():
-    return jsonify(_po_repository.list_trash())
+    if _wants_full_list():
+        return jsonify(_po_repository.list_trash())
+    try:
+        page = _po_repository.list_trash_page(
+            limit=_page_limit(),
+            after=request.args.get("after") or None,
+        )
+    except POInvalidCursorError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(page)
 
 
 @bp.get("/po/<int:po_id>")
@@ -1094,16 +1266,73 @@ def save_po():
             signatures=signatures,
             report_style=report_style,
             po_id=po_id,
+            report_style_id=data.get("reportStyleId"),
         )
     except POFormNoConflictError as exc:
         return (
             jsonify({"error": "Form number already exists", "existing_id": exc.existing_id}),
             409,
         )
+    invalidate_cached_pdf(int(result["id"]))
+    _thumbnail_service.invalidate(int(result["id"]))
+    release_unit_of_work()
+    _thumbnail_service.notify(int(result["id"]))
     _backup_service.run_auto_backup_if_due()
     return jsonify(result)
 
 
+def _pdf_render_error_response(exc: Exception):
+    if isinstance(exc, PdfRenderBusyError):
+        return (
+            jsonify({"error": "PDF renderer is busy, try again shortly"}),
+            503,
+            {"Retry-After": str(exc.retry_after)},
+        )
+    return jsonify({"error": "PDF render timed out"}), 504
+
+
+def _send_pdf_export(export: PdfExport, download_name: str):
+    # The front server opens the cache file by name, so only hand it over if
+    # eviction has not removed it; otherwise stream from the open handle.
+    if export.path is not None and PDF_SENDFILE and export.path.is_file():
+        export.close()
+        response = werkzeug_send_file(
+            export.path,
+            request.environ,
+            mimetype="application/pdf",
+            as_attachment=True,
+            download_name=download_name,
+            use_x_sendfile=True,
+        )
+        if PDF_SENDFILE == "x-accel-redirect":
+            del response.headers["X-Sendfile"]
+            response.headers["X-Accel-Redirect"] = (
+                f"{PDF_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{export.cache_name}"
+            )
+        return response
+    return send_file(
+        export.open(),
+        mimetype="application/pdf",
+        as_attachment=True,
+        download_name=download_name,
+    )
+
+
+@bp.post("/po/layout")
+@require_auth
+def layout_po():
+    data = request.get_json(silent=True) or {}
+    fields = data.get("fields") or {}
+    items = data.get("items") or []
+    report_style = data.get("reportStyle") or {}
+    if not isinstance(fields, dict) or not isinstance(items, list) or not isinstance(report_style, dict):
+        return jsonify({"error": "Fields, items and reportStyle are required"}), 400
+    items = [row for row in items if isinstance(row, dict)]
+    # Auth touched the session row; do not hold the write lock while laying out.
+    release_unit_of_work()
+    return jsonify(layout_pdf(fields, items, report_style).to_dict())
+
+
 @bp.post("/po/export")
 @require_auth
 def export_po():
@@ -1112,52 +1341,284 @@ def export_po():
     items = data.get("items") or []
     signatures = data.get("signatures") or {}
     report_style = data.get("reportStyle") or {}
-    pdf_bytes = build_pdf(fields, items, signatures, report_style)
-    filename = "PO.pdf"
-    return send_file(
-        BytesIO(pdf_bytes),
-        mimetype="application/pdf",
-        as_attachment=True,
-        download_name=filename,
-    )
+    release_unit_of_work()
+    try:
+        export = open_pdf_export(
+            fields,
+            items,
+            signatures,
+            report_style,
+            render_to_path=render_pdf_to_path,
+        )
+    except (PdfRenderBusyError, PdfRenderTimeoutError) as exc:
+        return _pdf_render_error_response(exc)
+    return _send_pdf_export(export, "PO.pdf")
 
 
 @bp.get("/po/<int:po_id>/export")
 @require_auth
 def export_po_by_id(po_id: int):
     conn = get_db()
-    if USE_POSTGRES:
-        with conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "SELECT payload, form_no FROM purchase_orders WHERE id = %s",
-                    (po_id,),
-                )
-                row = cur.fetchone()
-    else:
-        row = conn.execute(
-            "SELECT payload, form_no FROM purchase_orders WHERE id = ?",
-            (po_id,),
-        ).fetchone()
-    conn.close()
+    try:
+        if USE_POSTGRES:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT payload, form_no FROM purchase_orders WHERE id = %s",
+                        (po_id,),
+                    )
+                    row = cur.fetchone()
+        else:
+            row = conn.execute(
+                "SELECT payload, form_no FROM purchase_orders WHERE id = ?",
+                (po_id,),
+            ).fetchone()
+    finally:
+        conn.close()
     if not row:
         return jsonify({"error": "Not found"}), 404
-    payload = json.loads(row["payload"])
+    payload = _style_preset_repository.expand_payload(json.loads(row["payload"]))
     fields = payload.get("fields") or {}
     items = payload.get("items") or []
     signatures = payload.get("signatures") or {}
     report_style = payload.get("reportStyle") or {}
-    pdf_bytes = build_pdf(fields, items, signatures, report_style)
+    release_unit_of_work()
+    try:
+        export = open_pdf_export(
+            fields,
+            items,
+            signatures,
+            report_style,
+            po_id=po_id,
+            render_to_path=render_pdf_to_path,
+        )
+    except (PdfRenderBusyError, PdfRenderTimeoutError) as exc:
+        return _pdf_render_error_response(exc)
     form_no = (row["form_no"] or "").strip()
     filename = f"PO_{form_no}.pdf" if form_no else f"PO_{po_id}.pdf"
+    return _send_pdf_export(export, filename)
+
+
+@bp.get("/po/<int:po_id>/thumbnail")
+@require_auth
+def po_thumbnail(po_id: int):
+    payload = _po_repository.get_po(po_id)
+    if not payload:
+        return jsonify({"error": "Not found"}), 404
+    release_unit_of_work()
+    _thumbnail_service.start_warmer()
+    key = _thumbnail_service.thumbnail_key(payload)
+    if key in request.if_none_match:
+        response = Response(status=304)
+    else:
+        try:
+            data = _thumbnail_service.image(key, payload, po_id=po_id)
+        except (PdfRenderBusyError, PdfRenderTimeoutError) as exc:
+            return _pdf_render_error_response(exc)
+        response = Response(data, mimetype=_thumbnail_service.mimetype)
+    response.set_etag(key)
+    # The saved list adds ?v=<updated_at>, so a versioned URL never goes stale.
+    if request.args.get("v"):
+        response.headers["Cache-Control"] = "private, max-age=31536000, immutable"
+    else:
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@bp.get("/blobs/<string:digest>")
+@require_auth
+def get_blob(digest: str):
+    digest = digest.lower()
+    # The URL is the content hash, so the bytes behind it never change.
+    if digest in request.if_none_match:
+        response = Response(status=304)
+    else:
+        blob = _blob_store.get(digest)
+        if blob is None:
+            return jsonify({"error": "Not found"}), 404
+        data, mimetype = blob
+        response = Response(data, mimetype=mimetype)
+    response.set_etag(digest)
+    response.headers["Cache-Control"] = "private, max-age=31536000, immutable"
+    # Blobs are user uploads served from the app's origin; never run them as a page.
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    response.headers["Content-Security-Policy"] = "sandbox"
+    return response
+
+
+@bp.post("/po/export/batch")
+@require_auth
+def export_po_batch():
+    data = request.get_json(silent=True) or {}
+    export_format = str(data.get("format") or "zip").strip().lower()
+    if export_format not in {"zip", "pdf"}:
+        return jsonify({"error": "format must be 'zip' or 'pdf'"}), 400
+    ids = data.get("ids")
+    po_ids = _batch_export_service.resolve_ids(
+        ids=ids if isinstance(ids, list) else None,
+        date_from=str(data.get("date_from") or "").strip(),
+        date_to=str(data.get("date_to") or "").strip(),
+        company=str(data.get("company") or "").strip(),
+    )
+    if not po_ids:
+        return jsonify({"error": "No purchase orders match the selection"}), 400
+    release_unit_of_work()
+
+    if export_format == "pdf":
+        pdf_bytes, failures = _batch_export_service.merge_pdf(po_ids)
+        if pdf_bytes is None:
+            return (
+                jsonify(
+                    {
+                        "error": "None of the selected purchase orders could be exported",
+                        "failures": failures,
+                    }
+                ),
+                422,
+            )
+        response = send_file(
+            BytesIO(pdf_bytes),
+            mimetype="application/pdf",
+            as_attachment=True,
+            download_name="PO_batch.pdf",
+        )
+        response.headers["X-Batch-Exported"] = str(len(po_ids) - len(failures))
+        response.headers["X-Batch-Failed-Ids"] = ",".join(str(row["id"]) for row in failures)
+        return response
+
+    # Per-PO failures are listed in manifest.json inside the archive.
+    return Response(
+        _batch_export_service.stream_zip(po_ids),
+        mimetype="application/zip",
+        headers={
+            "Content-Disposition": 'attachment; filename="PO_batch.zip"',
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+def _export_job_payload(job: dict) -> dict[str, object]:
+    payload = dict(job)
+    payload["status_url"] = url_for("api.get_export_job", job_id=job["id"])
+    if job.get("status") == "done":
+        payload["download_url"] = url_for("api.download_export_job", job_id=job["id"])
+    return payload
+
+
+@bp.post("/po/<int:po_id>/export-jobs")
+@require_auth
+def create_po_export_job(po_id: int):
+    try:
+        job = _export_job_service.create_po_job(
+            po_id,
+            created_by=str(session.get("auth_user") or ""),
+        )
+    except PONotFoundError:
+        return jsonify({"error": "Not found"}), 404
+    # The job runs on another connection; it must see the committed row.
+    release_unit_of_work()
+    _export_job_service.start(str(job["id"]))
+    payload = _export_job_payload(job)
+    return jsonify(payload), 202, {"Location": payload["status_url"]}
+
+
+@bp.get("/export-jobs/<job_id>")
+@require_auth
+def get_export_job(job_id: str):
+    job = _export_job_service.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Export job not found"}), 404
+    return jsonify(_export_job_payload(job))
+
+
+@bp.get("/export-jobs/<job_id>/download")
+@require_auth
+def download_export_job(job_id: str):
+    try:
+        job, path = _export_job_service.artifact_path(job_id)
+    except ExportJobNotFoundError:
+        return jsonify({"error": "Export job not found"}), 404
+    if job.get("status") != "done":
+        return jsonify({"error": "Export is not finished", "status": job.get("status")}), 409
+    if path is None:
+        return jsonify({"error": "Export file has expired"}), 410
+    release_unit_of_work()
     return send_file(
-        BytesIO(pdf_bytes),
-        mimetype="application/pdf",
+        path,
         as_attachment=True,
-        download_name=filename,
+        download_name=str(job.get("filename") or path.name),
+        max_age=0,
     )
 
 
+def _style_preset_body(data: dict, *, require_all: bool) -> tuple[dict, str | None]:
+    values: dict = {}
+    if "name" in data or require_all:
+        name = str(data.get("name") or "").strip()
+        if not name or len(name) > 80:
+            return {}, "Name is required (up to 80 characters)"
+        values["name"] = name
+    if "style" in data or require_all:
+        style = data.get("style")
+        if not isinstance(style, dict):
+            return {}, "Style must be an object"
+        values["style"] = style
+    return values, None
+
+
+@bp.get("/report-styles")
+@require_auth
+def list_style_presets():
+    return jsonify(_style_preset_repository.list_presets())
+
+
+@bp.post("/report-styles")
+@require_auth
+def create_style_preset():
+    values, error = _style_preset_body(request.get_json(silent=True) or {}, require_all=True)
+    if error:
+        return jsonify({"error": error}), 400
+    try:
+        preset = _style_preset_repository.create_preset(**values)
+    except StylePresetNameConflictError as exc:
+        return jsonify({"error": "Preset name already exists", "existing_id": exc.existing_id}), 409
+    return jsonify(preset), 201
+
+
+@bp.get("/report-styles/<int:preset_id>")
+@require_auth
+def get_style_preset(preset_id: int):
+    preset = _style_preset_repository.get_preset(preset_id)
+    if not preset:
+        return jsonify({"error": "Not found"}), 404
+    return jsonify(preset)
+
+
+@bp.put("/report-styles/<int:preset_id>")
+@require_auth
+def update_style_preset(preset_id: int):
+    values, error = _style_preset_body(request.get_json(silent=True) or {}, require_all=False)
+    if error:
+        return jsonify({"error": error}), 400
+    try:
+        preset = _style_preset_repository.update_preset(preset_id, **values)
+    except StylePresetNotFoundError:
+        return jsonify({"error": "Not found"}), 404
+    except StylePresetNameConflictError as exc:
+        return jsonify({"error": "Preset name already exists", "existing_id": exc.existing_id}), 409
+    return jsonify(preset)
+
+
+@bp.delete("/report-styles/<int:preset_id>")
+@require_auth
+def delete_style_preset(preset_id: int):
+    try:
+        _style_preset_repository.delete_preset(preset_id)
+    except StylePresetNotFoundError:
+        return jsonify({"error": "Not found"}), 404
+    return jsonify({"ok": True})
+
+
 @bp.delete("/po/<int:po_id>")
 @require_auth
 def delete_po(po_id: int):
@@ -1165,6 +1626,8 @@ def delete_po(po_id: int):
         trashed_id = _po_repository.delete_po(po_id)
     except PONotFoundError:
         return jsonify({"error": "Not found"}), 404
+    invalidate_cached_pdf(po_id)
+    _thumbnail_service.invalidate(po_id)
     return jsonify({"ok": True, "trashed_id": trashed_id})
 
 
@@ -1199,6 +1662,7 @@ def list_backups():
 @bp.post("/admin/backups/create")
 @require_auth
 def create_backup():
+    release_unit_of_work()
     try:
         payload = _backup_service.create_backup()
     except MaintenanceError as exc:
@@ -1214,6 +1678,7 @@ def restore_backup():
     if not file_name:
         return jsonify({"error": "Backup file is required"}), 400
 
+    release_unit_of_work()
     try:
         payload = _backup_service.restore_backup(file_name)
     except BackupValidationError as exc:
@@ -1222,7 +1687,6 @@ def restore_backup():
         return jsonify({"error": "Backup file not found"}), 404
     except MaintenanceError as exc:
         return jsonify({"error": str(exc)}), 500
-
     return jsonify(payload)
 
 
@@ -1240,9 +1704,40 @@ def delete_backup(file_name: str):
     return jsonify(payload)
 
 
+@bp.get("/admin/db/stats")
+@require_auth
+def db_stats():
+    return jsonify(
+        {
+            "pool": get_db_pool_stats(),
+            "pragmas": get_db_pragma_report(),
+            "schema": get_db_schema_status(),
+            "events": _change_feed.stats(),
+        }
+    )
+
+
+@bp.get("/admin/cache/stats")
+@require_auth
+def cache_stats():
+    return jsonify(
+        {
+            "pdf": get_pdf_cache_stats(),
+            "images": get_image_cache_stats(),
+            "styles": get_report_style_cache_stats(),
+            "style_presets": _style_preset_repository.stats(),
+            "template": get_pdf_template_stats(),
+            "render_pool": get_render_pool_stats(),
+            "thumbnails": _thumbnail_service.stats(),
+            "blobs": _blob_store.stats(),
+        }
+    )
+
+
 @bp.get("/admin/updates/check")
 @require_auth
 def check_updates():
+    release_unit_of_work()
     try:
         payload = _update_service.check_updates()
     except MaintenanceError as exc:
@@ -1256,6 +1751,7 @@ def apply_updates():
     data = request.get_json(silent=True) or {}
     upgrade_pip = bool(data.get("upgrade_pip", True))
     upgrade_requirements = bool(data.get("upgrade_requirements", True))
+    release_unit_of_work()
     try:
         payload = _update_service.apply_updates(
             upgrade_pip=upgrade_pip,
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from .auth_flow import AuthFlowService, PasskeyRepository
 from .auth_repository import AuthRepository
+from .blob_store import BlobStore
+from .export_jobs import ExportJobNotFoundError, ExportJobService
 from .maintenance import (
     BackupService,
     BackupValidationError,
@@ -9,7 +11,17 @@ from .maintenance import (
     MaintenanceScriptRunner,
     PackageUpdateService,
 )
-from .po_repository import POFormNoConflictError, PONotFoundError, PORepository
+from .po_repository import (
+    POFormNoConflictError,
+    POInvalidCursorError,
+    PONotFoundError,
+    PORepository,
+)
+from .style_presets import (
+    ReportStylePresetRepository,
+    StylePresetNameConflictError,
+    StylePresetNotFoundError,
+)
 
 __all__ = [
     "AuthRepository",
@@ -20,7 +32,14 @@ __all__ = [
     "PackageUpdateService",
     "MaintenanceError",
     "BackupValidationError",
+    "ExportJobService",
+    "ExportJobNotFoundError",
     "PORepository",
     "PONotFoundError",
     "POFormNoConflictError",
+    "POInvalidCursorError",
+    "ReportStylePresetRepository",
+    "StylePresetNotFoundError",
+    "StylePresetNameConflictError",
+    "BlobStore",
 ]
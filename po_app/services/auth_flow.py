@@ -6,6 +6,7 @@ from typing import Any, MutableMapping
 
 from ..config import USE_POSTGRES
 from ..db import get_db, iso
+from .change_feed import LOGIN_APPROVALS_CHANNEL
 
 
 class PasskeyRepository:
@@ -401,6 +402,11 @@ class AuthFlowService:
             parsed = parsed.replace(tzinfo=timezone.utc)
         return parsed
 
+    @staticmethod
+    def _notify_login_approvals(cur) -> None:
+        # PostgreSQL only; delivered on commit to the event-stream listeners.
+        cur.execute("SELECT pg_notify(%s, '')", (LOGIN_APPROVALS_CHANNEL,))
+
     def seconds_until(self, value) -> int:
         dt_value = self.to_datetime(value)
         if not dt_value:
@@ -882,6 +888,7 @@ class AuthFlowService:
                                 expires_dt,
                             ),
                         )
+                        self._notify_login_approvals(cur)
             else:
                 if previous_request_id:
                     conn.execute(
@@ -958,7 +965,10 @@ class AuthFlowService:
                             """,
                             (now_dt, next_reason, credential),
                         )
-                        return max(0, int(cur.rowcount or 0))
+                        canceled = max(0, int(cur.rowcount or 0))
+                        if canceled:
+                            self._notify_login_approvals(cur)
+                        return canceled
 
             cur = conn.execute(
                 """
@@ -1032,6 +1042,7 @@ class AuthFlowService:
                             """,
                             (next_status, actor, now_dt, next_reason, request_id),
                         )
+                        self._notify_login_approvals(cur)
                         cur.execute(
                             "SELECT * FROM login_approval_requests WHERE id = %s",
                             (request_id,),
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import json
+import re
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO, RawIOBase
+from typing import Iterator
+
+from pypdf import PdfReader, PdfWriter
+
+from .export_jobs import render_po_payload
+from .po_repository import PORepository
+
+BATCH_EXPORT_MAX_POS = 500
+
+
+@dataclass
+class BatchExportItem:
+    po_id: int
+    filename: str = ""
+    pdf_bytes: bytes | None = None
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.pdf_bytes is not None
+
+
+class _ZipOutputStream(RawIOBase):
+    """Write-only sink that hands zipfile output back in chunks."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _safe_filename_part(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", value).strip("._")
+
+
+class BatchExportService:
+    """Renders many POs in parallel for one ZIP or merged-PDF download.
+
+    Results come back in request order through a bounded window of
+    in-flight renders, so memory tracks the window rather than the batch.
+    A PO that fails is reported and skipped instead of aborting the rest.
+    """
+
+    def __init__(self, *, po_repository: PORepository, parallelism: int = 4):
+        self._po_repository = po_repository
+        self.parallelism = max(1, int(parallelism))
+
+    def resolve_ids(
+        self,
+        *,
+        ids: list | None = None,
+        date_from: str = "",
+        date_to: str = "",
+        company: str = "",
+    ) -> list[int]:
+        if ids:
+            seen: set[int] = set()
+            resolved: list[int] = []
+            for raw in ids:
+                try:
+                    po_id = int(raw)
+                except (TypeError, ValueError):
+                    continue
+                if po_id > 0 and po_id not in seen:
+                    seen.add(po_id)
+                    resolved.append(po_id)
+            return resolved[:BATCH_EXPORT_MAX_POS]
+        if not (date_from or date_to or company):
+            return []
+        return self._po_repository.find_po_ids(
+            date_from=date_from,
+            date_to=date_to,
+            company=company,
+            limit=BATCH_EXPORT_MAX_POS,
+        )
+
+    def _render_one(self, po_id: int) -> BatchExportItem:
+        try:
+            payload = self._po_repository.get_po(po_id)
+            if not payload:
+                return BatchExportItem(po_id=po_id, error="Not found")
+            pdf_bytes = render_po_payload(payload, po_id=po_id)
+        except Exception as exc:
+            return BatchExportItem(po_id=po_id, error=str(exc) or exc.__class__.__name__)
+        form_no = _safe_filename_part(str((payload.get("fields") or {}).get("formNo") or ""))
+        filename = f"PO_{form_no}.pdf" if form_no else f"PO_{po_id}.pdf"
+        return BatchExportItem(po_id=po_id, filename=filename, pdf_bytes=pdf_bytes)
+
+    def render(self, po_ids: list[int]) -> Iterator[BatchExportItem]:
+        window = self.parallelism * 2
+        pending: deque[Future] = deque()
+        remaining = iter(po_ids)
+        with ThreadPoolExecutor(
+            max_workers=self.parallelism,
+            thread_name_prefix="po-batch-export",
+        ) as executor:
+            for po_id in remaining:
+                pending.append(executor.submit(self._render_one, po_id))
+                if len(pending) >= window:
+                    break
+            while pending:
+                item = pending.popleft().result()
+                next_id = next(remaining, None)
+                if next_id is not None:
+                    pending.append(executor.submit(self._render_one, next_id))
+                yield item
+
+    def stream_zip(self, po_ids: list[int]) -> Iterator[bytes]:
+        stream = _ZipOutputStream()
+        used_names: set[str] = set()
+        manifest: list[dict[str, object]] = []
+        # PDFs are already compressed; storing avoids burning CPU for ~0%.
+        with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_STORED) as archive:
+            for item in self.render(po_ids):
+                if not item.ok:
+                    manifest.append({"id": item.po_id, "ok": False, "error": item.error})
+                    continue
+                name = item.filename
+                if name in used_names:
+                    name = f"{name[:-4]}_{item.po_id}.pdf"
+                used_names.add(name)
+                archive.writestr(name, item.pdf_bytes)
+                manifest.append({"id": item.po_id, "ok": True, "file": name})
+                yield stream.drain()
+            archive.writestr("manifest.json", json.dumps({"items": manifest}, indent=2))
+        yield stream.drain()
+
+    def merge_pdf(self, po_ids: list[int]) -> tuple[bytes | None, list[dict[str, object]]]:
+        writer = PdfWriter()
+        failures: list[dict[str, object]] = []
+        merged = 0
+        for item in self.render(po_ids):
+            if not item.ok:
+                failures.append({"id": item.po_id, "error": item.error})
+                continue
+            try:
+                writer.append(PdfReader(BytesIO(item.pdf_bytes)))
+            except Exception as exc:
+                failures.append({"id": item.po_id, "error": str(exc) or exc.__class__.__name__})
+                continue
+            merged += 1
+        if not merged:
+            return None, failures
+        output = BytesIO()
+        writer.write(output)
+        return output.getvalue(), failures
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from ..config import BLOB_PRUNE_GRACE_HOURS, USE_POSTGRES
+from ..db import get_db, iso
+
+BLOB_URL_PREFIX = "/api/blobs/"
+BLOB_MAX_BYTES = 8 * 1024 * 1024
+
+_BLOB_REF_RE = re.compile(r"^/api/blobs/([0-9a-f]{64})$")
+# Raster types only: blobs are served from the app's origin, so a scriptable
+# type such as ``image/svg+xml`` must never be stored.
+BLOB_MIME_TYPES = frozenset({"image/png", "image/jpeg", "image/gif", "image/webp"})
+_DATA_URL_RE = re.compile(r"^data:(image/(?:png|jpeg|gif|webp));base64,", re.IGNORECASE)
+
+# Payload slots that hold images: signature keys, plus the report style logo.
+SIGNATURE_KEYS = ("formCreator", "productionManager", "manager")
+STYLE_IMAGE_KEYS = ("logoDataUrl",)
+
+
+def blob_ref(digest: str) -> str:
+    return f"{BLOB_URL_PREFIX}{digest}"
+
+
+def parse_blob_ref(value) -> str | None:
+    """The SHA-256 a ``/api/blobs/<sha256>`` reference points at, else ``None``."""
+    match = _BLOB_REF_RE.match(str(value or ""))
+    return match.group(1) if match else None
+
+
+def _decode_data_url(value) -> tuple[str, bytes] | None:
+    text = str(value or "")
+    match = _DATA_URL_RE.match(text)
+    if not match:
+        return None
+    try:
+        data = base64.b64decode(text[match.end():], validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    if not data or len(data) > BLOB_MAX_BYTES:
+        return None
+    return match.group(1).lower(), data
+
+
+def _image_values(signatures: dict, report_style: dict) -> list:
+    return [signatures.get(key) for key in SIGNATURE_KEYS] + [
+        report_style.get(key) for key in STYLE_IMAGE_KEYS
+    ]
+
+
+def intern_payload_images(payload: dict, put) -> dict:
+    """A copy of a stored payload with image data URLs replaced by ``put(data, mime)`` refs."""
+    payload = dict(payload)
+    for section, keys in (("signatures", SIGNATURE_KEYS), ("reportStyle", STYLE_IMAGE_KEYS)):
+        values = payload.get(section)
+        if not isinstance(values, dict):
+            continue
+        values = dict(values)
+        for key in keys:
+            decoded = _decode_data_url(values.get(key))
+            if decoded is not None:
+                values[key] = blob_ref(put(decoded[1], decoded[0]))
+        payload[section] = values
+    return payload
+
+
+def payload_blob_refs(payload: dict) -> set[str]:
+    """Digests a stored payload references; each row counts once per blob."""
+    signatures = payload.get("signatures")
+    report_style = payload.get("reportStyle")
+    values = _image_values(
+        signatures if isinstance(signatures, dict) else {},
+        report_style if isinstance(report_style, dict) else {},
+    )
+    return {digest for digest in map(parse_blob_ref, values) if digest}
+
+
+class BlobStore:
+    """Signature and logo images stored once, keyed by their SHA-256.
+
+    Payloads keep a ``/api/blobs/<sha256>`` reference instead of a base64
+    data URL, so an image shared by many POs is stored, backed up and parsed
+    once. ``refcount`` counts the PO rows (live or in the trash) and style
+    presets referencing a blob; callers adjust it in the same transaction
+    as the row. Unreferenced blobs are pruned after a grace period, since a
+    browser may still hold a reference to one in an unsaved draft; storing
+    an unreferenced blob again restarts its grace period.
+    """
+
+    def __init__(
+        self,
+        *,
+        use_postgres: bool = USE_POSTGRES,
+        prune_grace_hours: int = BLOB_PRUNE_GRACE_HOURS,
+    ):
+        self.use_postgres = use_postgres
+        self.prune_grace_hours = max(0, int(prune_grace_hours))
+        self._lock = threading.Lock()
+        self._counters = {"stored": 0, "deduplicated": 0, "reads": 0, "pruned": 0}
+
+    @staticmethod
+    def _row_to_dict(row):
+        if row is None:
+            return None
+        try:
+            return dict(row)
+        except Exception:
+            return None
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def put(self, data: bytes, mime: str) -> str:
+        """Store ``data`` unless it is already stored; returns its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        now = datetime.now(timezone.utc)
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            """
+                            INSERT INTO blobs (sha256, mime, data, size_bytes, refcount, created_at, released_at)
+                            VALUES (%s, %s, %s, %s, 0, %s, %s)
+                            ON CONFLICT (sha256) DO NOTHING
+                            """,
+                            (digest, mime, data, len(data), now, now),
+                        )
+                        inserted = cur.rowcount
+                        if not inserted:
+                            cur.execute(
+                                "UPDATE blobs SET released_at = %s WHERE sha256 = %s AND refcount <= 0",
+                                (now, digest),
+                            )
+            else:
+                inserted = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO blobs
+                    (sha256, mime, data, size_bytes, refcount, created_at, released_at)
+                    VALUES (?, ?, ?, ?, 0, ?, ?)
+                    """,
+                    (digest, mime, data, len(data), iso(now), iso(now)),
+                ).rowcount
+                if not inserted:
+                    conn.execute(
+                        "UPDATE blobs SET released_at = ? WHERE sha256 = ? AND refcount <= 0",
+                        (iso(now), digest),
+                    )
+                conn.commit()
+        finally:
+            conn.close()
+        self._count("stored" if inserted else "deduplicated")
+        if inserted:
+            self.prune()
+        return digest
+
+    def get(self, digest: str) -> tuple[bytes, str] | None:
+        """``(data, mime)`` for a digest, or ``None`` if it is not stored."""
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT data, mime FROM blobs WHERE sha256 = %s", (digest,))
+                        row = cur.fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT data, mime FROM blobs WHERE sha256 = ?",
+                    (digest,),
+                ).fetchone()
+        finally:
+            conn.close()
+        data = self._row_to_dict(row)
+        if not data:
+            return None
+        self._count("reads")
+        mime = str(data["mime"] or "").lower()
+        if mime not in BLOB_MIME_TYPES:
+            mime = "application/octet-stream"
+        return bytes(data["data"]), mime
+
+    def intern(self, value):
+        """A blob reference for an image data URL; any other value is returned as is."""
+        decoded = _decode_data_url(value)
+        if decoded is None:
+            return value
+        mime, data = decoded
+        return blob_ref(self.put(data, mime))
+
+    def intern_images(self, signatures: dict, report_style: dict) -> tuple[dict, dict]:
+        """Copies of ``signatures`` and ``report_style`` with images moved to the store."""
+        signatures = dict(signatures)
+        report_style = dict(report_style)
+        for key in SIGNATURE_KEYS:
+            if key in signatures:
+                signatures[key] = self.intern(signatures[key])
+        for key in STYLE_IMAGE_KEYS:
+            if key in report_style:
+                report_style[key] = self.intern(report_style[key])
+        return signatures, report_style
+
+    def adjust_refs(self, target, added: set[str], removed: set[str]) -> None:
+        """Move refcounts inside the caller's transaction (a cursor or sqlite connection)."""
+        changes = Counter({digest: 1 for digest in added})
+        changes.subtract({digest: 1 for digest in removed})
+        now = datetime.now(timezone.utc)
+        for digest, delta in sorted(changes.items()):
+            if not delta:
+                continue
+            if self.use_postgres:
+                target.execute(
+                    """
+                    UPDATE blobs
+                    SET refcount = GREATEST(refcount + %s, 0),
+                        released_at = CASE WHEN refcount + %s <= 0 THEN %s ELSE NULL END
+                    WHERE sha256 = %s
+                    """,
+                    (delta, delta, now, digest),
+                )
+            else:
+                target.execute(
+                    """
+                    UPDATE blobs
+                    SET refcount = MAX(refcount + ?, 0),
+                        released_at = CASE WHEN refcount + ? <= 0 THEN ? ELSE NULL END
+                    WHERE sha256 = ?
+                    """,
+                    (delta, delta, iso(now), digest),
+                )
+
+    def prune(self) -> int:
+        """Delete blobs nothing has referenced for ``prune_grace_hours``."""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.prune_grace_hours)
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            "DELETE FROM blobs WHERE refcount <= 0 AND released_at < %s",
+                            (cutoff,),
+                        )
+                        pruned = cur.rowcount
+            else:
+                pruned = conn.execute(
+                    "DELETE FROM blobs WHERE refcount <= 0 AND released_at < ?",
+                    (iso(cutoff),),
+                ).rowcount
+                conn.commit()
+        finally:
+            conn.close()
+        if pruned:
+            self._count("pruned", pruned)
+        return pruned
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {"pid": os.getpid(), **counters}
+
+
+_blob_store = BlobStore()
+
+
+def load_blob(digest: str) -> bytes | None:
+    """Blob bytes for the renderer; renders run outside requests, so this uses its own store."""
+    blob = _blob_store.get(digest)
+    return blob[0] if blob else None
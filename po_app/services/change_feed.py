@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import select
+import threading
+import time
+
+from ..config import USE_POSTGRES
+from ..db import get_db, iso, open_db_connection
+
+PO_CHANGES_CHANNEL = "po_changes"
+LOGIN_APPROVALS_CHANNEL = "login_approvals"
+
+_PO_SEQ_SQL = "SELECT COALESCE(MAX(seq), 0) AS seq FROM po_changes"
+_LOGIN_REQUESTS_SQL = """
+    SELECT
+        SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) AS pending,
+        MAX(created_at) AS created,
+        MAX(decision_at) AS decided
+    FROM login_approval_requests
+"""
+
+
+class ChangeFeedBusyError(RuntimeError):
+    pass
+
+
+class ChangeFeedSubscription:
+    def __init__(self, feed: "ChangeFeed"):
+        self._feed = feed
+        self._closed = False
+        self._version, self.po_seq, self._login_marker = feed.snapshot()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def wait(self, timeout: float) -> list[tuple[str, dict[str, object]]]:
+        """Block up to ``timeout`` seconds; return events seen since the last call."""
+        version, po_seq, login_marker = self._feed.wait_for_change(self._version, timeout)
+        events: list[tuple[str, dict[str, object]]] = []
+        if version == self._version:
+            return events
+        self._version = version
+        if po_seq != self.po_seq:
+            self.po_seq = po_seq
+            events.append(("po", {"token": str(po_seq)}))
+        if login_marker != self._login_marker:
+            self._login_marker = login_marker
+            events.append(("login-requests", {}))
+        return events
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._feed._unsubscribe()
+
+
+class ChangeFeed:
+    """Process-wide watcher that wakes every open event stream on change.
+
+    One background thread per process watches the database: LISTEN/NOTIFY
+    on PostgreSQL (with a slow re-check in case a notification is lost),
+    a ``MAX(seq)`` poll of ``po_changes`` on SQLite. The thread only runs
+    while at least one stream is subscribed.
+    """
+
+    def __init__(
+        self,
+        *,
+        use_postgres: bool = USE_POSTGRES,
+        max_subscribers: int = 8,
+        poll_interval_seconds: float = 1.0,
+        listen_recheck_seconds: float = 30.0,
+    ):
+        self.use_postgres = use_postgres
+        self.max_subscribers = max(0, int(max_subscribers))
+        self.poll_interval_seconds = max(0.05, float(poll_interval_seconds))
+        self.listen_recheck_seconds = max(1.0, float(listen_recheck_seconds))
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._subscribers = 0
+        self._version = 0
+        self._po_seq = 0
+        self._login_marker = ""
+
+    def subscribe(self) -> ChangeFeedSubscription:
+        with self._cond:
+            if self._subscribers >= self.max_subscribers:
+                raise ChangeFeedBusyError("Too many live update connections")
+            self._subscribers += 1
+        try:
+            self.refresh()
+        except Exception:
+            self._unsubscribe()
+            raise
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="po-change-feed",
+                    daemon=True,
+                )
+                self._thread.start()
+        return ChangeFeedSubscription(self)
+
+    def _unsubscribe(self) -> None:
+        with self._cond:
+            self._subscribers = max(0, self._subscribers - 1)
+
+    def snapshot(self) -> tuple[int, int, str]:
+        with self._cond:
+            return self._version, self._po_seq, self._login_marker
+
+    def wait_for_change(self, version: int, timeout: float) -> tuple[int, int, str]:
+        with self._cond:
+            self._cond.wait_for(lambda: self._version != version, timeout=max(0.0, timeout))
+            return self._version, self._po_seq, self._login_marker
+
+    def stats(self) -> dict[str, object]:
+        with self._cond:
+            return {
+                "backend": "listen" if self.use_postgres else "poll",
+                "subscribers": self._subscribers,
+                "max_subscribers": self.max_subscribers,
+                "watching": self._thread is not None,
+                "po_seq": self._po_seq,
+            }
+
+    def refresh(self) -> None:
+        po_seq, login_marker = self._read_state()
+        with self._cond:
+            if (po_seq, login_marker) != (self._po_seq, self._login_marker):
+                self._po_seq = po_seq
+                self._login_marker = login_marker
+                self._version += 1
+                self._cond.notify_all()
+
+    def _read_state(self) -> tuple[int, str]:
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(_PO_SEQ_SQL)
+                        po_row = cur.fetchone()
+                        cur.execute(_LOGIN_REQUESTS_SQL)
+                        login_row = cur.fetchone()
+            else:
+                po_row = conn.execute(_PO_SEQ_SQL).fetchone()
+                login_row = conn.execute(_LOGIN_REQUESTS_SQL).fetchone()
+        finally:
+            conn.close()
+        po = dict(po_row) if po_row else {}
+        login = dict(login_row) if login_row else {}
+        marker = "|".join(
+            [
+                str(int(login.get("pending") or 0)),
+                iso(login.get("created")),
+                iso(login.get("decided")),
+            ]
+        )
+        return int(po.get("seq") or 0), marker
+
+    def _run(self) -> None:
+        listener = None
+        try:
+            while True:
+                with self._cond:
+                    if not self._subscribers:
+                        self._thread = None
+                        return
+                try:
+                    if self.use_postgres:
+                        if listener is None:
+                            listener = self._listen()
+                        self._wait_for_notify(listener, self.listen_recheck_seconds)
+                    else:
+                        time.sleep(self.poll_interval_seconds)
+                    self.refresh()
+                except Exception:
+                    # Database hiccup: drop the listener and retry shortly;
+                    # streams keep their heartbeats meanwhile.
+                    self._close_listener(listener)
+                    listener = None
+                    time.sleep(self.poll_interval_seconds * 5)
+        finally:
+            self._close_listener(listener)
+
+    @staticmethod
+    def _listen():
+        conn = open_db_connection()
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {PO_CHANGES_CHANNEL}")
+            cur.execute(f"LISTEN {LOGIN_APPROVALS_CHANNEL}")
+        return conn
+
+    @staticmethod
+    def _wait_for_notify(conn, timeout: float) -> None:
+        ready, _, _ = select.select([conn], [], [], timeout)
+        if not ready:
+            return
+        if hasattr(conn, "poll"):
+            # psycopg2 queues notifications on the connection.
+            conn.poll()
+            del conn.notifies[:]
+        else:
+            # psycopg 3 consumes pending notifications with the next result.
+            conn.execute("SELECT 1")
+
+    @staticmethod
+    def _close_listener(conn) -> None:
+        if conn is None:
+            return
+        try:
+            conn.close()
+        except Exception:
+            pass
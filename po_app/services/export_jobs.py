@@ -0,0 +1,497 @@
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, TypeVar
+
+from ..config import (
+    EXPORT_JOB_CLEANUP_INTERVAL_SECONDS,
+    EXPORT_JOB_DIR,
+    EXPORT_JOB_TTL_SECONDS,
+    EXPORT_JOB_WORKERS,
+    USE_POSTGRES,
+)
+from ..db import epoch_us, get_db, iso
+from .pdf import PdfExport, build_pdf_cached, open_pdf_export
+from .pdf_pool import PdfRenderBusyError, render_pdf, render_pdf_to_path
+from .po_repository import PONotFoundError, PORepository
+
+EXPORT_JOB_BUSY_RETRIES = 5
+
+T = TypeVar("T")
+
+JobHandler = Callable[[dict, Path, Callable[[int], None]], str]
+
+
+class ExportJobNotFoundError(Exception):
+    pass
+
+
+class ExportJobService:
+    """Export jobs tracked in ``export_jobs`` and rendered off the request.
+
+    Rows carry status and progress so any worker process can answer status
+    and download requests; finished files live under ``artifact_dir``
+    until ``expires_at``. The process running a job bumps its ``updated_at``
+    every ``heartbeat_seconds``, so a queued or running job whose heartbeat
+    stops for three beats belongs to a process that died. Expired jobs,
+    those dead jobs, and files no job owns are cleaned up every
+    ``cleanup_interval_seconds`` by a thread started on first use, and
+    whenever a new job is created. Expired jobs read as missing until then.
+    """
+
+    def __init__(
+        self,
+        *,
+        po_repository: PORepository,
+        artifact_dir: Path = EXPORT_JOB_DIR,
+        ttl_seconds: int = EXPORT_JOB_TTL_SECONDS,
+        workers: int = EXPORT_JOB_WORKERS,
+        use_postgres: bool = USE_POSTGRES,
+        cleanup_interval_seconds: int = EXPORT_JOB_CLEANUP_INTERVAL_SECONDS,
+        heartbeat_seconds: int = 30,
+    ):
+        self._po_repository = po_repository
+        self.artifact_dir = Path(artifact_dir)
+        self.ttl_seconds = max(60, int(ttl_seconds))
+        self.workers = max(1, int(workers))
+        self.use_postgres = use_postgres
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._handlers: dict[str, JobHandler] = {"po": self._render_po}
+        self.cleanup_interval_seconds = max(0, int(cleanup_interval_seconds))
+        self.heartbeat_seconds = max(1, int(heartbeat_seconds))
+        self._cleaner: threading.Thread | None = None
+        self._heartbeat: threading.Thread | None = None
+        self._stop = threading.Event()
+        # Jobs this process has queued or is running.
+        self._owned: set[str] = set()
+
+    @staticmethod
+    def _row_to_dict(row):
+        return PORepository._row_to_dict(row)
+
+    def register_handler(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    def create_job(
+        self,
+        kind: str,
+        *,
+        po_id: int | None = None,
+        params: dict | None = None,
+        created_by: str = "",
+    ) -> dict[str, object]:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown export job kind: {kind}")
+        self.start_cleaner()
+        self.cleanup_expired()
+        job_id = secrets.token_urlsafe(18)
+        now = datetime.now(timezone.utc)
+        expires = now + timedelta(seconds=self.ttl_seconds)
+        params_text = json.dumps(params or {}, separators=(",", ":"))
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            """
+                            INSERT INTO export_jobs (
+                                id, kind, po_id, params, status, progress, created_by,
+                                created_at, updated_at, expires_at
+                            )
+                            VALUES (%s, %s, %s, %s, 'queued', 0, %s, %s, %s, %s)
+                            """,
+                            (job_id, kind, po_id, params_text, created_by, now, now, expires),
+                        )
+            else:
+                conn.execute(
+                    """
+                    INSERT INTO export_jobs (
+                        id, kind, po_id, params, status, progress, created_by,
+                        created_at, updated_at, expires_at
+                    )
+                    VALUES (?, ?, ?, ?, 'queued', 0, ?, ?, ?, ?)
+                    """,
+                    (job_id, kind, po_id, params_text, created_by, iso(now), iso(now), iso(expires)),
+                )
+                conn.commit()
+        finally:
+            conn.close()
+        return self.get_job(job_id) or {"id": job_id, "status": "queued"}
+
+    def create_po_job(self, po_id: int, *, created_by: str = "") -> dict[str, object]:
+        if not self._po_repository.get_po(po_id):
+            raise PONotFoundError()
+        return self.create_job("po", po_id=po_id, created_by=created_by)
+
+    def start(self, job_id: str) -> None:
+        """Queue a created job; call after the creating transaction commits."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="po-export-job",
+                )
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(
+                    target=self._heartbeat_loop,
+                    args=(self._stop,),
+                    name="po-export-job-heartbeat",
+                    daemon=True,
+                )
+                self._heartbeat.start()
+            self._owned.add(job_id)
+            executor = self._executor
+        executor.submit(self.run, job_id)
+
+    def run(self, job_id: str) -> None:
+        with self._executor_lock:
+            self._owned.add(job_id)
+        try:
+            self._run(job_id)
+        finally:
+            with self._executor_lock:
+                self._owned.discard(job_id)
+
+    def _run(self, job_id: str) -> None:
+        job = self._get_row(job_id)
+        if not job or job.get("status") != "queued":
+            return
+        handler = self._handlers.get(str(job.get("kind") or ""))
+        self._update(job_id, status="running", progress=5)
+        artifact = f"{job_id}.part"
+        path = self.artifact_dir / artifact
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown export job kind: {job.get('kind')}")
+            self.artifact_dir.mkdir(parents=True, exist_ok=True)
+            filename = handler(job, path, lambda value: self._update(job_id, progress=value))
+            final_name = f"{job_id}{Path(filename).suffix or '.bin'}"
+            os.replace(path, self.artifact_dir / final_name)
+        except Exception as exc:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            self._update(
+                job_id,
+                status="failed",
+                error=str(exc) or exc.__class__.__name__,
+                finished=True,
+            )
+            return
+        self._update(
+            job_id,
+            status="done",
+            progress=100,
+            filename=filename,
+            artifact=final_name,
+            size_bytes=(self.artifact_dir / final_name).stat().st_size,
+            finished=True,
+        )
+
+    def _render_po(self, job: dict, path: Path, report_progress: Callable[[int], None]) -> str:
+        po_id = int(job.get("po_id") or 0)
+        payload = self._po_repository.get_po(po_id)
+        if not payload:
+            raise PONotFoundError()
+        report_progress(20)
+        export = open_po_export(payload, po_id=po_id)
+        report_progress(90)
+        with export.open() as source, open(path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        form_no = str((payload.get("fields") or {}).get("formNo") or "").strip()
+        return f"PO_{form_no}.pdf" if form_no else f"PO_{po_id}.pdf"
+
+    def _get_row(self, job_id: str) -> dict | None:
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT * FROM export_jobs WHERE id = %s", (job_id,))
+                        row = cur.fetchone()
+            else:
+                row = conn.execute("SELECT * FROM export_jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return self._row_to_dict(row)
+
+    def _update(self, job_id: str, *, finished: bool = False, **values) -> None:
+        now = datetime.now(timezone.utc)
+        values["updated_at"] = now
+        if finished:
+            values["finished_at"] = now
+        columns = sorted(values)
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                assignments = ", ".join(f"{column} = %s" for column in columns)
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            f"UPDATE export_jobs SET {assignments} WHERE id = %s",
+                            [values[column] for column in columns] + [job_id],
+                        )
+            else:
+                assignments = ", ".join(f"{column} = ?" for column in columns)
+                params = [
+                    iso(values[column]) if isinstance(values[column], datetime) else values[column]
+                    for column in columns
+                ]
+                conn.execute(
+                    f"UPDATE export_jobs SET {assignments} WHERE id = ?",
+                    params + [job_id],
+                )
+                conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _expired(row: dict) -> bool:
+        expires_us = epoch_us(row.get("expires_at"))
+        return expires_us is not None and expires_us < epoch_us(datetime.now(timezone.utc))
+
+    def get_job(self, job_id: str) -> dict[str, object] | None:
+        self.start_cleaner()
+        row = self._get_row(job_id)
+        return self._public(row) if row and not self._expired(row) else None
+
+    @staticmethod
+    def _public(row: dict) -> dict[str, object]:
+        return {
+            "id": str(row.get("id") or ""),
+            "kind": str(row.get("kind") or ""),
+            "po_id": row.get("po_id"),
+            "params": json.loads(row.get("params") or "{}"),
+            "status": str(row.get("status") or ""),
+            "progress": int(row.get("progress") or 0),
+            "error": str(row.get("error") or ""),
+            "filename": str(row.get("filename") or ""),
+            "size_bytes": int(row.get("size_bytes") or 0),
+            "created_at": iso(row.get("created_at")),
+            "updated_at": iso(row.get("updated_at")),
+            "finished_at": iso(row.get("finished_at")),
+            "expires_at": iso(row.get("expires_at")),
+        }
+
+    def artifact_path(self, job_id: str) -> tuple[dict[str, object], Path | None]:
+        """Job view and its finished file (``None`` once purged)."""
+        self.start_cleaner()
+        row = self._get_row(job_id)
+        if not row or self._expired(row):
+            raise ExportJobNotFoundError()
+        job = self._public(row)
+        artifact = str(row.get("artifact") or "")
+        path = self.artifact_dir / artifact if artifact else None
+        if path is None or not path.is_file():
+            return job, None
+        return job, path
+
+    def _touch(self, job_ids: list[str]) -> None:
+        now = datetime.now(timezone.utc)
+        marks = ", ".join(["%s" if self.use_postgres else "?"] * len(job_ids))
+        query = (
+            "UPDATE export_jobs SET updated_at = {p} "
+            f"WHERE status IN ('queued', 'running') AND id IN ({marks})"
+        )
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(query.format(p="%s"), [now, *job_ids])
+            else:
+                conn.execute(query.format(p="?"), [iso(now), *job_ids])
+                conn.commit()
+        finally:
+            conn.close()
+
+    def _heartbeat_loop(self, stop: threading.Event) -> None:
+        while not stop.wait(self.heartbeat_seconds):
+            with self._executor_lock:
+                job_ids = sorted(self._owned)
+            if not job_ids:
+                continue
+            try:
+                self._touch(job_ids)
+            except Exception:
+                continue
+
+    def cleanup_expired(self) -> int:
+        now = datetime.now(timezone.utc)
+        stale_cutoff = now - timedelta(seconds=3 * self.heartbeat_seconds)
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            """
+                            UPDATE export_jobs
+                            SET status = 'failed',
+                                error = 'Export worker stopped before finishing.',
+                                finished_at = %s,
+                                updated_at = %s
+                            WHERE status IN ('queued', 'running')
+                              AND updated_at < %s
+                            """,
+                            (now, now, stale_cutoff),
+                        )
+                        cur.execute(
+                            "DELETE FROM export_jobs WHERE expires_at < %s RETURNING artifact",
+                            (now,),
+                        )
+                        rows = cur.fetchall() or []
+                        cur.execute("SELECT id FROM export_jobs WHERE status IN ('queued', 'running')")
+                        live = cur.fetchall() or []
+            else:
+                conn.execute(
+                    """
+                    UPDATE export_jobs
+                    SET status = 'failed',
+                        error = 'Export worker stopped before finishing.',
+                        finished_at = ?,
+                        updated_at = ?
+                    WHERE status IN ('queued', 'running')
+                      AND updated_at < ?
+                    """,
+                    (iso(now), iso(now), iso(stale_cutoff)),
+                )
+                rows = conn.execute(
+                    "SELECT artifact FROM export_jobs WHERE expires_at < ?",
+                    (iso(now),),
+                ).fetchall()
+                conn.execute("DELETE FROM export_jobs WHERE expires_at < ?", (iso(now),))
+                live = conn.execute(
+                    "SELECT id FROM export_jobs WHERE status IN ('queued', 'running')"
+                ).fetchall()
+                conn.commit()
+        finally:
+            conn.close()
+        removed = 0
+        for row in rows:
+            artifact = str((self._row_to_dict(row) or {}).get("artifact") or "")
+            if not artifact:
+                continue
+            try:
+                (self.artifact_dir / artifact).unlink()
+                removed += 1
+            except OSError:
+                pass
+        live_ids = {str((self._row_to_dict(row) or {}).get("id") or "") for row in live}
+        orphan_cutoff = now - timedelta(seconds=self.ttl_seconds)
+        return removed + self._remove_orphans(orphan_cutoff.timestamp(), live_ids)
+
+    def _remove_orphans(self, cutoff: float, live_ids: set[str]) -> int:
+        # A job expires ``ttl_seconds`` after it was created, so any file not
+        # written since then belongs to an expired job or a crashed render,
+        # unless a job that is still alive owns it.
+        removed = 0
+        try:
+            paths = list(self.artifact_dir.iterdir())
+        except OSError:
+            return 0
+        for path in paths:
+            if path.name.split(".", 1)[0] in live_ids:
+                continue
+            try:
+                if path.is_file() and path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def _cleanup_loop(self, stop: threading.Event) -> None:
+        while not stop.wait(self.cleanup_interval_seconds):
+            try:
+                self.cleanup_expired()
+            except Exception:
+                continue
+
+    def start_cleaner(self) -> bool:
+        """Start the cleanup thread on first use; ``False`` if disabled or already running."""
+        if not self.cleanup_interval_seconds:
+            return False
+        with self._executor_lock:
+            if self._cleaner is not None:
+                return False
+            self._cleaner = threading.Thread(
+                target=self._cleanup_loop,
+                args=(self._stop,),
+                name="po-export-job-cleanup",
+                daemon=True,
+            )
+        self._cleaner.start()
+        return True
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+            cleaner, self._cleaner = self._cleaner, None
+            heartbeat, self._heartbeat = self._heartbeat, None
+            stop, self._stop = self._stop, threading.Event()
+        if executor is not None:
+            executor.shutdown(wait=True)
+        stop.set()
+        for thread in (cleaner, heartbeat):
+            if thread is not None:
+                thread.join()
+
+
+def _retry_while_busy(render: Callable[[], T]) -> T:
+    attempts = 0
+    while True:
+        try:
+            return render()
+        except PdfRenderBusyError as exc:
+            attempts += 1
+            if attempts > EXPORT_JOB_BUSY_RETRIES:
+                raise
+            time.sleep(exc.retry_after)
+
+
+def render_po_payload(payload: dict, *, po_id: int | None = None) -> bytes:
+    """Cached render of a stored PO payload, waiting out a busy render pool."""
+    fields = payload.get("fields") or {}
+    items = payload.get("items") or []
+    signatures = payload.get("signatures") or {}
+    report_style = payload.get("reportStyle") or {}
+    return _retry_while_busy(
+        lambda: build_pdf_cached(
+            fields,
+            items,
+            signatures,
+            report_style,
+            po_id=po_id,
+            render=render_pdf,
+        )
+    )
+
+
+def open_po_export(payload: dict, *, po_id: int | None = None) -> PdfExport:
+    """Like ``render_po_payload`` but as a file, without loading it into memory."""
+    fields = payload.get("fields") or {}
+    items = payload.get("items") or []
+    signatures = payload.get("signatures") or {}
+    report_style = payload.get("reportStyle") or {}
+    return _retry_while_busy(
+        lambda: open_pdf_export(
+            fields,
+            items,
+            signatures,
+            report_style,
+            po_id=po_id,
+            render_to_path=render_pdf_to_path,
+        )
+    )
@@ -4,10 +4,11 @@ import json
 import shutil
 import subprocess
 import sys
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 
-from ..db import iso
+from ..db import dispose_db_pool, init_db, iso
 
 
 class MaintenanceError(RuntimeError):
@@ -91,6 +92,7 @@ class BackupService:
         self._auto_backup_enabled = auto_backup_enabled
         self._auto_backup_interval_hours = auto_backup_interval_hours
         self._auto_backup_retention_days = auto_backup_retention_days
+        self._restore_lock = threading.Lock()
 
     def safe_backup_name(self, file_name: str) -> str:
         clean_name = Path(file_name).name
@@ -194,13 +196,21 @@ class BackupService:
         backup_path = self._backup_dir / safe_name
         if not backup_path.exists():
             raise FileNotFoundError("Backup file not found")
-        code, output = self._runner.run_script(
-            "restore_db.ps1",
-            ["-BackupFile", safe_name, "-Force"],
-        )
-        if code != 0:
-            raise MaintenanceError(output or "Restore failed")
-        return {"ok": True, "file": safe_name, "output": output}
+        with self._restore_lock:
+            code, output = self._runner.run_script(
+                "restore_db.ps1",
+                ["-BackupFile", safe_name, "-Force"],
+            )
+            if code != 0:
+                raise MaintenanceError(output or "Restore failed")
+            # Pooled connections still point at the replaced database, and an
+            # older backup lacks tables and columns added since it was taken.
+            dispose_db_pool()
+            try:
+                migrations = init_db()
+            except Exception as exc:
+                raise MaintenanceError(f"Restored, but migrating the schema failed: {exc}") from exc
+        return {"ok": True, "file": safe_name, "output": output, "migrations": migrations}
 
     def delete_backup(self, file_name: str) -> dict[str, object]:
         raw_name = str(file_name or "").strip()
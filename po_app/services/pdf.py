@@ -1,16 +1,53 @@
 from __future__ import annotations
 
 import base64
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
+from typing import BinaryIO, Callable
 
-from reportlab.lib import colors
+from PIL import Image
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.utils import ImageReader
-from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen import canvas
 
-from ..config import LOGO_PATH, SIGNATURES
+from ..config import (
+    IMAGE_CACHE_MAX_MB,
+    LOGO_PATH,
+    PDF_CACHE_DIR,
+    PDF_CACHE_ENABLED,
+    PDF_CACHE_MAX_MB,
+    PDF_IMAGE_DPI,
+    PDF_IMAGE_JPEG_QUALITY,
+    PDF_SPOOL_MAX_MB,
+    PDF_TEMPLATE_MODE,
+    SIGNATURES,
+    TEMPLATE_PATH,
+)
+from .blob_store import load_blob, parse_blob_ref
+from .pdf_layout import PdfLayout, TableLayout, TableRow, paginate_table
+from .pdf_template import PdfTemplate
+from .report_style import (
+    MARGIN_X,
+    MARGIN_Y,
+    PAGE_HEIGHT,
+    PAGE_WIDTH,
+    TABLE_WIDTH,
+    ReportStyleInput,
+    ResolvedReportStyle,
+    resolve_report_style,
+)
+from .text_metrics import fit_text, wrap_text
+
+# Bump whenever build_pdf output changes so cached renders are not reused.
+PDF_RENDERER_VERSION = "4"
 
 
 def _format_date(value: str) -> str:
@@ -27,98 +64,11 @@ def _format_date(value: str) -> str:
 
 
 def _fit_text(text: str, max_width: float, font_name: str, font_size: float) -> str:
-    if not text:
-        return ""
-    if stringWidth(text, font_name, font_size) <= max_width:
-        return text
-    ellipsis = "..."
-    trimmed = text
-    while trimmed and stringWidth(trimmed + ellipsis, font_name, font_size) > max_width:
-        trimmed = trimmed[:-1]
-    return (trimmed + ellipsis) if trimmed else ""
+    return fit_text(text, max_width, font_name, font_size)
 
 
 def _wrap_text(text: str, max_width: float, font_name: str, font_size: float) -> list[str]:
-    if not text:
-        return [""]
-    words = str(text).split()
-    if not words:
-        return [""]
-    lines: list[str] = []
-    current = ""
-    for word in words:
-        candidate = word if not current else f"{current} {word}"
-        if stringWidth(candidate, font_name, font_size) <= max_width:
-            current = candidate
-            continue
-        if current:
-            lines.append(current)
-            current = ""
-        if stringWidth(word, font_name, font_size) <= max_width:
-            current = word
-            continue
-        chunk = ""
-        for ch in word:
-            cand = chunk + ch
-            if stringWidth(cand, font_name, font_size) <= max_width:
-                chunk = cand
-            else:
-                if chunk:
-                    lines.append(chunk)
-                chunk = ch
-        current = chunk
-    if current:
-        lines.append(current)
-    return lines
-
-
-def _parse_hex_color(value: str | None, fallback: colors.Color) -> colors.Color:
-    raw = str(value or "").strip()
-    if not raw:
-        return fallback
-    if not raw.startswith("#"):
-        raw = f"#{raw}"
-    if len(raw) != 7:
-        return fallback
-    try:
-        int(raw[1:], 16)
-    except ValueError:
-        return fallback
-    try:
-        return colors.HexColor(raw)
-    except Exception:
-        return fallback
-
-
-def _coerce_bool(value, default: bool = True) -> bool:
-    if value is None:
-        return default
-    if isinstance(value, bool):
-        return value
-    if isinstance(value, (int, float)):
-        return bool(value)
-    text = str(value).strip().lower()
-    if text in {"1", "true", "yes", "on"}:
-        return True
-    if text in {"0", "false", "no", "off"}:
-        return False
-    return default
-
-
-def _muted_color_from_main(main_color: colors.Color) -> colors.Color:
-    red = float(getattr(main_color, "red", 0.06))
-    green = float(getattr(main_color, "green", 0.1))
-    blue = float(getattr(main_color, "blue", 0.18))
-    luminance = (0.2126 * red) + (0.7152 * green) + (0.0722 * blue)
-    if luminance < 0.45:
-        lift = 0.42
-        return colors.Color(
-            red + ((1 - red) * lift),
-            green + ((1 - green) * lift),
-            blue + ((1 - blue) * lift),
-        )
-    drop = 0.55
-    return colors.Color(red * drop, green * drop, blue * drop)
+    return wrap_text(text, max_width, font_name, font_size)
 
 
 def _center_text(
@@ -141,6 +91,9 @@ def _center_text(
 def _data_url_to_bytes(data_url: str | None) -> bytes | None:
     if not data_url:
         return None
+    digest = parse_blob_ref(data_url)
+    if digest:
+        return load_blob(digest)
     if not data_url.startswith("data:"):
         return None
     try:
@@ -155,6 +108,299 @@ def _data_url_to_bytes(data_url: str | None) -> bytes | None:
         return None
 
 
+def _open_data_url_image(data_url: str) -> Image.Image | None:
+    image_bytes = _data_url_to_bytes(data_url)
+    if not image_bytes:
+        return None
+    return Image.open(BytesIO(image_bytes))
+
+
+# Image cache entries are JPEG bytes, which reportlab embeds without
+# decoding, or loaded PIL images; each render wraps one in its own reader.
+def _image_reader(source: bytes | Image.Image) -> ImageReader:
+    return ImageReader(BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _decode_image(data: bytes) -> bytes | Image.Image:
+    with Image.open(BytesIO(data)) as image:
+        if image.format == "JPEG":
+            return data
+        image.load()
+        # A copy drops the format and file handle, so reportlab reads pixels.
+        return image.copy()
+
+
+def _source_size(source: bytes | Image.Image) -> tuple[int, int]:
+    if isinstance(source, bytes):
+        with Image.open(BytesIO(source)) as image:
+            return image.size
+    return source.size
+
+
+def _normalized_source(
+    image: Image.Image,
+    size: tuple[int, int],
+    *,
+    background: tuple[int, int, int] | None = None,
+    jpeg_quality: int = PDF_IMAGE_JPEG_QUALITY,
+) -> bytes | Image.Image | None:
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    too_large = image.width > size[0] or image.height > size[1]
+    if not too_large and (not has_alpha or background is None):
+        return None
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    if too_large:
+        image.thumbnail(size, Image.LANCZOS)
+    if has_alpha:
+        if background is None:
+            return image
+        flat = Image.new("RGB", image.size, background)
+        flat.paste(image, mask=image.getchannel("A"))
+        image = flat
+    palette = image.getcolors(maxcolors=256)
+    if palette is not None:
+        if all(r == g == b for _, (r, g, b) in palette):
+            image = image.convert("L")
+        return image
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=jpeg_quality, optimize=True)
+    return buffer.getvalue()
+
+
+def normalize_image(
+    image: Image.Image,
+    size: tuple[int, int],
+    *,
+    background: tuple[int, int, int] | None = None,
+    jpeg_quality: int = PDF_IMAGE_JPEG_QUALITY,
+) -> ImageReader | None:
+    """Shrink ``image`` to fit ``size`` pixels and re-encode it for embedding.
+
+    Transparency is flattened onto ``background`` when one is given.
+    Few-colour art such as signatures stays lossless (grayscale if it has no
+    colour); anything else becomes a JPEG, which reportlab embeds as is
+    instead of storing raw pixels. Returns ``None`` when the original is
+    already small and opaque enough to use unchanged.
+    """
+    source = _normalized_source(image, size, background=background, jpeg_quality=jpeg_quality)
+    return _image_reader(source) if source is not None else None
+
+
+class ImageCache:
+    """Decoded images shared by every render in this process.
+
+    File images are keyed by path, mtime and size, so replacing a logo or
+    signature file is picked up on the next render. Data-URL images are
+    keyed by a digest of the URL, which skips base64 decoding on a hit;
+    blob-store references are keyed by their content digest, so a hit also
+    skips the database read.
+    Entries are evicted least-recently-used once their estimated decoded
+    size passes ``max_bytes``.
+
+    Passing ``fit`` (the box in points an image is drawn into) returns the
+    image normalized for ``dpi`` in that box instead; those versions are
+    cached next to the originals. ``dpi=0`` always returns the original.
+
+    The cache holds JPEG bytes or loaded PIL images, never readers: every
+    lookup builds a new ``ImageReader``, since reportlab keeps per-draw state
+    on a reader and one reader must not be drawn by two threads.
+    """
+
+    def __init__(self, *, max_bytes: int, dpi: int = 0):
+        self.max_bytes = max(0, int(max_bytes))
+        self.dpi = max(0, int(dpi))
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[bytes | Image.Image, int]] = OrderedDict()
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "oversize": 0}
+
+    def _lookup(self, key: tuple) -> bytes | Image.Image | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry[0]
+
+    def _store(self, key: tuple, source: bytes | Image.Image, raw_size: int) -> bytes | Image.Image:
+        img_w, img_h = _source_size(source)
+        cost = int(img_w) * int(img_h) * 4 + raw_size
+        if cost > self.max_bytes:
+            with self._lock:
+                self._counters["oversize"] += 1
+            return source
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (source, cost)
+            self._bytes += cost
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_cost) = self._entries.popitem(last=False)
+                self._bytes -= evicted_cost
+                self._counters["evictions"] += 1
+        return source
+
+    def _fitted(
+        self,
+        key: tuple,
+        fit: tuple[float, float],
+        background: tuple[int, int, int] | None,
+        load: Callable[[], bytes | Image.Image | None],
+        open_image: Callable[[], Image.Image | None],
+    ) -> bytes | Image.Image | None:
+        size = (
+            max(1, math.ceil(fit[0] * self.dpi / 72)),
+            max(1, math.ceil(fit[1] * self.dpi / 72)),
+        )
+        fitted_key = (*key, "fit", size, background)
+        source = self._lookup(fitted_key)
+        if source is not None:
+            return source
+        image = open_image()
+        if image is None:
+            return None
+        with image:
+            source = _normalized_source(image, size, background=background)
+        if source is None:
+            source = load()
+            if source is None:
+                return None
+        return self._store(fitted_key, source, 0)
+
+    def _path_source(
+        self,
+        path: Path,
+        fit: tuple[float, float] | None = None,
+        background: tuple[int, int, int] | None = None,
+    ) -> bytes | Image.Image | None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        key = ("file", str(path), stat.st_mtime_ns, stat.st_size)
+        if fit is not None and self.dpi:
+            return self._fitted(
+                key,
+                fit,
+                background,
+                lambda: self._path_source(path),
+                lambda: Image.open(path),
+            )
+        source = self._lookup(key)
+        if source is None:
+            source = self._store(key, _decode_image(path.read_bytes()), stat.st_size)
+        return source
+
+    def _data_url_source(
+        self,
+        data_url: str | None,
+        fit: tuple[float, float] | None = None,
+        background: tuple[int, int, int] | None = None,
+    ) -> bytes | Image.Image | None:
+        if not data_url:
+            return None
+        digest = parse_blob_ref(data_url)
+        if digest:
+            key = ("blob", digest)
+        else:
+            key = ("data", hashlib.sha256(data_url.encode("utf-8", "replace")).hexdigest())
+        if fit is not None and self.dpi:
+            return self._fitted(
+                key,
+                fit,
+                background,
+                lambda: self._data_url_source(data_url),
+                lambda: _open_data_url_image(data_url),
+            )
+        source = self._lookup(key)
+        if source is not None:
+            return source
+        image_bytes = _data_url_to_bytes(data_url)
+        if not image_bytes:
+            return None
+        return self._store(key, _decode_image(image_bytes), len(image_bytes))
+
+    def from_path(
+        self,
+        path: Path,
+        *,
+        fit: tuple[float, float] | None = None,
+        background: tuple[int, int, int] | None = None,
+    ) -> ImageReader | None:
+        source = self._path_source(path, fit, background)
+        return _image_reader(source) if source is not None else None
+
+    def from_data_url(
+        self,
+        data_url: str | None,
+        *,
+        fit: tuple[float, float] | None = None,
+        background: tuple[int, int, int] | None = None,
+    ) -> ImageReader | None:
+        """Reader for a base64 data URL or blob reference, or ``None`` if it is neither."""
+        source = self._data_url_source(data_url, fit, background)
+        return _image_reader(source) if source is not None else None
+
+    def warm(self, paths: list[Path]) -> int:
+        loaded = 0
+        for path in paths:
+            try:
+                if self.from_path(path) is not None:
+                    loaded += 1
+            except Exception:
+                continue
+        return loaded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+            used_bytes = self._bytes
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "pid": os.getpid(),
+            "entries": entries,
+            "bytes": used_bytes,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": round(counters["hits"] / lookups, 4) if lookups else None,
+            **counters,
+        }
+
+
+_image_cache = ImageCache(max_bytes=IMAGE_CACHE_MAX_MB * 1024 * 1024, dpi=PDF_IMAGE_DPI)
+
+
+def warm_image_cache() -> int:
+    """Decode the logo and signature files ahead of the first render."""
+    return _image_cache.warm([LOGO_PATH, *SIGNATURES.values()])
+
+
+def get_image_cache_stats() -> dict[str, object]:
+    return _image_cache.stats()
+
+
+_pdf_template = PdfTemplate(TEMPLATE_PATH)
+
+
+def warm_pdf_template() -> int:
+    """Parse the template ahead of the first overlay render; returns its page count."""
+    if PDF_TEMPLATE_MODE != "overlay":
+        return 0
+    return len(_pdf_template.pages())
+
+
+def get_pdf_template_stats() -> dict[str, object]:
+    return {"mode": PDF_TEMPLATE_MODE, **_pdf_template.stats()}
+
+
 def _draw_signature(
     pdf_canvas: canvas.Canvas,
     image_path: Path,
@@ -163,159 +409,62 @@ def _draw_signature(
     y_center: float,
     max_width: float,
     max_height: float,
+    background: tuple[int, int, int] | None = None,
 ) -> None:
-    image_bytes = _data_url_to_bytes(data_url)
-    if image_bytes:
-        try:
-            img = ImageReader(BytesIO(image_bytes))
-            img_w, img_h = img.getSize()
-            scale = min(max_width / img_w, max_height / img_h)
-            draw_w = img_w * scale
-            draw_h = img_h * scale
-            draw_x = x + (max_width - draw_w) / 2
-            draw_y = y_center - (draw_h / 2)
-            pdf_canvas.drawImage(
-                img,
-                draw_x,
-                draw_y,
-                width=draw_w,
-                height=draw_h,
-                mask="auto",
-                preserveAspectRatio=True,
-                anchor="c",
-            )
-            return
-        except Exception:
-            pass
-
-    if image_path.exists():
+    fit = (max_width, max_height)
+    try:
+        img = _image_cache.from_data_url(data_url, fit=fit, background=background)
+    except Exception:
+        img = None
+    if img is None and image_path.exists():
         try:
-            img = ImageReader(str(image_path))
-            img_w, img_h = img.getSize()
-            scale = min(max_width / img_w, max_height / img_h)
-            draw_w = img_w * scale
-            draw_h = img_h * scale
-            draw_x = x + (max_width - draw_w) / 2
-            draw_y = y_center - (draw_h / 2)
-            pdf_canvas.drawImage(
-                img,
-                draw_x,
-                draw_y,
-                width=draw_w,
-                height=draw_h,
-                mask="auto",
-                preserveAspectRatio=True,
-                anchor="c",
-            )
+            img = _image_cache.from_path(image_path, fit=fit, background=background)
         except Exception:
-            pass
+            img = None
+    if img is None:
+        return
+    try:
+        img_w, img_h = img.getSize()
+        scale = min(max_width / img_w, max_height / img_h)
+        draw_w = img_w * scale
+        draw_h = img_h * scale
+        draw_x = x + (max_width - draw_w) / 2
+        draw_y = y_center - (draw_h / 2)
+        pdf_canvas.drawImage(
+            img,
+            draw_x,
+            draw_y,
+            width=draw_w,
+            height=draw_h,
+            mask="auto",
+            preserveAspectRatio=True,
+            anchor="c",
+        )
+    except Exception:
+        pass
 
 
-def build_pdf(
+def layout_pdf(
     fields: dict,
     items: list[dict],
-    signatures: dict | None = None,
-    report_style: dict | None = None,
-) -> bytes:
-    report_style = report_style or {}
-    density = str(report_style.get("density") or "normal").strip().lower()
-    if density not in {"compact", "normal", "comfortable"}:
-        density = "normal"
-
-    table_theme = str(report_style.get("tableTheme") or "zebra").strip().lower()
-    if table_theme not in {"zebra", "solid"}:
-        table_theme = "zebra"
-
-    title_align = str(report_style.get("titleAlign") or "center").strip().lower()
-    if title_align not in {"center", "left"}:
-        title_align = "center"
-
-    try:
-        font_scale = int(report_style.get("fontScale", 100))
-    except (TypeError, ValueError):
-        font_scale = 100
-    font_scale = max(90, min(120, font_scale))
-    font_factor = font_scale / 100.0
-    density_factor_map = {"compact": 0.88, "normal": 1.0, "comfortable": 1.12}
-    density_factor = density_factor_map.get(density, 1.0)
-    title_text = str(report_style.get("titleText") or "").strip() or "PURCHASING ORDER"
-    note_text = (
-        str(report_style.get("noteText") or "").strip()
-        or "Kindly present your offer for the following items:"
-    )
-    empty_items_text = str(report_style.get("emptyText") or "").strip() or "No items yet"
-    form_label = str(report_style.get("formLabel") or "").strip() or "form no."
-    date_label = str(report_style.get("dateLabel") or "").strip() or "Date"
-    to_label = str(report_style.get("toLabel") or "").strip() or "To :"
-    postal_label = str(report_style.get("postalLabel") or "").strip() or "POSTAL CODE :"
-    show_row_number = _coerce_bool(report_style.get("showRowNumber"), True)
-    show_signatures = _coerce_bool(report_style.get("showSignatures"), False)
-    logo_data_url = str(report_style.get("logoDataUrl") or "").strip()
-    signature_title = str(report_style.get("signatureTitle") or "").strip() or "Signature"
-    sign_label_form_creator = (
-        str(report_style.get("signLabelFormCreator") or "").strip() or "Form Creator"
-    )
-    sign_label_production_manager = (
-        str(report_style.get("signLabelProductionManager") or "").strip()
-        or "Production Manager"
-    )
-    sign_label_manager = str(report_style.get("signLabelManager") or "").strip() or "Manager"
-
-    header_index = str(report_style.get("headIndex") or "").strip() or "#"
-    header_model = str(report_style.get("headModel") or "").strip() or "NO (Model)"
-    header_item = str(report_style.get("headItem") or "").strip() or "Item"
-    header_qty = str(report_style.get("headQty") or "").strip() or "Qty"
-    header_unit = str(report_style.get("headUnit") or "").strip() or "Unit"
-    header_plan = str(report_style.get("headPlan") or "").strip() or "Plan No"
-    show_logo = _coerce_bool(report_style.get("showLogo"), True)
-    logo_align = str(report_style.get("logoAlign") or "left").strip().lower()
-    if logo_align not in {"left", "center", "right"}:
-        logo_align = "left"
-
-    try:
-        logo_scale = int(report_style.get("logoScale", 100))
-    except (TypeError, ValueError):
-        logo_scale = 100
-    logo_scale = max(60, min(180, logo_scale))
-
-    page_bg_color = _parse_hex_color(report_style.get("paperColor"), colors.HexColor("#FFFFFF"))
-    text_main_color = _parse_hex_color(report_style.get("textColor"), colors.HexColor("#0F172A"))
-    text_muted_color = _muted_color_from_main(text_main_color)
-    table_outer_border_color = _parse_hex_color(
-        report_style.get("tableBorderOuter"),
-        colors.HexColor("#CBD5E1"),
-    )
-    table_inner_border_color = _parse_hex_color(
-        report_style.get("tableBorderInner"),
-        colors.HexColor("#E2E8F0"),
-    )
-    table_header_bg_color = _parse_hex_color(
-        report_style.get("tableHeaderBg"),
-        colors.HexColor("#0F172A"),
-    )
-    table_header_text_color = _parse_hex_color(
-        report_style.get("tableHeaderText"),
-        colors.HexColor("#FFFFFF"),
-    )
-    table_row_odd_bg = _parse_hex_color(
-        report_style.get("tableRowOdd"),
-        colors.HexColor("#FFFFFF"),
-    )
-    parsed_row_even = _parse_hex_color(
-        report_style.get("tableRowEven"),
-        colors.HexColor("#F8FAFC"),
-    )
-    table_row_even_bg = table_row_odd_bg if table_theme == "solid" else parsed_row_even
-
-    page_w, page_h = A4
-    margin_x = 36
-    margin_y = 36
+    report_style: ReportStyleInput = None,
+) -> PdfLayout:
+    """Geometry and pagination for ``build_pdf``, without drawing anything."""
+    style = resolve_report_style(report_style)
+    page_w, page_h = PAGE_WIDTH, PAGE_HEIGHT
+    margin_x = MARGIN_X
+    margin_y = MARGIN_Y
     band_height = 74
     header_gap = 12
-    line_gap = 12 * font_factor
-    title_font = 16 * font_factor
-    body_font = 10 * font_factor
-    small_font = 9 * font_factor
+    line_gap = style.line_gap
+    header_h = style.header_height
+    row_h = style.row_height
+    item_line_height = style.item_line_height
+    max_item_lines = 10
+    row_pad_v = style.row_pad_v
+    sig_block_height = style.signature_block_height
+    sig_block_gap = 24
+    sig_bottom_margin = 18
 
     items = [
         row
@@ -325,52 +474,9 @@ def build_pdf(
             for key in ("model", "item", "qty", "unit", "plan")
         )
     ]
-    signatures = signatures or {}
-
-    table_width = page_w - (2 * margin_x)
-    if show_row_number:
-        table_columns = [
-            {"key": "number", "label": header_index, "ratio": 0.06},
-            {"key": "model", "label": header_model, "ratio": 0.18},
-            {"key": "item", "label": header_item, "ratio": 0.40},
-            {"key": "qty", "label": header_qty, "ratio": 0.10},
-            {"key": "unit", "label": header_unit, "ratio": 0.10},
-            {"key": "plan", "label": header_plan, "ratio": 0.16},
-        ]
-    else:
-        table_columns = [
-            {"key": "model", "label": header_model, "ratio": 0.20},
-            {"key": "item", "label": header_item, "ratio": 0.44},
-            {"key": "qty", "label": header_qty, "ratio": 0.11},
-            {"key": "unit", "label": header_unit, "ratio": 0.10},
-            {"key": "plan", "label": header_plan, "ratio": 0.15},
-        ]
-
-    col_widths = [table_width * col["ratio"] for col in table_columns]
-    col_x = [margin_x]
-    for width in col_widths:
-        col_x.append(col_x[-1] + width)
-    item_col_idx = next(
-        (index for index, column in enumerate(table_columns) if column["key"] == "item"),
-        1,
-    )
-
-    header_h = 26 * density_factor
-    row_h = 24 * density_factor
-    item_font_name = "Helvetica-Bold"
-    item_font_size = body_font
-    item_line_height = body_font + (4 * density_factor)
-    max_item_lines = 10
-    row_pad_v = 8 * density_factor
-    sig_block_height = max(86, 90 * font_factor)
-    sig_block_gap = 24
-    sig_bottom_margin = 18
-
-    overlay_buffer = BytesIO()
-    pdf_canvas = canvas.Canvas(overlay_buffer, pagesize=A4)
 
     postal_code_value = str(fields.get("postalCode", "")).strip()
-    postal_line = f"{postal_label} {postal_code_value}".strip()
+    postal_line = f"{style.postal_label} {postal_code_value}".strip()
     company_lines = [
         fields.get("companyName", ""),
         fields.get("companyLine1", ""),
@@ -380,20 +486,200 @@ def build_pdf(
     ]
     company_lines = [line for line in company_lines if line]
 
-    def header_bottom_y() -> float:
-        top_y = page_h - margin_y
-        band_bottom = top_y - band_height
-        content_y = band_bottom - header_gap
-        left_y = content_y
-        if company_lines:
-            left_y = content_y - (line_gap * len(company_lines))
-        meta_y = content_y - (line_gap * 2)
-        return min(left_y, meta_y) - 6
+    content_y = page_h - margin_y - band_height - header_gap
+    left_y = content_y - (line_gap * len(company_lines))
+    # Pagination reserves room for both meta lines under the header; the
+    # table itself starts below whichever header column actually ends lower.
+    header_bottom_estimate = min(left_y, content_y - (line_gap * 2)) - 6
+    header_bottom = min(left_y, content_y - line_gap) - 6
+
+    table_top_first = header_bottom_estimate - 6 - 16 - 16
+    table_top_plain = page_h - margin_y - 10
+    table_bottom_full = margin_y + 10
+    table_bottom_last = (
+        margin_y + sig_bottom_margin + sig_block_height + sig_block_gap
+        if style.show_signatures
+        else table_bottom_full
+    )
+    available_first = table_top_first - table_bottom_full - header_h
+    available_plain = table_top_plain - table_bottom_full - header_h
+    available_last_first = table_top_first - table_bottom_last - header_h
+    available_last_plain = table_top_plain - table_bottom_last - header_h
+    available_for_lines = min(available_last_first, available_last_plain)
+    if available_for_lines > 0:
+        max_item_lines = max(
+            max_item_lines,
+            min(40, int((available_for_lines - row_pad_v) / item_line_height)),
+        )
+
+    item_col_width = style.item_col_width
+    item_font_name = style.item_font_name
+    item_font_size = style.item_font_size
+
+    def build_row_info(row: dict) -> TableRow:
+        item_text = str(row.get("item", "") or "")
+        lines = _wrap_text(item_text, item_col_width, item_font_name, item_font_size)
+        if len(lines) > max_item_lines:
+            lines = lines[:max_item_lines]
+            lines[-1] = _fit_text(
+                f"{lines[-1]}...",
+                item_col_width,
+                item_font_name,
+                item_font_size,
+            )
+        text_height = len(lines) * item_line_height
+        height = max(row_h, text_height + row_pad_v)
+        return TableRow(row=row, lines=lines, height=height)
+
+    table = paginate_table(
+        [build_row_info(row) for row in items],
+        first_capacity=available_first,
+        plain_capacity=available_plain,
+        last_first_capacity=available_last_first,
+        last_plain_capacity=available_last_plain,
+    )
+    return PdfLayout(
+        page_width=page_w,
+        page_height=page_h,
+        margin_x=margin_x,
+        margin_y=margin_y,
+        band_height=band_height,
+        header_gap=header_gap,
+        line_gap=line_gap,
+        title_font=style.title_font,
+        body_font=style.body_font,
+        small_font=style.small_font,
+        table_width=TABLE_WIDTH,
+        columns=style.columns,
+        col_x=style.col_x,
+        item_col_idx=style.item_col_idx,
+        header_height=header_h,
+        row_height=row_h,
+        item_font_name=item_font_name,
+        item_font_size=item_font_size,
+        item_line_height=item_line_height,
+        show_signatures=style.show_signatures,
+        signature_block_height=sig_block_height,
+        signature_block_gap=sig_block_gap,
+        company_lines=company_lines,
+        first_table_top=header_bottom - 6 - 16 - 16,
+        plain_table_top=table_top_plain,
+        table=table,
+    )
+
+
+def build_pdf(
+    fields: dict,
+    items: list[dict],
+    signatures: dict | None = None,
+    report_style: ReportStyleInput = None,
+) -> bytes:
+    buffer = BytesIO()
+    write_pdf(buffer, fields, items, signatures, report_style)
+    return buffer.getvalue()
+
+
+def write_pdf(
+    output: BinaryIO,
+    fields: dict,
+    items: list[dict],
+    signatures: dict | None = None,
+    report_style: ReportStyleInput = None,
+) -> None:
+    """Render a PO into ``output`` (any writable binary file object).
+
+    With ``PDF_TEMPLATE_MODE=overlay`` and a readable template, only the
+    content is drawn and it is merged onto the template's letterhead.
+    """
+    style = resolve_report_style(report_style)
+    template_pages = _pdf_template.pages() if PDF_TEMPLATE_MODE == "overlay" else []
+    if not template_pages:
+        _draw_pdf(output, fields, items, signatures, style)
+        return
+    with tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_MB * 1024 * 1024) as overlay:
+        _draw_pdf(
+            overlay,
+            fields,
+            items,
+            signatures,
+            style,
+            template_pages=len(template_pages),
+        )
+        overlay.seek(0)
+        _pdf_template.merge(overlay, output, template_pages)
+
+
+def _draw_pdf(
+    output: BinaryIO,
+    fields: dict,
+    items: list[dict],
+    signatures: dict | None,
+    style: ResolvedReportStyle,
+    *,
+    template_pages: int = 0,
+) -> None:
+    """Draw the PO; pages with a template beneath skip the paper and letterhead."""
+    layout = layout_pdf(fields, items, style)
+
+    title_align = style.title_align
+    title_text = style.title_text
+    note_text = style.note_text
+    empty_items_text = style.empty_text
+    form_label = style.form_label
+    date_label = style.date_label
+    to_label = style.to_label
+    logo_data_url = style.logo_data_url
+    signature_title = style.signature_title
+    sign_label_form_creator = style.sign_label_form_creator
+    sign_label_production_manager = style.sign_label_production_manager
+    sign_label_manager = style.sign_label_manager
+    show_logo = style.show_logo
+    logo_align = style.logo_align
+    logo_scale = style.logo_scale
+
+    page_bg_color = style.paper_color
+    text_main_color = style.text_color
+    text_muted_color = style.text_muted_color
+    table_outer_border_color = style.table_border_outer
+    table_inner_border_color = style.table_border_inner
+    table_header_bg_color = style.table_header_bg
+    table_header_text_color = style.table_header_text
+    table_row_odd_bg = style.table_row_odd
+    table_row_even_bg = style.table_row_even
+
+    page_w, page_h = layout.page_width, layout.page_height
+    margin_x = layout.margin_x
+    margin_y = layout.margin_y
+    band_height = layout.band_height
+    header_gap = layout.header_gap
+    line_gap = layout.line_gap
+    title_font = layout.title_font
+    body_font = layout.body_font
+    small_font = layout.small_font
+    table_width = layout.table_width
+    table_columns = layout.columns
+    col_x = layout.col_x
+    item_col_idx = layout.item_col_idx
+    header_h = layout.header_height
+    row_h = layout.row_height
+    item_font_name = layout.item_font_name
+    item_font_size = layout.item_font_size
+    item_line_height = layout.item_line_height
+    sig_block_height = layout.signature_block_height
+    sig_block_gap = layout.signature_block_gap
+    company_lines = layout.company_lines
+    signatures = signatures or {}
+
+    pdf_canvas = canvas.Canvas(output, pagesize=A4)
 
     def draw_header() -> float:
         top_y = page_h - margin_y
         band_bottom = top_y - band_height
+        if not template_pages:
+            draw_letterhead(band_bottom)
+        return draw_header_fields(band_bottom)
 
+    def draw_letterhead(band_bottom: float) -> None:
         pdf_canvas.setFillColor(page_bg_color)
         pdf_canvas.setStrokeColor(page_bg_color)
         pdf_canvas.rect(
@@ -408,17 +694,16 @@ def build_pdf(
         logo_right = margin_x
         if show_logo:
             try:
-                logo = None
-                logo_bytes = _data_url_to_bytes(logo_data_url)
-                if logo_bytes:
-                    logo = ImageReader(BytesIO(logo_bytes))
-                elif LOGO_PATH.exists():
-                    logo = ImageReader(str(LOGO_PATH))
+                target_h = band_height - 6
+                target_w = 132 * (logo_scale / 100.0)
+                fit = (target_w, target_h)
+                background = style.paper_rgb
+                logo = _image_cache.from_data_url(logo_data_url, fit=fit, background=background)
+                if logo is None:
+                    logo = _image_cache.from_path(LOGO_PATH, fit=fit, background=background)
                 if logo is None:
                     raise ValueError("No logo source")
                 logo_w, logo_h = logo.getSize()
-                target_h = band_height - 6
-                target_w = 132 * (logo_scale / 100.0)
                 scale = min(target_w / logo_w, target_h / logo_h)
                 draw_w = logo_w * scale
                 draw_h = logo_h * scale
@@ -457,6 +742,7 @@ def build_pdf(
                 title_text,
             )
 
+    def draw_header_fields(band_bottom: float) -> float:
         content_y = band_bottom - header_gap
 
         left_y = content_y
@@ -489,103 +775,33 @@ def build_pdf(
 
         return min(left_y, meta_y) - 6
 
-    item_col_width = col_widths[item_col_idx] - 12
-
-    def build_row_info(row: dict) -> dict:
-        item_text = str(row.get("item", "") or "")
-        lines = _wrap_text(item_text, item_col_width, item_font_name, item_font_size)
-        if len(lines) > max_item_lines:
-            lines = lines[:max_item_lines]
-            lines[-1] = _fit_text(
-                f"{lines[-1]}...",
-                item_col_width,
-                item_font_name,
-                item_font_size,
-            )
-        text_height = len(lines) * item_line_height
-        height = max(row_h, text_height + row_pad_v)
-        return {"row": row, "lines": lines, "height": height}
-
     def row_text_y(row_bottom: float, font_size: float) -> float:
         return row_bottom + (row_h / 2) - (font_size * 0.35)
 
     def header_text_y(table_top: float, font_size: float) -> float:
         return (table_top - (header_h / 2)) - (font_size * 0.35)
 
-    def draw_table(table_top: float, page_rows: list[dict], row_offset: int) -> float:
-        total_height = sum(row["height"] for row in page_rows) if page_rows else row_h
-        table_bottom_y = table_top - header_h - total_height
+    def draw_page_background() -> None:
+        pdf_canvas.setFillColor(page_bg_color)
+        pdf_canvas.rect(0, 0, page_w, page_h, fill=1, stroke=0)
 
-        # Header background
+    def draw_table_header() -> None:
+        """Header band and column titles, with the table top at y=0."""
         pdf_canvas.setFillColor(table_header_bg_color)
         pdf_canvas.rect(
             margin_x,
-            table_top - header_h,
+            -header_h,
             table_width,
             header_h,
             fill=1,
             stroke=0,
         )
-
-        # Zebra rows
-        y_cursor = table_top - header_h
-        for idx, row_info in enumerate(page_rows):
-            row_top = y_cursor
-            row_bottom = row_top - row_info["height"]
-            pdf_canvas.setFillColor(table_row_odd_bg if idx % 2 == 0 else table_row_even_bg)
-            pdf_canvas.rect(
-                margin_x,
-                row_bottom,
-                table_width,
-                row_info["height"],
-                fill=1,
-                stroke=0,
-            )
-            y_cursor = row_bottom
-
-        # Outer border
-        pdf_canvas.setStrokeColor(table_outer_border_color)
-        pdf_canvas.setLineWidth(1.0)
-        pdf_canvas.rect(
-            margin_x,
-            table_bottom_y,
-            table_width,
-            header_h + total_height,
-            fill=0,
-            stroke=1,
-        )
-
-        # Inner grid (vertical + horizontal)
-        pdf_canvas.setStrokeColor(table_inner_border_color)
-        pdf_canvas.setLineWidth(0.75)
-        for x in col_x[1:-1]:
-            pdf_canvas.line(x, table_top, x, table_bottom_y)
-        pdf_canvas.line(
-            margin_x,
-            table_top - header_h,
-            margin_x + table_width,
-            table_top - header_h,
-        )
-
-        y_cursor = table_top - header_h
-        for row_info in page_rows:
-            y_cursor -= row_info["height"]
-            pdf_canvas.line(margin_x, y_cursor, margin_x + table_width, y_cursor)
-        if not page_rows:
-            pdf_canvas.line(
-                margin_x,
-                table_top - header_h - row_h,
-                margin_x + table_width,
-                table_top - header_h - row_h,
-            )
-
         pdf_canvas.setFillColor(table_header_text_color)
-        headers = [column["label"] for column in table_columns]
-        header_y = header_text_y(table_top, small_font)
-        for i, title in enumerate(headers):
+        header_y = header_text_y(0, small_font)
+        for i, column in enumerate(table_columns):
             _center_text(
                 pdf_canvas,
-                title,
+                column.label,
                 col_x[i],
                 col_x[i + 1],
                 header_y,
@@ -594,10 +810,61 @@ def build_pdf(
                 4,
             )
 
+    # Chrome every page repeats, with its bounding box (x0, y0, x1, y1).
+    # Names are short because each page's resource dict lists them.
+    page_chrome = {
+        "bg": (draw_page_background, (0, 0, page_w, page_h)),
+        "th": (
+            draw_table_header,
+            (margin_x, -header_h, margin_x + table_width, 0),
+        ),
+    }
+    # Multi-page documents draw the chrome once as form XObjects and
+    # reference them per page; a single page is cheaper drawn inline.
+    use_forms = layout.page_count > 1
+    if use_forms:
+        for name, (draw, bbox) in page_chrome.items():
+            pdf_canvas.beginForm(name, *bbox)
+            draw()
+            pdf_canvas.endForm()
+
+    def has_template(page: int) -> bool:
+        # Template page 1 sits under the first page, page 2 under the rest.
+        return template_pages > 1 or (page == 0 and template_pages > 0)
+
+    def place_chrome(name: str, y: float = 0) -> None:
+        if y:
+            pdf_canvas.saveState()
+            pdf_canvas.translate(0, y)
+        if use_forms:
+            pdf_canvas.doForm(name)
+        else:
+            page_chrome[name][0]()
+        if y:
+            pdf_canvas.restoreState()
+
+    def draw_table(table_top: float, table: TableLayout, page: int) -> float:
+        page_rows = table.page_range(page)
+        total_height = table.page_height(page) if page_rows else row_h
+        rows_top = table_top - header_h
+        table_bottom_y = rows_top - total_height
+
+        place_chrome("th", table_top)
+
+        # Grid lines are collected while the rows are drawn and stroked once
+        # at the end, so the row backgrounds never paint over them.
+        grid = pdf_canvas.beginPath()
+        for x in col_x[1:-1]:
+            grid.moveTo(x, table_top)
+            grid.lineTo(x, table_bottom_y)
+        grid.moveTo(margin_x, rows_top)
+        grid.lineTo(margin_x + table_width, rows_top)
+
         if not page_rows:
+            grid.moveTo(margin_x, rows_top - row_h)
+            grid.lineTo(margin_x + table_width, rows_top - row_h)
             pdf_canvas.setFillColor(text_muted_color)
-            row_bottom = table_top - header_h - row_h
-            row_y = row_text_y(row_bottom, body_font)
+            row_y = row_text_y(rows_top - row_h, body_font)
             _center_text(
                 pdf_canvas,
                 empty_items_text,
@@ -608,22 +875,33 @@ def build_pdf(
                 body_font,
                 6,
             )
-            return table_bottom_y
 
-        pdf_canvas.setFillColor(text_main_color)
-        for idx, row_info in enumerate(page_rows):
-            row_top = table_top - header_h - sum(r["height"] for r in page_rows[:idx])
-            row_bottom = row_top - row_info["height"]
-            row_center_y = row_bottom + (row_info["height"] / 2) - (body_font * 0.35)
+        for idx, row_index in enumerate(page_rows):
+            row_info = table.rows[row_index]
+            row_height = row_info.height
+            row_bottom = rows_top - table.row_top(row_index, page) - row_height
+            pdf_canvas.setFillColor(table_row_odd_bg if idx % 2 == 0 else table_row_even_bg)
+            pdf_canvas.rect(
+                margin_x,
+                row_bottom,
+                table_width,
+                row_height,
+                fill=1,
+                stroke=0,
+            )
+            grid.moveTo(margin_x, row_bottom)
+            grid.lineTo(margin_x + table_width, row_bottom)
 
+            pdf_canvas.setFillColor(text_main_color)
+            row_center_y = row_bottom + (row_height / 2) - (body_font * 0.35)
             for i, column in enumerate(table_columns):
-                col_key = column["key"]
+                col_key = column.key
                 if col_key == "item":
                     continue
                 if col_key == "number":
-                    value = str(row_offset + idx + 1)
+                    value = str(row_index + 1)
                 else:
-                    value = str(row_info["row"].get(col_key, ""))
+                    value = str(row_info.row.get(col_key, ""))
                 _center_text(
                     pdf_canvas,
                     value,
@@ -635,9 +913,9 @@ def build_pdf(
                     6,
                 )
 
-            lines = row_info["lines"]
+            lines = row_info.lines
             text_height = len(lines) * item_line_height
-            start_y = row_bottom + (row_info["height"] - text_height) / 2 + (
+            start_y = row_bottom + (row_height - text_height) / 2 + (
                 item_line_height - item_font_size
             ) / 2
             for line_idx, line in enumerate(lines):
@@ -653,6 +931,22 @@ def build_pdf(
                     6,
                 )
 
+        # Outer border
+        pdf_canvas.setStrokeColor(table_outer_border_color)
+        pdf_canvas.setLineWidth(1.0)
+        pdf_canvas.rect(
+            margin_x,
+            table_bottom_y,
+            table_width,
+            header_h + total_height,
+            fill=0,
+            stroke=1,
+        )
+
+        pdf_canvas.setStrokeColor(table_inner_border_color)
+        pdf_canvas.setLineWidth(0.75)
+        pdf_canvas.drawPath(grid, stroke=1, fill=0)
+
         return table_bottom_y
 
     def draw_signatures_block(block_top: float) -> None:
@@ -729,100 +1023,16 @@ def build_pdf(
                 sig_center_y,
                 sig_w,
                 sig_h,
+                style.paper_rgb,
             )
 
-    table_top_first = header_bottom_y() - 6 - 16 - 16
-    table_top_plain = page_h - margin_y - 10
-    table_bottom_full = margin_y + 10
-    table_bottom_last = (
-        margin_y + sig_bottom_margin + sig_block_height + sig_block_gap
-        if show_signatures
-        else table_bottom_full
-    )
-    available_first = table_top_first - table_bottom_full - header_h
-    available_plain = table_top_plain - table_bottom_full - header_h
-    available_last_first = table_top_first - table_bottom_last - header_h
-    available_last_plain = table_top_plain - table_bottom_last - header_h
-    available_for_lines = min(available_last_first, available_last_plain)
-    if available_for_lines > 0:
-        max_item_lines = max(
-            max_item_lines,
-            min(40, int((available_for_lines - row_pad_v) / item_line_height)),
-        )
+    table = layout.table
+    total_pages = layout.page_count
 
-    row_infos = [build_row_info(row) for row in items]
-
-    def paginate(rows: list[dict], capacity: float) -> list[list[dict]]:
-        pages: list[list[dict]] = []
-        i = 0
-        while i < len(rows):
-            remaining = capacity
-            page: list[dict] = []
-            while i < len(rows) and rows[i]["height"] <= remaining:
-                page.append(rows[i])
-                remaining -= rows[i]["height"]
-                i += 1
-            if not page and i < len(rows):
-                page.append(rows[i])
-                i += 1
-            pages.append(page)
-        return pages
-
-    def paginate_rows(rows: list[dict]) -> list[list[dict]]:
-        if not rows:
-            return [[]]
-        pages: list[list[dict]] = []
-        i = 0
-
-        remaining = available_first
-        page: list[dict] = []
-        while i < len(rows) and rows[i]["height"] <= remaining:
-            page.append(rows[i])
-            remaining -= rows[i]["height"]
-            i += 1
-        if not page and i < len(rows):
-            page.append(rows[i])
-            i += 1
-        pages.append(page)
-
-        while i < len(rows):
-            remaining = available_plain
-            page = []
-            while i < len(rows) and rows[i]["height"] <= remaining:
-                page.append(rows[i])
-                remaining -= rows[i]["height"]
-                i += 1
-            if not page and i < len(rows):
-                page.append(rows[i])
-                i += 1
-            pages.append(page)
-        return pages
-
-    pages = paginate_rows(row_infos)
-    if pages:
-        last_page = pages[-1]
-        last_capacity = available_last_first if len(pages) == 1 else available_last_plain
-        last_height = sum(row["height"] for row in last_page)
-        if last_height > last_capacity:
-            overflow = last_height - last_capacity
-            moved_height = 0.0
-            new_page: list[dict] = []
-            while last_page and moved_height < overflow:
-                row_info = last_page.pop()
-                new_page.insert(0, row_info)
-                moved_height += row_info["height"]
-            if not last_page:
-                pages[-1] = new_page
-            else:
-                pages.append(new_page)
-
-    total_pages = len(pages)
-    row_offset = 0
-
-    for page_index, page_rows in enumerate(pages):
+    for page_index in range(total_pages):
         is_last_page = page_index == total_pages - 1
-        pdf_canvas.setFillColor(page_bg_color)
-        pdf_canvas.rect(0, 0, page_w, page_h, fill=1, stroke=0)
+        if not has_template(page_index):
+            place_chrome("bg")
 
         if page_index == 0:
             header_bottom = draw_header()
@@ -830,7 +1040,7 @@ def build_pdf(
             pdf_canvas.setFillColor(text_main_color)
             pdf_canvas.setFont("Helvetica-Bold", body_font)
             pdf_canvas.drawString(margin_x, to_y, to_label)
-            label_w = stringWidth(to_label, "Helvetica-Bold", body_font)
+            label_w = style.to_label_width
             pdf_canvas.setFont("Helvetica", body_font)
             pdf_canvas.drawString(margin_x + label_w + 6, to_y, fields.get("to", ""))
 
@@ -844,12 +1054,11 @@ def build_pdf(
             )
             table_top = note_y - 16
         else:
-            table_top = table_top_plain
+            table_top = layout.plain_table_top
 
-        table_bottom_y = draw_table(table_top, page_rows, row_offset)
-        row_offset += len(page_rows)
+        table_bottom_y = draw_table(table_top, table, page_index)
 
-        if is_last_page and show_signatures:
+        if is_last_page and layout.show_signatures:
             sig_top = table_bottom_y - sig_block_gap
             draw_signatures_block(sig_top)
 
@@ -863,5 +1072,413 @@ def build_pdf(
         pdf_canvas.showPage()
 
     pdf_canvas.save()
-    overlay_buffer.seek(0)
-    return overlay_buffer.read()
+
+
+def _asset_fingerprint(path: Path) -> list[object]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return [str(path), None, None]
+    return [str(path), stat.st_mtime_ns, stat.st_size]
+
+
+def pdf_cache_key(
+    fields: dict,
+    items: list[dict],
+    signatures: dict | None = None,
+    report_style: dict | None = None,
+) -> str:
+    """Stable hash of everything ``build_pdf`` reads, including asset files."""
+    material = {
+        "renderer": PDF_RENDERER_VERSION,
+        "fields": fields or {},
+        "items": items or [],
+        "signatures": signatures or {},
+        "reportStyle": report_style or {},
+        "assets": [_asset_fingerprint(LOGO_PATH)]
+        + [_asset_fingerprint(SIGNATURES[key]) for key in sorted(SIGNATURES)],
+    }
+    if PDF_TEMPLATE_MODE == "overlay":
+        material["template"] = _pdf_template.fingerprint()
+    encoded = json.dumps(
+        material,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    ).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class PdfCache:
+    """Disk-backed rendered-PDF cache, evicted least-recently-used by size.
+
+    Entries are ``<dir>/<key[:2]>/<key>.pdf``; a hit refreshes the file's
+    mtime, which is the LRU clock, so processes sharing the directory share
+    recency. ``po/<id>.key`` remembers the last render of a saved PO so a
+    save can drop it straight away. Other rendered artifacts (thumbnails)
+    reuse the store with their own ``suffix`` and directory.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        *,
+        max_bytes: int,
+        enabled: bool = True,
+        suffix: str = ".pdf",
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max(0, int(max_bytes))
+        self.enabled = enabled
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._approx_bytes: int | None = None
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "oversize": 0,
+            "errors": 0,
+        }
+
+    def _bump(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{self.suffix}"
+
+    def _po_pointer_path(self, po_id: int) -> Path:
+        return self.cache_dir / "po" / f"{int(po_id)}.key"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def has(self, key: str) -> bool:
+        """Whether ``key`` is stored, without counting a hit or refreshing it."""
+        return self.enabled and self._entry_path(key).is_file()
+
+    def get(self, key: str) -> bytes | None:
+        if not self.enabled:
+            return None
+        path = self._entry_path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            self._bump("misses")
+            return None
+        except OSError:
+            self._bump("errors")
+            return None
+        self._bump("hits")
+        return data
+
+    def put(self, key: str, data: bytes, *, po_id: int | None = None) -> None:
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        try:
+            self._write_atomic(self._entry_path(key), data)
+        except OSError:
+            self._bump("errors")
+            return
+        self._stored(key, len(data), po_id=po_id)
+
+    def _stored(self, key: str, size: int, *, po_id: int | None) -> None:
+        if po_id is not None:
+            try:
+                self._write_atomic(self._po_pointer_path(po_id), key.encode("ascii"))
+            except OSError:
+                self._bump("errors")
+        with self._lock:
+            self._counters["stores"] += 1
+            if self._approx_bytes is not None:
+                self._approx_bytes += size
+            over_budget = self._approx_bytes is None or self._approx_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def get_or_render(
+        self,
+        fields: dict,
+        items: list[dict],
+        signatures: dict | None = None,
+        report_style: dict | None = None,
+        *,
+        po_id: int | None = None,
+        render=None,
+    ) -> bytes:
+        render = render or build_pdf
+        if not self.enabled:
+            return render(fields, items, signatures, report_style)
+        key = pdf_cache_key(fields, items, signatures, report_style)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        pdf_bytes = render(fields, items, signatures, report_style)
+        self.put(key, pdf_bytes, po_id=po_id)
+        return pdf_bytes
+
+    def get_or_render_file(
+        self,
+        fields: dict,
+        items: list[dict],
+        signatures: dict | None = None,
+        report_style: dict | None = None,
+        *,
+        po_id: int | None = None,
+        render_to_path=None,
+    ) -> tuple[Path, BinaryIO] | None:
+        """The cached render's path and an open handle, rendering into the cache on a miss.
+
+        Returns ``None`` when the cache is disabled. The handle is opened
+        here because eviction or ``invalidate_po`` in another thread or
+        process may unlink the file at any time; an open handle still reads
+        it. A hit refreshes the entry's mtime, so it is the last file
+        eviction would pick.
+        """
+        if not self.enabled:
+            return None
+        render_to_path = render_to_path or write_pdf_file
+        key = pdf_cache_key(fields, items, signatures, report_style)
+        path = self._entry_path(key)
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            self._bump("misses")
+        except OSError:
+            self._bump("errors")
+            return None
+        else:
+            self._bump("hits")
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path, handle
+        path.parent.mkdir(parents=True, exist_ok=True)
+        render_to_path(path, fields, items, signatures, report_style)
+        try:
+            handle = open(path, "rb")
+            size = os.fstat(handle.fileno()).st_size
+        except OSError:
+            self._bump("errors")
+            return None
+        if size > self.max_bytes:
+            # Eviction would remove it at once; the caller renders privately.
+            handle.close()
+            self._bump("oversize")
+            path.unlink(missing_ok=True)
+            return None
+        self._stored(key, size, po_id=po_id)
+        return path, handle
+
+    def invalidate_po(self, po_id: int) -> bool:
+        pointer = self._po_pointer_path(po_id)
+        try:
+            key = pointer.read_text(encoding="ascii").strip()
+        except OSError:
+            return False
+        removed = False
+        try:
+            self._entry_path(key).unlink()
+            removed = True
+        except FileNotFoundError:
+            pass
+        except OSError:
+            self._bump("errors")
+        try:
+            pointer.unlink()
+        except OSError:
+            pass
+        if removed:
+            self._bump("invalidations")
+        return removed
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        entries: list[tuple[float, int, Path]] = []
+        if not self.cache_dir.exists():
+            return entries
+        for bucket in self.cache_dir.iterdir():
+            if not bucket.is_dir() or len(bucket.name) != 2:
+                continue
+            for entry in bucket.glob(f"*{self.suffix}"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry))
+        return entries
+
+    def evict(self) -> int:
+        with self._lock:
+            entries = sorted(self._scan(), key=lambda entry: entry[0])
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    self._counters["errors"] += 1
+                    continue
+                total -= size
+                evicted += 1
+            self._approx_bytes = total
+            self._counters["evictions"] += evicted
+        return evicted
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            approx_bytes = self._approx_bytes
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "dir": str(self.cache_dir),
+            "max_bytes": self.max_bytes,
+            "approx_bytes": approx_bytes,
+            "hit_ratio": round(counters["hits"] / lookups, 4) if lookups else None,
+            **counters,
+        }
+
+
+_pdf_cache = PdfCache(
+    PDF_CACHE_DIR,
+    max_bytes=PDF_CACHE_MAX_MB * 1024 * 1024,
+    enabled=PDF_CACHE_ENABLED,
+)
+
+
+def build_pdf_cached(
+    fields: dict,
+    items: list[dict],
+    signatures: dict | None = None,
+    report_style: dict | None = None,
+    *,
+    po_id: int | None = None,
+    render=None,
+) -> bytes:
+    return _pdf_cache.get_or_render(
+        fields,
+        items,
+        signatures,
+        report_style,
+        po_id=po_id,
+        render=render,
+    )
+
+
+def invalidate_cached_pdf(po_id: int) -> bool:
+    return _pdf_cache.invalidate_po(po_id)
+
+
+def get_pdf_cache_stats() -> dict[str, object]:
+    return _pdf_cache.stats()
+
+
+def write_pdf_file(
+    path: Path,
+    fields: dict,
+    items: list[dict],
+    signatures: dict | None = None,
+    report_style: dict | None = None,
+) -> None:
+    """Render to ``path`` atomically; readers never see a partial file."""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as output:
+            write_pdf(output, fields, items, signatures, report_style)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+@dataclass
+class PdfExport:
+    """A rendered PDF ready to send: an open stream, and its cache file if cached.
+
+    ``path`` may be unlinked by cache eviction at any time; ``stream`` stays
+    readable regardless.
+    """
+
+    stream: BinaryIO
+    path: Path | None = None
+    # Location inside the cache directory, for front-server internal redirects.
+    cache_name: str = ""
+
+    def open(self) -> BinaryIO:
+        return self.stream
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+def open_pdf_export(
+    fields: dict,
+    items: list[dict],
+    signatures: dict | None = None,
+    report_style: dict | None = None,
+    *,
+    po_id: int | None = None,
+    render_to_path=None,
+) -> PdfExport:
+    """Render (or reuse) a PDF without holding extra copies of it in memory.
+
+    Cached renders are served from their cache file. Otherwise the PDF goes
+    to a temporary file: rendered in place when ``render_to_path`` is given
+    (another process writes it), or through a ``SpooledTemporaryFile`` that
+    moves to disk past ``PDF_SPOOL_MAX_MB``.
+    """
+    cached = _pdf_cache.get_or_render_file(
+        fields,
+        items,
+        signatures,
+        report_style,
+        po_id=po_id,
+        render_to_path=render_to_path,
+    )
+    if cached is not None:
+        path, stream = cached
+        return PdfExport(
+            stream=stream,
+            path=path,
+            cache_name=path.relative_to(_pdf_cache.cache_dir).as_posix(),
+        )
+    if render_to_path is None:
+        spool = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_MB * 1024 * 1024)
+        try:
+            write_pdf(spool, fields, items, signatures, report_style)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return PdfExport(stream=spool)
+    fd, tmp_name = tempfile.mkstemp(prefix="po-export-", suffix=".pdf")
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        render_to_path(tmp_path, fields, items, signatures, report_style)
+        stream = open(tmp_path, "rb")
+    finally:
+        # The open handle keeps the data readable after the name is gone.
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+    return PdfExport(stream=stream)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from .report_style import ReportColumn
+
+
+@dataclass
+class TableRow:
+    row: dict
+    lines: list[str]
+    height: float
+
+
+@dataclass
+class TableLayout:
+    """Item rows with cumulative offsets and page break indices.
+
+    ``offsets[i]`` is the height of all rows before row ``i`` and page ``k``
+    holds ``rows[breaks[k]:breaks[k + 1]]``, so any row's position on its
+    page and any page's height are O(1) lookups.
+    """
+
+    rows: list[TableRow]
+    breaks: list[int]
+    offsets: list[float] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.offsets:
+            offsets = [0.0]
+            for row in self.rows:
+                offsets.append(offsets[-1] + row.height)
+            self.offsets = offsets
+
+    @property
+    def page_count(self) -> int:
+        return len(self.breaks) - 1
+
+    def page_range(self, page: int) -> range:
+        return range(self.breaks[page], self.breaks[page + 1])
+
+    def page_height(self, page: int) -> float:
+        return self.offsets[self.breaks[page + 1]] - self.offsets[self.breaks[page]]
+
+    def row_top(self, index: int, page: int) -> float:
+        """Distance from the top of ``page``'s first row to the top of row ``index``."""
+        return self.offsets[index] - self.offsets[self.breaks[page]]
+
+
+def _fill_page(heights: list[float], start: int, capacity: float) -> int:
+    end = start
+    remaining = capacity
+    while end < len(heights) and heights[end] <= remaining:
+        remaining -= heights[end]
+        end += 1
+    if end == start and end < len(heights):
+        # A row taller than a whole page still gets a page of its own.
+        end += 1
+    return end
+
+
+def paginate_table(
+    rows: list[TableRow],
+    *,
+    first_capacity: float,
+    plain_capacity: float,
+    last_first_capacity: float,
+    last_plain_capacity: float,
+) -> TableLayout:
+    """Greedy page fill, then push rows off the last page if the footer needs room.
+
+    The ``last_*`` capacities leave space below the table on the final page
+    (the signature block); rows that would overlap it move to a new page.
+    """
+    heights = [row.height for row in rows]
+    breaks = [0]
+    if not rows:
+        breaks.append(0)
+        return TableLayout(rows=rows, breaks=breaks)
+    end = _fill_page(heights, 0, first_capacity)
+    breaks.append(end)
+    while end < len(heights):
+        end = _fill_page(heights, end, plain_capacity)
+        breaks.append(end)
+
+    start = breaks[-2]
+    last_capacity = last_first_capacity if len(breaks) == 2 else last_plain_capacity
+    last_height = sum(heights[start:])
+    if last_height > last_capacity:
+        overflow = last_height - last_capacity
+        moved = 0.0
+        split = len(heights)
+        while split > start and moved < overflow:
+            split -= 1
+            moved += heights[split]
+        if split > start:
+            breaks.insert(-1, split)
+    return TableLayout(rows=rows, breaks=breaks)
+
+
+@dataclass
+class PdfLayout:
+    """Where ``build_pdf`` puts things, worked out without a canvas.
+
+    Coordinates are PDF points with the origin at the bottom-left of the
+    page, the same space the renderer draws in.
+    """
+
+    page_width: float
+    page_height: float
+    margin_x: float
+    margin_y: float
+    band_height: float
+    header_gap: float
+    line_gap: float
+    title_font: float
+    body_font: float
+    small_font: float
+    table_width: float
+    columns: tuple[ReportColumn, ...]
+    col_x: tuple[float, ...]
+    item_col_idx: int
+    header_height: float
+    row_height: float
+    item_font_name: str
+    item_font_size: float
+    item_line_height: float
+    show_signatures: bool
+    signature_block_height: float
+    signature_block_gap: float
+    company_lines: list[str]
+    first_table_top: float
+    plain_table_top: float
+    table: TableLayout
+
+    @property
+    def page_count(self) -> int:
+        return self.table.page_count
+
+    def table_top(self, page: int) -> float:
+        return self.first_table_top if page == 0 else self.plain_table_top
+
+    def table_bottom(self, page: int) -> float:
+        rows_height = self.row_height
+        if self.table.page_range(page):
+            rows_height = self.table.page_height(page)
+        return self.table_top(page) - self.header_height - rows_height
+
+    def signature_top(self) -> float | None:
+        if not self.show_signatures:
+            return None
+        return self.table_bottom(self.page_count - 1) - self.signature_block_gap
+
+    def to_dict(self) -> dict[str, object]:
+        pages: list[dict[str, object]] = []
+        for page in range(self.page_count):
+            rows_top = self.table_top(page) - self.header_height
+            rows = []
+            for index in self.table.page_range(page):
+                row = self.table.rows[index]
+                top = rows_top - self.table.row_top(index, page)
+                rows.append(
+                    {
+                        "index": index,
+                        "top": round(top, 2),
+                        "bottom": round(top - row.height, 2),
+                        "height": round(row.height, 2),
+                        "lines": row.lines,
+                    }
+                )
+            pages.append(
+                {
+                    "number": page + 1,
+                    "table": {
+                        "top": round(self.table_top(page), 2),
+                        "header_bottom": round(rows_top, 2),
+                        "bottom": round(self.table_bottom(page), 2),
+                    },
+                    "rows": rows,
+                }
+            )
+        signatures = None
+        signature_top = self.signature_top()
+        if signature_top is not None:
+            signatures = {
+                "page": self.page_count,
+                "top": round(signature_top, 2),
+                "bottom": round(signature_top - self.signature_block_height, 2),
+            }
+        return {
+            "unit": "pt",
+            "page_size": [self.page_width, self.page_height],
+            "page_count": self.page_count,
+            "row_count": len(self.table.rows),
+            "columns": [
+                {
+                    "key": column.key,
+                    "label": column.label,
+                    "left": round(self.col_x[index], 2),
+                    "right": round(self.col_x[index + 1], 2),
+                }
+                for index, column in enumerate(self.columns)
+            ],
+            "pages": pages,
+            "signatures": signatures,
+        }
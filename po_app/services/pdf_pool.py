@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from ..config import (
+    PDF_POOL_ENABLED,
+    PDF_POOL_JOB_TIMEOUT_SECONDS,
+    PDF_POOL_MAX_QUEUE,
+    PDF_POOL_RECYCLE_AFTER,
+    PDF_POOL_WORKERS,
+)
+from .pdf import build_pdf, warm_image_cache, warm_pdf_template, write_pdf_file
+
+
+class PdfRenderBusyError(RuntimeError):
+    def __init__(self, retry_after: int):
+        super().__init__("PDF renderer is busy")
+        self.retry_after = retry_after
+
+
+class PdfRenderTimeoutError(RuntimeError):
+    pass
+
+
+# Set in each worker by ``_init_worker``; jobs report ``(job_id, pid)`` on it.
+_started_queue = None
+
+
+def _warm_worker() -> None:
+    # Runs once per worker process: pay the reportlab import, font setup and
+    # logo/signature decoding (and template parsing) before the first real job.
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    stringWidth("warm", "Helvetica", 10)
+    warm_image_cache()
+    warm_pdf_template()
+
+
+def _init_worker(started_queue) -> None:
+    global _started_queue
+    _started_queue = started_queue
+    _warm_worker()
+
+
+def _job_timed_out(signum, frame):
+    raise PdfRenderTimeoutError("PDF render timed out")
+
+
+def _run_job(job_id: int, timeout_seconds: int, fn, *args):
+    """Worker side of a job: the timeout starts here, not when it was queued."""
+    _started_queue.put((job_id, os.getpid()))
+    if not hasattr(signal, "setitimer"):
+        return fn(*args)
+    previous = signal.signal(signal.SIGALRM, _job_timed_out)
+    signal.setitimer(signal.ITIMER_REAL, timeout_seconds)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _ping() -> bool:
+    return True
+
+
+class PdfRenderPool:
+    """Renders ``build_pdf`` in worker processes instead of request threads.
+
+    Jobs beyond ``workers + max_queue`` in flight are refused with
+    ``PdfRenderBusyError``. After ``recycle_after`` jobs new work goes to a
+    fresh executor; the old one finishes what it already started and exits.
+
+    The job timeout counts from when a worker picks the job up. The worker
+    interrupts its own job with an alarm, so a slow render fails alone. If
+    the alarm cannot get through (a hang inside C code), the parent kills
+    that one worker ``kill_grace_seconds`` later; the executor then breaks,
+    and jobs it was still running are retried once on a fresh executor.
+    """
+
+    _POLL_SECONDS = 0.25
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = PDF_POOL_ENABLED,
+        workers: int = PDF_POOL_WORKERS,
+        max_queue: int = PDF_POOL_MAX_QUEUE,
+        job_timeout_seconds: int = PDF_POOL_JOB_TIMEOUT_SECONDS,
+        recycle_after: int = PDF_POOL_RECYCLE_AFTER,
+        kill_grace_seconds: int = 5,
+    ):
+        self.enabled = enabled
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.job_timeout_seconds = max(1, int(job_timeout_seconds))
+        self.recycle_after = max(0, int(recycle_after))
+        self.kill_grace_seconds = max(0, int(kill_grace_seconds))
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_jobs = 0
+        self._in_flight = 0
+        # Futures still holding a slot, with the executor running them.
+        self._slots: dict[Future, ProcessPoolExecutor] = {}
+        self._job_ids = itertools.count(1)
+        # Waiting jobs by id: ``None`` while queued, then ``(pid, started_at)``.
+        self._jobs: dict[int, tuple[int, float] | None] = {}
+        self._started_queue = None
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "recycled": 0,
+        }
+
+    @staticmethod
+    def _is_worker_process() -> bool:
+        # Spawned workers re-import the app; they must never start a pool.
+        return multiprocessing.parent_process() is not None
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        context = multiprocessing.get_context("spawn")
+        if self._started_queue is None:
+            # Queues reach workers only through inheritance, so this one is
+            # shared by every executor the pool creates.
+            self._started_queue = context.SimpleQueue()
+            threading.Thread(
+                target=self._watch_started,
+                args=(self._started_queue,),
+                name="pdf-pool-started",
+                daemon=True,
+            ).start()
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._started_queue,),
+        )
+
+    def _watch_started(self, started_queue) -> None:
+        while True:
+            message = started_queue.get()
+            if message is None:
+                return
+            job_id, pid = message
+            with self._lock:
+                if job_id in self._jobs:
+                    self._jobs[job_id] = (pid, time.monotonic())
+
+    def _retire_executor_locked(self, executor: ProcessPoolExecutor | None = None) -> None:
+        if executor is None or executor is self._executor:
+            executor, self._executor = self._executor, None
+            self._executor_jobs = 0
+            if executor is not None:
+                self._counters["recycled"] += 1
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _executor_locked(self) -> ProcessPoolExecutor:
+        if self._executor is not None and self.recycle_after:
+            if self._executor_jobs >= self.recycle_after:
+                self._retire_executor_locked()
+        if self._executor is None:
+            self._executor = self._new_executor()
+        return self._executor
+
+    def warm(self) -> None:
+        """Start every worker now so the first export does not pay for it."""
+        if not self.enabled or self._is_worker_process():
+            return
+        with self._lock:
+            executor = self._executor_locked()
+            for _ in range(self.workers):
+                executor.submit(_ping)
+
+    def _submit(self, fn, *args) -> tuple[int, Future, ProcessPoolExecutor]:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._counters["rejected"] += 1
+                raise PdfRenderBusyError(retry_after=max(1, self.job_timeout_seconds // 4))
+            job_id = next(self._job_ids)
+            job = (_run_job, job_id, self.job_timeout_seconds, fn, *args)
+            executor = self._executor_locked()
+            try:
+                future = executor.submit(*job)
+            except BrokenProcessPool:
+                self._retire_executor_locked(executor)
+                executor = self._executor_locked()
+                future = executor.submit(*job)
+            self._jobs[job_id] = None
+            self._slots[future] = executor
+            self._in_flight += 1
+            self._executor_jobs += 1
+            self._counters["submitted"] += 1
+        future.add_done_callback(self._job_done)
+        return job_id, future, executor
+
+    def _release_locked(self, future: Future) -> bool:
+        """Free ``future``'s slot; ``False`` if it was already freed."""
+        if self._slots.pop(future, None) is None:
+            return False
+        self._in_flight = max(0, self._in_flight - 1)
+        return True
+
+    def _job_done(self, future: Future) -> None:
+        with self._lock:
+            if not self._release_locked(future):
+                # Killed after a timeout: the slot was settled then.
+                return
+            if not future.cancelled() and isinstance(future.exception(), PdfRenderTimeoutError):
+                # Counted as a timeout by ``_run``.
+                return
+            if future.cancelled() or future.exception() is not None:
+                self._counters["failed"] += 1
+            else:
+                self._counters["completed"] += 1
+
+    def render(
+        self,
+        fields: dict,
+        items: list[dict],
+        signatures: dict | None = None,
+        report_style: dict | None = None,
+    ) -> bytes:
+        if not self.enabled or self._is_worker_process():
+            return build_pdf(fields, items, signatures, report_style)
+        return self._run(build_pdf, fields, items, signatures, report_style)
+
+    def render_to_path(
+        self,
+        path: Path,
+        fields: dict,
+        items: list[dict],
+        signatures: dict | None = None,
+        report_style: dict | None = None,
+    ) -> None:
+        """Have a worker write the PDF to ``path`` so no bytes cross the pipe."""
+        if not self.enabled or self._is_worker_process():
+            write_pdf_file(path, fields, items, signatures, report_style)
+            return
+        self._run(write_pdf_file, Path(path), fields, items, signatures, report_style)
+
+    def _wait(self, job_id: int, future: Future, executor: ProcessPoolExecutor):
+        hard_limit = self.job_timeout_seconds + self.kill_grace_seconds
+        while True:
+            try:
+                return future.result(timeout=self._POLL_SECONDS)
+            except FutureTimeoutError:
+                pass
+            with self._lock:
+                started = self._jobs.get(job_id)
+                if started is None or time.monotonic() - started[1] < hard_limit:
+                    continue
+                # The worker's own alarm did not stop it; kill just that process.
+                self._release_locked(future)
+                self._retire_executor_locked(executor)
+            try:
+                os.kill(started[0], signal.SIGTERM)
+            except OSError:
+                pass
+            raise PdfRenderTimeoutError("PDF render timed out")
+
+    def _run(self, fn, *args):
+        for attempt in range(2):
+            job_id, future, executor = self._submit(fn, *args)
+            try:
+                return self._wait(job_id, future, executor)
+            except PdfRenderTimeoutError:
+                with self._lock:
+                    self._counters["timeouts"] += 1
+                raise
+            except BrokenProcessPool:
+                with self._lock:
+                    self._retire_executor_locked(executor)
+                # Another job's hung worker may have been killed.
+                if attempt:
+                    raise
+            finally:
+                with self._lock:
+                    self._jobs.pop(job_id, None)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._executor_jobs = 0
+            started_queue, self._started_queue = self._started_queue, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if started_queue is not None:
+            started_queue.put(None)
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "job_timeout_seconds": self.job_timeout_seconds,
+                "recycle_after": self.recycle_after,
+                "running": self._executor is not None,
+                "in_flight": self._in_flight,
+                "executor_jobs": self._executor_jobs,
+                **self._counters,
+            }
+
+
+_render_pool = PdfRenderPool()
+
+
+def render_pdf(
+    fields: dict,
+    items: list[dict],
+    signatures: dict | None = None,
+    report_style: dict | None = None,
+) -> bytes:
+    return _render_pool.render(fields, items, signatures, report_style)
+
+
+def render_pdf_to_path(
+    path: Path,
+    fields: dict,
+    items: list[dict],
+    signatures: dict | None = None,
+    report_style: dict | None = None,
+) -> None:
+    _render_pool.render_to_path(path, fields, items, signatures, report_style)
+
+
+def warm_render_pool() -> None:
+    _render_pool.warm()
+
+
+def shutdown_render_pool() -> None:
+    _render_pool.shutdown()
+
+
+def get_render_pool_stats() -> dict[str, object]:
+    return _render_pool.stats()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO
+
+from pypdf import PageObject, PdfReader, PdfWriter
+
+
+class PdfTemplate:
+    """A letterhead PDF parsed once per process and merged under overlays.
+
+    The first template page goes under the first page of a document; the
+    second, if the template has one, goes under every later page. Pages are
+    copied into memory at load time, so concurrent merges never read the
+    file, and the template is reloaded when its mtime or size changes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded_key: tuple[int, int] | None = None
+        self._pages: list[PageObject] = []
+        self._counters = {"loads": 0, "errors": 0, "merges": 0}
+
+    def _stat_key(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def pages(self) -> list[PageObject]:
+        """Template pages, or an empty list if the file is missing or unreadable."""
+        key = self._stat_key()
+        with self._lock:
+            if key is None:
+                self._loaded_key, self._pages = None, []
+                return []
+            if key == self._loaded_key:
+                return self._pages
+            try:
+                reader = PdfReader(BytesIO(self.path.read_bytes()))
+                # Cloning resolves every object, so later merges only read memory.
+                pages = list(PdfWriter(clone_from=reader).pages[:2])
+            except Exception:
+                self._counters["errors"] += 1
+                pages = []
+            else:
+                self._counters["loads"] += 1
+            self._loaded_key, self._pages = key, pages
+            return pages
+
+    def fingerprint(self) -> list[object]:
+        return [str(self.path), *(self._stat_key() or (None, None))]
+
+    def merge(self, overlay: BinaryIO, output: BinaryIO, pages: list[PageObject]) -> None:
+        """Write ``overlay``'s pages to ``output`` with the template beneath."""
+        writer = PdfWriter()
+        for index, page in enumerate(PdfReader(overlay).pages):
+            template_page = pages[0] if index == 0 else pages[1] if len(pages) > 1 else None
+            page = writer.add_page(page)
+            if template_page is not None:
+                page.merge_page(template_page, over=False)
+                # Merging leaves the combined content stream uncompressed.
+                page.compress_content_streams()
+        writer.write(output)
+        with self._lock:
+            self._counters["merges"] += 1
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            loaded_pages = len(self._pages)
+        return {"path": str(self.path), "pages": loaded_pages, **counters}
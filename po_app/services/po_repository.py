@@ -1,16 +1,31 @@
 from __future__ import annotations
 
+import base64
+import binascii
 import json
 from datetime import datetime, timezone
 
 from ..config import USE_POSTGRES
-from ..db import get_db, iso
+from ..db import epoch_us, get_db, iso
+from .blob_store import BlobStore, payload_blob_refs
+from .change_feed import PO_CHANGES_CHANNEL
+from .style_presets import ReportStylePresetRepository
 
 
 class PONotFoundError(Exception):
     pass
 
 
+PO_CHANGE_LOCK_KEY = 0x504F5F43
+PO_CHANGE_LOG_RETAIN = 10000
+PO_CHANGE_PRUNE_EVERY = 500
+PO_CHANGE_FEED_MAX = 1000
+
+
+class POInvalidCursorError(ValueError):
+    pass
+
+
 class POFormNoConflictError(Exception):
     def __init__(self, existing_id: int):
         super().__init__(f"Form number already exists ({existing_id})")
@@ -18,8 +33,16 @@ class POFormNoConflictError(Exception):
 
 
 class PORepository:
-    def __init__(self, *, use_postgres: bool = USE_POSTGRES):
+    def __init__(
+        self,
+        *,
+        use_postgres: bool = USE_POSTGRES,
+        style_presets: ReportStylePresetRepository | None = None,
+        blob_store: BlobStore | None = None,
+    ):
         self.use_postgres = use_postgres
+        self.style_presets = style_presets
+        self.blob_store = blob_store
 
     @staticmethod
     def _row_to_dict(row):
@@ -32,6 +55,154 @@ class PORepository:
         except Exception:
             return None
 
+    def _stored_blob_refs(self, target, table: str, row_id: int | None) -> set[str]:
+        if self.blob_store is None or not row_id:
+            return set()
+        if self.use_postgres:
+            target.execute(f"SELECT payload FROM {table} WHERE id = %s", (row_id,))
+            row = target.fetchone()
+        else:
+            row = target.execute(f"SELECT payload FROM {table} WHERE id = ?", (row_id,)).fetchone()
+        data = self._row_to_dict(row)
+        if not data:
+            return set()
+        try:
+            payload = json.loads(data.get("payload") or "{}")
+        except ValueError:
+            return set()
+        return payload_blob_refs(payload) if isinstance(payload, dict) else set()
+
+    def _move_blob_refs(self, target, old_refs: set[str], new_refs: set[str]) -> None:
+        if self.blob_store is not None:
+            self.blob_store.adjust_refs(target, new_refs - old_refs, old_refs - new_refs)
+
+    @staticmethod
+    def _encode_cursor(sort_value, row_id) -> str:
+        raw = json.dumps([iso(sort_value), int(row_id)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[str, int]:
+        text = str(cursor or "").strip()
+        try:
+            padded = text + "=" * (-len(text) % 4)
+            sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return str(sort_value), int(row_id)
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            raise POInvalidCursorError("Invalid page cursor") from None
+
+    def _list_page(
+        self,
+        *,
+        table: str,
+        columns: str,
+        sort_column: str,
+        sqlite_sort_column: str,
+        limit: int,
+        after: str | None,
+    ) -> dict[str, object]:
+        cursor = self._decode_cursor(after) if after else None
+        if cursor and not self.use_postgres:
+            try:
+                cursor = (int(cursor[0]), cursor[1])
+            except ValueError:
+                raise POInvalidCursorError("Invalid page cursor") from None
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        if cursor:
+                            cur.execute(
+                                f"""
+                                SELECT {columns}, {sort_column} AS sort_key
+                                FROM {table}
+                                WHERE ({sort_column}, id) < (%s::timestamptz, %s)
+                                ORDER BY {sort_column} DESC, id DESC
+                                LIMIT %s
+                                """,
+                                (cursor[0], cursor[1], limit + 1),
+                            )
+                        else:
+                            cur.execute(
+                                f"""
+                                SELECT {columns}, {sort_column} AS sort_key
+                                FROM {table}
+                                ORDER BY {sort_column} DESC, id DESC
+                                LIMIT %s
+                                """,
+                                (limit + 1,),
+                            )
+                        rows = cur.fetchall() or []
+                        total = None
+                        if not cursor:
+                            cur.execute(f"SELECT COUNT(*) AS c FROM {table}")
+                            total = int((self._row_to_dict(cur.fetchone()) or {}).get("c") or 0)
+            else:
+                if cursor:
+                    rows = conn.execute(
+                        f"""
+                        SELECT {columns}, {sqlite_sort_column} AS sort_key
+                        FROM {table}
+                        WHERE ({sqlite_sort_column}, id) < (?, ?)
+                        ORDER BY {sqlite_sort_column} DESC, id DESC
+                        LIMIT ?
+                        """,
+                        (cursor[0], cursor[1], limit + 1),
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        f"""
+                        SELECT {columns}, {sqlite_sort_column} AS sort_key
+                        FROM {table}
+                        ORDER BY {sqlite_sort_column} DESC, id DESC
+                        LIMIT ?
+                        """,
+                        (limit + 1,),
+                    ).fetchall()
+                total = None
+                if not cursor:
+                    row = conn.execute(f"SELECT COUNT(*) AS c FROM {table}").fetchone()
+                    total = int(row["c"] if row else 0)
+        finally:
+            conn.close()
+
+        items: list[dict] = []
+        next_cursor = None
+        for index, row in enumerate(rows):
+            data = self._row_to_dict(row) or {}
+            sort_key = data.pop("sort_key", None)
+            if index == limit:
+                break
+            data[sort_column] = iso(data.get(sort_column))
+            items.append(data)
+            if index == limit - 1 and len(rows) > limit:
+                next_cursor = self._encode_cursor(sort_key, data.get("id"))
+        return {"items": items, "next_cursor": next_cursor, "total": total, "limit": limit}
+
+    def list_pos_page(self, *, limit: int, after: str | None = None) -> dict[str, object]:
+        return self._list_page(
+            table="purchase_orders",
+            columns="id, form_no, po_date, to_name, company_name, items_count, updated_at",
+            sort_column="updated_at",
+            sqlite_sort_column="updated_ts",
+            limit=limit,
+            after=after,
+        )
+
+    def list_trash_page(self, *, limit: int, after: str | None = None) -> dict[str, object]:
+        return self._list_page(
+            table="deleted_purchase_orders",
+            columns=(
+                "id, original_po_id, form_no, po_date, to_name, company_name, "
+                "items_count, deleted_at"
+            ),
+            sort_column="deleted_at",
+            sqlite_sort_column="deleted_ts",
+            limit=limit,
+            after=after,
+        )
+
     def list_pos(self) -> list[dict]:
         conn = get_db()
         try:
@@ -51,7 +222,7 @@ class PORepository:
                     """
                     SELECT id, form_no, po_date, to_name, company_name, items_count, updated_at
                     FROM purchase_orders
-                    ORDER BY datetime(updated_at) DESC, id DESC
+                    ORDER BY updated_ts DESC, id DESC
                     """
                 ).fetchall()
         finally:
@@ -111,6 +282,144 @@ class PORepository:
             "latest_trash_at": iso(trash_row.get("latest")),
         }
 
+    def sync_changes(self, since: int | None) -> dict[str, object]:
+        """Net list changes after change-log position ``since``.
+
+        ``reset`` tells the client to reload both lists: no token yet, the
+        token predates the retained log, or the log moved backwards (restore).
+        """
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            "SELECT MIN(seq) AS first_seq, MAX(seq) AS last_seq FROM po_changes"
+                        )
+                        bounds = self._row_to_dict(cur.fetchone()) or {}
+                        changes = []
+                        if since is not None:
+                            cur.execute(
+                                """
+                                SELECT seq, kind, po_id, trash_id
+                                FROM po_changes
+                                WHERE seq > %s
+                                ORDER BY seq ASC
+                                LIMIT %s
+                                """,
+                                (since, PO_CHANGE_FEED_MAX + 1),
+                            )
+                            changes = [self._row_to_dict(row) or {} for row in cur.fetchall()]
+            else:
+                bounds = self._row_to_dict(
+                    conn.execute(
+                        "SELECT MIN(seq) AS first_seq, MAX(seq) AS last_seq FROM po_changes"
+                    ).fetchone()
+                ) or {}
+                changes = []
+                if since is not None:
+                    changes = [
+                        self._row_to_dict(row) or {}
+                        for row in conn.execute(
+                            """
+                            SELECT seq, kind, po_id, trash_id
+                            FROM po_changes
+                            WHERE seq > ?
+                            ORDER BY seq ASC
+                            LIMIT ?
+                            """,
+                            (since, PO_CHANGE_FEED_MAX + 1),
+                        ).fetchall()
+                    ]
+
+            first_seq = int(bounds.get("first_seq") or 0)
+            last_seq = int(bounds.get("last_seq") or 0)
+            reset = (
+                since is None
+                or since > last_seq
+                or (first_seq and since < first_seq - 1)
+                or len(changes) > PO_CHANGE_FEED_MAX
+            )
+            if reset:
+                return {"token": str(last_seq), "reset": True}
+
+            upserted_ids: set[int] = set()
+            removed_ids: set[int] = set()
+            trashed_ids: set[int] = set()
+            purged_ids: set[int] = set()
+            restored_ids: set[int] = set()
+            for change in changes:
+                kind = change.get("kind")
+                po_id = int(change.get("po_id") or 0)
+                trash_id = int(change.get("trash_id") or 0)
+                if kind == "upsert":
+                    upserted_ids.add(po_id)
+                    removed_ids.discard(po_id)
+                elif kind == "trash":
+                    upserted_ids.discard(po_id)
+                    removed_ids.add(po_id)
+                    trashed_ids.add(trash_id)
+                elif kind == "restore":
+                    upserted_ids.add(po_id)
+                    removed_ids.discard(po_id)
+                    trashed_ids.discard(trash_id)
+                    restored_ids.add(trash_id)
+                elif kind == "purge":
+                    trashed_ids.discard(trash_id)
+                    purged_ids.add(trash_id)
+
+            upserted = self._summaries_by_id(
+                conn,
+                table="purchase_orders",
+                columns="id, form_no, po_date, to_name, company_name, items_count, updated_at",
+                ids=upserted_ids,
+            )
+            trashed = self._summaries_by_id(
+                conn,
+                table="deleted_purchase_orders",
+                columns=(
+                    "id, original_po_id, form_no, po_date, to_name, company_name, "
+                    "items_count, deleted_at"
+                ),
+                ids=trashed_ids,
+            )
+        finally:
+            conn.close()
+
+        for row in upserted:
+            row["updated_at"] = iso(row.get("updated_at"))
+        for row in trashed:
+            row["deleted_at"] = iso(row.get("deleted_at"))
+        return {
+            "token": str(int(changes[-1]["seq"]) if changes else since),
+            "reset": False,
+            "upserted": upserted,
+            "removed": sorted(removed_ids),
+            "trashed": trashed,
+            "purged": sorted(purged_ids),
+            "restored": sorted(restored_ids),
+        }
+
+    def _summaries_by_id(self, conn, *, table: str, columns: str, ids: set[int]) -> list[dict]:
+        if not ids:
+            return []
+        ordered = sorted(ids)
+        if self.use_postgres:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        f"SELECT {columns} FROM {table} WHERE id = ANY(%s) ORDER BY id DESC",
+                        (ordered,),
+                    )
+                    rows = cur.fetchall() or []
+        else:
+            placeholders = ", ".join("?" for _ in ordered)
+            rows = conn.execute(
+                f"SELECT {columns} FROM {table} WHERE id IN ({placeholders}) ORDER BY id DESC",
+                ordered,
+            ).fetchall()
+        return [self._row_to_dict(row) or {} for row in rows]
+
     def list_trash(self) -> list[dict]:
         conn = get_db()
         try:
@@ -132,7 +441,7 @@ class PORepository:
                     SELECT id, original_po_id, form_no, po_date, to_name, company_name,
                            items_count, deleted_at
                     FROM deleted_purchase_orders
-                    ORDER BY datetime(deleted_at) DESC, id DESC
+                    ORDER BY deleted_ts DESC, id DESC
                     """
                 ).fetchall()
         finally:
@@ -145,6 +454,42 @@ class PORepository:
             result.append(data)
         return result
 
+    def find_po_ids(
+        self,
+        *,
+        date_from: str = "",
+        date_to: str = "",
+        company: str = "",
+        limit: int = 500,
+    ) -> list[int]:
+        """IDs of saved POs by PO date range and company name, oldest first."""
+        clauses: list[str] = []
+        params: list[object] = []
+        if date_from:
+            clauses.append("po_date >= {p}")
+            params.append(date_from)
+        if date_to:
+            clauses.append("po_date <= {p}")
+            params.append(date_to)
+        if company:
+            clauses.append("LOWER(company_name) LIKE {p}")
+            params.append(f"%{company.lower()}%")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"SELECT id FROM purchase_orders {where} ORDER BY po_date ASC, id ASC LIMIT {{p}}"
+        params.append(max(1, int(limit)))
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(query.format(p="%s"), params)
+                        rows = cur.fetchall()
+            else:
+                rows = conn.execute(query.format(p="?"), params).fetchall()
+        finally:
+            conn.close()
+        return [int((self._row_to_dict(row) or {}).get("id") or 0) for row in rows]
+
     def get_po(self, po_id: int) -> dict | None:
         conn = get_db()
         try:
@@ -171,6 +516,8 @@ class PORepository:
             payload = {}
         payload["id"] = data.get("id")
         payload["updated_at"] = iso(data.get("updated_at"))
+        if self.style_presets is not None:
+            payload = self.style_presets.expand_payload(payload)
         return payload
 
     def save_po(
@@ -181,6 +528,7 @@ class PORepository:
         signatures: dict,
         report_style: dict,
         po_id: int | None,
+        report_style_id: int | None = None,
     ) -> dict[str, object]:
         now = datetime.now(timezone.utc)
         form_no = (fields.get("formNo") or "").strip()
@@ -190,12 +538,25 @@ class PORepository:
         items_count = len(items)
         target_id = int(po_id) if po_id is not None else None
 
+        if self.blob_store is not None:
+            signatures, report_style = self.blob_store.intern_images(signatures, report_style)
+        if self.style_presets is not None:
+            report_style_id, report_style = self.style_presets.compact_style(
+                report_style_id,
+                report_style,
+            )
+        else:
+            report_style_id = None
         payload = {
             "fields": fields,
             "items": items,
             "signatures": signatures,
             "reportStyle": report_style,
         }
+        if report_style_id:
+            # ``reportStyle`` then holds only the keys that differ from the preset.
+            payload["reportStyleId"] = report_style_id
+        new_refs = payload_blob_refs(payload)
 
         conn = get_db()
         try:
@@ -212,6 +573,7 @@ class PORepository:
                                 data = self._row_to_dict(row) or {}
                                 raise POFormNoConflictError(int(data.get("id") or 0))
 
+                        old_refs = self._stored_blob_refs(cur, "purchase_orders", target_id)
                         if target_id:
                             cur.execute(
                                 """
@@ -252,8 +614,11 @@ class PORepository:
                             )
                             new_row = self._row_to_dict(cur.fetchone()) or {}
                             target_id = int(new_row.get("id") or 0)
+                        self._move_blob_refs(cur, old_refs, new_refs)
+                        self._record_change(cur, "upsert", now, po_id=target_id)
             else:
                 now_text = iso(now)
+                now_ts = epoch_us(now)
                 if form_no:
                     row = conn.execute(
                         "SELECT id FROM purchase_orders WHERE form_no = ? AND id != ?",
@@ -263,16 +628,18 @@ class PORepository:
                         data = self._row_to_dict(row) or {}
                         raise POFormNoConflictError(int(data.get("id") or 0))
 
+                old_refs = self._stored_blob_refs(conn, "purchase_orders", target_id)
                 if target_id:
                     conn.execute(
                         """
                         UPDATE purchase_orders
-                        SET updated_at = ?, form_no = ?, po_date = ?, to_name = ?, company_name = ?,
-                            items_count = ?, payload = ?
+                        SET updated_at = ?, updated_ts = ?, form_no = ?, po_date = ?, to_name = ?,
+                            company_name = ?, items_count = ?, payload = ?
                         WHERE id = ?
                         """,
                         (
                             now_text,
+                            now_ts,
                             form_no,
                             po_date,
                             to_name,
@@ -286,12 +653,14 @@ class PORepository:
                     conn.execute(
                         """
                         INSERT INTO purchase_orders
-                        (created_at, updated_at, form_no, po_date, to_name, company_name, items_count, payload)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        (created_at, updated_at, updated_ts, form_no, po_date, to_name, company_name,
+                         items_count, payload)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                         """,
                         (
                             now_text,
                             now_text,
+                            now_ts,
                             form_no,
                             po_date,
                             to_name,
@@ -301,6 +670,8 @@ class PORepository:
                         ),
                     )
                     target_id = int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+                self._move_blob_refs(conn, old_refs, new_refs)
+                self._record_change(conn, "upsert", now, po_id=target_id)
                 conn.commit()
         finally:
             conn.close()
@@ -350,6 +721,7 @@ class PORepository:
                         inserted = self._row_to_dict(cur.fetchone()) or {}
                         trashed_id = int(inserted.get("id") or 0)
                         cur.execute("DELETE FROM purchase_orders WHERE id = %s", (po_id,))
+                        self._record_change(cur, "trash", now, po_id=po_id, trash_id=trashed_id)
                         return trashed_id
             else:
                 row = self._row_to_dict(
@@ -369,13 +741,14 @@ class PORepository:
                 conn.execute(
                     """
                     INSERT INTO deleted_purchase_orders
-                    (original_po_id, deleted_at, created_at, updated_at, form_no, po_date,
-                     to_name, company_name, items_count, payload)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    (original_po_id, deleted_at, deleted_ts, created_at, updated_at, form_no,
+                     po_date, to_name, company_name, items_count, payload)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """,
                     (
                         row["id"],
                         now_text,
+                        epoch_us(now),
                         row["created_at"],
                         row["updated_at"],
                         row["form_no"],
@@ -388,6 +761,7 @@ class PORepository:
                 )
                 trashed_id = int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
                 conn.execute("DELETE FROM purchase_orders WHERE id = ?", (po_id,))
+                self._record_change(conn, "trash", now, po_id=po_id, trash_id=trashed_id)
                 conn.commit()
                 return trashed_id
         finally:
@@ -448,6 +822,7 @@ class PORepository:
                             "DELETE FROM deleted_purchase_orders WHERE id = %s",
                             (trash_id,),
                         )
+                        self._record_change(cur, "restore", now, po_id=po_id, trash_id=trash_id)
                         return po_id
             else:
                 row = self._row_to_dict(
@@ -480,12 +855,14 @@ class PORepository:
                 conn.execute(
                     """
                     INSERT INTO purchase_orders
-                    (created_at, updated_at, form_no, po_date, to_name, company_name, items_count, payload)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    (created_at, updated_at, updated_ts, form_no, po_date, to_name, company_name,
+                     items_count, payload)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """,
                     (
                         created_at,
                         now_text,
+                        epoch_us(now),
                         row.get("form_no"),
                         row.get("po_date"),
                         row.get("to_name"),
@@ -496,24 +873,77 @@ class PORepository:
                 )
                 po_id = int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
                 conn.execute("DELETE FROM deleted_purchase_orders WHERE id = ?", (trash_id,))
+                self._record_change(conn, "restore", now, po_id=po_id, trash_id=trash_id)
                 conn.commit()
                 return po_id
         finally:
             conn.close()
 
     def purge_po(self, trash_id: int):
+        now = datetime.now(timezone.utc)
         conn = get_db()
         try:
             if self.use_postgres:
                 with conn:
                     with conn.cursor() as cur:
+                        old_refs = self._stored_blob_refs(cur, "deleted_purchase_orders", trash_id)
                         cur.execute(
                             "DELETE FROM deleted_purchase_orders WHERE id = %s",
                             (trash_id,),
                         )
+                        if cur.rowcount:
+                            self._move_blob_refs(cur, old_refs, set())
+                            self._record_change(cur, "purge", now, trash_id=trash_id)
             else:
-                conn.execute("DELETE FROM deleted_purchase_orders WHERE id = ?", (trash_id,))
+                old_refs = self._stored_blob_refs(conn, "deleted_purchase_orders", trash_id)
+                deleted = conn.execute(
+                    "DELETE FROM deleted_purchase_orders WHERE id = ?",
+                    (trash_id,),
+                ).rowcount
+                if deleted:
+                    self._move_blob_refs(conn, old_refs, set())
+                    self._record_change(conn, "purge", now, trash_id=trash_id)
                 conn.commit()
         finally:
             conn.close()
 
+    def _record_change(
+        self,
+        target,
+        kind: str,
+        now: datetime,
+        *,
+        po_id: int | None = None,
+        trash_id: int | None = None,
+    ) -> None:
+        if self.use_postgres:
+            # Serialize change-log writers until commit so sequence order
+            # matches commit order and readers never skip a late commit.
+            target.execute("SELECT pg_advisory_xact_lock(%s)", (PO_CHANGE_LOCK_KEY,))
+            target.execute(
+                """
+                INSERT INTO po_changes (kind, po_id, trash_id, changed_at)
+                VALUES (%s, %s, %s, %s)
+                RETURNING seq
+                """,
+                (kind, po_id, trash_id, now),
+            )
+            seq = int((self._row_to_dict(target.fetchone()) or {}).get("seq") or 0)
+            # Delivered on commit; wakes the event-stream listeners.
+            target.execute("SELECT pg_notify(%s, %s)", (PO_CHANGES_CHANNEL, str(seq)))
+            if seq and seq % PO_CHANGE_PRUNE_EVERY == 0:
+                target.execute(
+                    "DELETE FROM po_changes WHERE seq <= %s",
+                    (seq - PO_CHANGE_LOG_RETAIN,),
+                )
+            return
+        seq = target.execute(
+            """
+            INSERT INTO po_changes (kind, po_id, trash_id, changed_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (kind, po_id, trash_id, iso(now)),
+        ).lastrowid
+        if seq and seq % PO_CHANGE_PRUNE_EVERY == 0:
+            target.execute("DELETE FROM po_changes WHERE seq <= ?", (seq - PO_CHANGE_LOG_RETAIN,))
+
@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import NamedTuple, Union
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+
+from ..config import REPORT_STYLE_CACHE_SIZE
+from .text_metrics import text_width
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN_X = 36
+MARGIN_Y = 36
+TABLE_WIDTH = PAGE_WIDTH - (2 * MARGIN_X)
+
+DENSITY_FACTORS = {"compact": 0.88, "normal": 1.0, "comfortable": 1.12}
+
+
+def _parse_hex_color(value: str | None, fallback: colors.Color) -> colors.Color:
+    raw = str(value or "").strip()
+    if not raw:
+        return fallback
+    if not raw.startswith("#"):
+        raw = f"#{raw}"
+    if len(raw) != 7:
+        return fallback
+    try:
+        int(raw[1:], 16)
+    except ValueError:
+        return fallback
+    try:
+        return colors.HexColor(raw)
+    except Exception:
+        return fallback
+
+
+def _coerce_bool(value, default: bool = True) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in {"1", "true", "yes", "on"}:
+        return True
+    if text in {"0", "false", "no", "off"}:
+        return False
+    return default
+
+
+def _clamped_int(value, default: int, low: int, high: int) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = default
+    return max(low, min(high, number))
+
+
+def _choice(value, allowed: tuple[str, ...]) -> str:
+    text = str(value or "").strip().lower()
+    return text if text in allowed else allowed[0]
+
+
+def _label(report_style: dict, key: str, default: str) -> str:
+    return str(report_style.get(key) or "").strip() or default
+
+
+def _muted_color_from_main(main_color: colors.Color) -> colors.Color:
+    red = float(getattr(main_color, "red", 0.06))
+    green = float(getattr(main_color, "green", 0.1))
+    blue = float(getattr(main_color, "blue", 0.18))
+    luminance = (0.2126 * red) + (0.7152 * green) + (0.0722 * blue)
+    if luminance < 0.45:
+        lift = 0.42
+        return colors.Color(
+            red + ((1 - red) * lift),
+            green + ((1 - green) * lift),
+            blue + ((1 - blue) * lift),
+        )
+    drop = 0.55
+    return colors.Color(red * drop, green * drop, blue * drop)
+
+
+def _rgb255(color: colors.Color) -> tuple[int, int, int]:
+    return tuple(int(round(channel * 255)) for channel in color.rgb())
+
+
+class ReportColumn(NamedTuple):
+    key: str
+    label: str
+    ratio: float
+
+
+def _table_columns(report_style: dict, show_row_number: bool) -> tuple[ReportColumn, ...]:
+    model = _label(report_style, "headModel", "NO (Model)")
+    item = _label(report_style, "headItem", "Item")
+    qty = _label(report_style, "headQty", "Qty")
+    unit = _label(report_style, "headUnit", "Unit")
+    plan = _label(report_style, "headPlan", "Plan No")
+    if show_row_number:
+        return (
+            ReportColumn("number", _label(report_style, "headIndex", "#"), 0.06),
+            ReportColumn("model", model, 0.18),
+            ReportColumn("item", item, 0.40),
+            ReportColumn("qty", qty, 0.10),
+            ReportColumn("unit", unit, 0.10),
+            ReportColumn("plan", plan, 0.16),
+        )
+    return (
+        ReportColumn("model", model, 0.20),
+        ReportColumn("item", item, 0.44),
+        ReportColumn("qty", qty, 0.11),
+        ReportColumn("unit", unit, 0.10),
+        ReportColumn("plan", plan, 0.15),
+    )
+
+
+class ResolvedReportStyle:
+    """A report style validated once, with the fonts and geometry it implies.
+
+    Built by ``resolve_report_style`` from the raw ``reportStyle`` dict a PO
+    carries. Instances are immutable and compare and hash by ``key``, the
+    digest of the style's canonical JSON, so equal styles share one object.
+    """
+
+    __slots__ = (
+        "key",
+        # Layout
+        "density",
+        "font_scale",
+        "font_factor",
+        "density_factor",
+        "show_row_number",
+        "show_signatures",
+        "columns",
+        "col_x",
+        "item_col_idx",
+        "item_col_width",
+        "line_gap",
+        "title_font",
+        "body_font",
+        "small_font",
+        "header_height",
+        "row_height",
+        "item_font_name",
+        "item_font_size",
+        "item_line_height",
+        "row_pad_v",
+        "signature_block_height",
+        # Text
+        "postal_label",
+        "title_text",
+        "title_align",
+        "note_text",
+        "empty_text",
+        "form_label",
+        "date_label",
+        "to_label",
+        "to_label_width",
+        "signature_title",
+        "sign_label_form_creator",
+        "sign_label_production_manager",
+        "sign_label_manager",
+        # Logo
+        "show_logo",
+        "logo_data_url",
+        "logo_align",
+        "logo_scale",
+        # Colors
+        "table_theme",
+        "paper_color",
+        "paper_rgb",
+        "text_color",
+        "text_muted_color",
+        "table_border_outer",
+        "table_border_inner",
+        "table_header_bg",
+        "table_header_text",
+        "table_row_odd",
+        "table_row_even",
+    )
+
+    def __init__(self, key: str, report_style: dict):
+        set_value = partial(object.__setattr__, self)
+        set_value("key", key)
+
+        density = _choice(report_style.get("density"), ("normal", "compact", "comfortable"))
+        font_scale = _clamped_int(report_style.get("fontScale", 100), 100, 90, 120)
+        font_factor = font_scale / 100.0
+        density_factor = DENSITY_FACTORS[density]
+        body_font = 10 * font_factor
+        show_row_number = _coerce_bool(report_style.get("showRowNumber"), True)
+        columns = _table_columns(report_style, show_row_number)
+        col_x = [MARGIN_X]
+        for column in columns:
+            col_x.append(col_x[-1] + (TABLE_WIDTH * column.ratio))
+        item_col_idx = next(
+            (index for index, column in enumerate(columns) if column.key == "item"),
+            1,
+        )
+        set_value("density", density)
+        set_value("font_scale", font_scale)
+        set_value("font_factor", font_factor)
+        set_value("density_factor", density_factor)
+        set_value("show_row_number", show_row_number)
+        set_value("show_signatures", _coerce_bool(report_style.get("showSignatures"), False))
+        set_value("columns", columns)
+        set_value("col_x", tuple(col_x))
+        set_value("item_col_idx", item_col_idx)
+        set_value("item_col_width", (TABLE_WIDTH * columns[item_col_idx].ratio) - 12)
+        set_value("line_gap", 12 * font_factor)
+        set_value("title_font", 16 * font_factor)
+        set_value("body_font", body_font)
+        set_value("small_font", 9 * font_factor)
+        set_value("header_height", 26 * density_factor)
+        set_value("row_height", 24 * density_factor)
+        set_value("item_font_name", "Helvetica-Bold")
+        set_value("item_font_size", body_font)
+        set_value("item_line_height", body_font + (4 * density_factor))
+        set_value("row_pad_v", 8 * density_factor)
+        set_value("signature_block_height", max(86, 90 * font_factor))
+
+        to_label = _label(report_style, "toLabel", "To :")
+        set_value("postal_label", _label(report_style, "postalLabel", "POSTAL CODE :"))
+        set_value("title_text", _label(report_style, "titleText", "PURCHASING ORDER"))
+        set_value("title_align", _choice(report_style.get("titleAlign"), ("center", "left")))
+        set_value(
+            "note_text",
+            _label(report_style, "noteText", "Kindly present your offer for the following items:"),
+        )
+        set_value("empty_text", _label(report_style, "emptyText", "No items yet"))
+        set_value("form_label", _label(report_style, "formLabel", "form no."))
+        set_value("date_label", _label(report_style, "dateLabel", "Date"))
+        set_value("to_label", to_label)
+        set_value("to_label_width", text_width(to_label, "Helvetica-Bold", body_font))
+        set_value("signature_title", _label(report_style, "signatureTitle", "Signature"))
+        set_value(
+            "sign_label_form_creator",
+            _label(report_style, "signLabelFormCreator", "Form Creator"),
+        )
+        set_value(
+            "sign_label_production_manager",
+            _label(report_style, "signLabelProductionManager", "Production Manager"),
+        )
+        set_value("sign_label_manager", _label(report_style, "signLabelManager", "Manager"))
+
+        set_value("show_logo", _coerce_bool(report_style.get("showLogo"), True))
+        set_value("logo_data_url", str(report_style.get("logoDataUrl") or "").strip())
+        set_value("logo_align", _choice(report_style.get("logoAlign"), ("left", "center", "right")))
+        set_value("logo_scale", _clamped_int(report_style.get("logoScale", 100), 100, 60, 180))
+
+        def color(name: str, fallback: str) -> colors.Color:
+            return _parse_hex_color(report_style.get(name), colors.HexColor(fallback))
+
+        table_theme = _choice(report_style.get("tableTheme"), ("zebra", "solid"))
+        paper_color = color("paperColor", "#FFFFFF")
+        text_color = color("textColor", "#0F172A")
+        table_row_odd = color("tableRowOdd", "#FFFFFF")
+        set_value("table_theme", table_theme)
+        set_value("paper_color", paper_color)
+        set_value("paper_rgb", _rgb255(paper_color))
+        set_value("text_color", text_color)
+        set_value("text_muted_color", _muted_color_from_main(text_color))
+        set_value("table_border_outer", color("tableBorderOuter", "#CBD5E1"))
+        set_value("table_border_inner", color("tableBorderInner", "#E2E8F0"))
+        set_value("table_header_bg", color("tableHeaderBg", "#0F172A"))
+        set_value("table_header_text", color("tableHeaderText", "#FFFFFF"))
+        set_value("table_row_odd", table_row_odd)
+        set_value(
+            "table_row_even",
+            table_row_odd if table_theme == "solid" else color("tableRowEven", "#F8FAFC"),
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, ResolvedReportStyle):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"ResolvedReportStyle(key={self.key[:12]!r})"
+
+
+ReportStyleInput = Union[dict, ResolvedReportStyle, None]
+
+
+def report_style_key(report_style: dict | None) -> str:
+    """Digest of the style's canonical JSON; key order and spacing do not matter."""
+    canonical = json.dumps(
+        report_style or {},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ReportStyleResolver:
+    """Memoized ``ResolvedReportStyle`` per distinct style, most recent first.
+
+    Most POs share a handful of styles, so parsing, color conversion and
+    column geometry run once per style instead of once per render. Entries
+    are bounded by count; a style holds its logo data URL, so keep the bound
+    modest.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(0, int(max_entries))
+        self._entries: OrderedDict[str, ResolvedReportStyle] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def resolve(self, report_style: ReportStyleInput) -> ResolvedReportStyle:
+        if isinstance(report_style, ResolvedReportStyle):
+            return report_style
+        report_style = report_style if isinstance(report_style, dict) else {}
+        key = report_style_key(report_style)
+        with self._lock:
+            resolved = self._entries.get(key)
+            if resolved is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return resolved
+            self._counters["misses"] += 1
+        resolved = ResolvedReportStyle(key, report_style)
+        if not self.max_entries:
+            return resolved
+        with self._lock:
+            resolved = self._entries.setdefault(key, resolved)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+        return resolved
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "pid": os.getpid(),
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hit_ratio": round(counters["hits"] / lookups, 4) if lookups else None,
+            **counters,
+        }
+
+
+_style_resolver = ReportStyleResolver(max_entries=REPORT_STYLE_CACHE_SIZE)
+
+
+def resolve_report_style(report_style: ReportStyleInput) -> ResolvedReportStyle:
+    """The parsed form of ``report_style``; already-resolved styles pass through."""
+    return _style_resolver.resolve(report_style)
+
+
+def get_report_style_cache_stats() -> dict[str, object]:
+    return _style_resolver.stats()
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+from ..config import USE_POSTGRES
+from ..db import get_db, iso
+from .blob_store import BlobStore, payload_blob_refs
+
+
+class StylePresetNotFoundError(Exception):
+    pass
+
+
+class StylePresetNameConflictError(Exception):
+    def __init__(self, existing_id: int):
+        super().__init__(f"Style preset name already exists ({existing_id})")
+        self.existing_id = existing_id
+
+
+class ReportStylePresetRepository:
+    """Named report styles that saved POs reference by ID.
+
+    A PO payload with ``reportStyleId`` stores only the keys where its style
+    differs from the preset, so a logo data URL is stored once per preset
+    rather than once per PO. A preset row's style never changes once saved:
+    a style edit retires the row and inserts a new one, so POs keep the look
+    they were saved with. Deleting a preset hides it from the list but keeps
+    the row, so POs that reference it still render. Preset styles are cached
+    per process and checked against the row's ``version`` on use.
+    """
+
+    def __init__(self, *, use_postgres: bool = USE_POSTGRES, blob_store: BlobStore | None = None):
+        self.use_postgres = use_postgres
+        self.blob_store = blob_store
+        self._lock = threading.Lock()
+        self._styles: dict[int, tuple[int, dict]] = {}
+        self._counters = {"hits": 0, "loads": 0}
+
+    @staticmethod
+    def _row_to_dict(row):
+        if row is None:
+            return None
+        try:
+            return dict(row)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _public(row: dict, *, with_style: bool = True) -> dict[str, object]:
+        preset = {
+            "id": int(row.get("id") or 0),
+            "name": str(row.get("name") or ""),
+            "version": int(row.get("version") or 1),
+            "created_at": iso(row.get("created_at")),
+            "updated_at": iso(row.get("updated_at")),
+        }
+        if with_style:
+            preset["style"] = json.loads(row.get("style") or "{}")
+        return preset
+
+    def _fetch(self, query: str, params: tuple, *, many: bool = False):
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(query.format(p="%s"), params)
+                        return cur.fetchall() if many else cur.fetchone()
+            cursor = conn.execute(query.format(p="?"), params)
+            return cursor.fetchall() if many else cursor.fetchone()
+        finally:
+            conn.close()
+
+    def list_presets(self) -> list[dict[str, object]]:
+        rows = self._fetch(
+            """
+            SELECT id, name, version, created_at, updated_at FROM report_styles
+            WHERE deleted_at IS NULL ORDER BY name ASC, id ASC
+            """,
+            (),
+            many=True,
+        )
+        return [self._public(self._row_to_dict(row) or {}, with_style=False) for row in rows]
+
+    def get_preset(self, preset_id: int) -> dict[str, object] | None:
+        row = self._fetch(
+            "SELECT * FROM report_styles WHERE id = {p} AND deleted_at IS NULL",
+            (int(preset_id),),
+        )
+        data = self._row_to_dict(row)
+        return self._public(data) if data else None
+
+    def _check_name(self, cur_or_conn, name: str, preset_id: int | None) -> None:
+        placeholder = "%s" if self.use_postgres else "?"
+        query = (
+            f"SELECT id FROM report_styles WHERE name = {placeholder} "
+            f"AND id != {placeholder} AND deleted_at IS NULL"
+        )
+        if self.use_postgres:
+            cur_or_conn.execute(query, (name, preset_id or -1))
+            row = cur_or_conn.fetchone()
+        else:
+            row = cur_or_conn.execute(query, (name, preset_id or -1)).fetchone()
+        if row:
+            data = self._row_to_dict(row) or {}
+            raise StylePresetNameConflictError(int(data.get("id") or 0))
+
+    def _intern_logo(self, style: dict) -> dict:
+        if self.blob_store is None:
+            return style
+        return self.blob_store.intern_images({}, style)[1]
+
+    def _stored_blob_refs(self, target, preset_id: int) -> set[str]:
+        if self.blob_store is None:
+            return set()
+        if self.use_postgres:
+            target.execute("SELECT style FROM report_styles WHERE id = %s", (preset_id,))
+            row = target.fetchone()
+        else:
+            row = target.execute("SELECT style FROM report_styles WHERE id = ?", (preset_id,)).fetchone()
+        data = self._row_to_dict(row) or {}
+        try:
+            style = json.loads(data.get("style") or "{}")
+        except ValueError:
+            return set()
+        return payload_blob_refs({"reportStyle": style})
+
+    def _move_blob_refs(self, target, old_refs: set[str], new_refs: set[str]) -> None:
+        if self.blob_store is not None:
+            self.blob_store.adjust_refs(target, new_refs - old_refs, old_refs - new_refs)
+
+    def create_preset(self, *, name: str, style: dict) -> dict[str, object]:
+        now = datetime.now(timezone.utc)
+        style = self._intern_logo(style)
+        new_refs = payload_blob_refs({"reportStyle": style})
+        style_text = json.dumps(style, separators=(",", ":"))
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        self._check_name(cur, name, None)
+                        cur.execute(
+                            """
+                            INSERT INTO report_styles (name, style, version, created_at, updated_at)
+                            VALUES (%s, %s, 1, %s, %s)
+                            RETURNING id
+                            """,
+                            (name, style_text, now, now),
+                        )
+                        preset_id = int((self._row_to_dict(cur.fetchone()) or {}).get("id") or 0)
+                        self._move_blob_refs(cur, set(), new_refs)
+            else:
+                self._check_name(conn, name, None)
+                conn.execute(
+                    """
+                    INSERT INTO report_styles (name, style, version, created_at, updated_at)
+                    VALUES (?, ?, 1, ?, ?)
+                    """,
+                    (name, style_text, iso(now), iso(now)),
+                )
+                preset_id = int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+                self._move_blob_refs(conn, set(), new_refs)
+                conn.commit()
+        finally:
+            conn.close()
+        return {
+            "id": preset_id,
+            "name": name,
+            "version": 1,
+            "created_at": iso(now),
+            "updated_at": iso(now),
+            "style": style,
+        }
+
+    def update_preset(
+        self,
+        preset_id: int,
+        *,
+        name: str | None = None,
+        style: dict | None = None,
+    ) -> dict[str, object]:
+        """Rename a preset in place, or replace it with a new row when its style changes.
+
+        Saved POs keep pointing at the old row, which stays resolvable like a
+        deleted preset, so editing a preset never restyles a saved PO. The
+        returned preset carries the new ``id`` and the next ``version``.
+        """
+        if style is None:
+            return self._rename_preset(int(preset_id), name)
+        preset_id = int(preset_id)
+        now = datetime.now(timezone.utc)
+        style = self._intern_logo(style)
+        new_refs = payload_blob_refs({"reportStyle": style})
+        style_text = json.dumps(style, separators=(",", ":"))
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            """
+                            SELECT name, version FROM report_styles
+                            WHERE id = %s AND deleted_at IS NULL
+                            FOR UPDATE
+                            """,
+                            (preset_id,),
+                        )
+                        old = self._row_to_dict(cur.fetchone())
+                        if not old:
+                            raise StylePresetNotFoundError()
+                        name = old["name"] if name is None else name
+                        self._check_name(cur, name, preset_id)
+                        version = int(old["version"] or 1) + 1
+                        cur.execute(
+                            "UPDATE report_styles SET deleted_at = %s WHERE id = %s",
+                            (now, preset_id),
+                        )
+                        cur.execute(
+                            """
+                            INSERT INTO report_styles (name, style, version, created_at, updated_at)
+                            VALUES (%s, %s, %s, %s, %s)
+                            RETURNING id
+                            """,
+                            (name, style_text, version, now, now),
+                        )
+                        new_id = int((self._row_to_dict(cur.fetchone()) or {}).get("id") or 0)
+                        self._move_blob_refs(cur, set(), new_refs)
+            else:
+                old = self._row_to_dict(
+                    conn.execute(
+                        "SELECT name, version FROM report_styles WHERE id = ? AND deleted_at IS NULL",
+                        (preset_id,),
+                    ).fetchone()
+                )
+                if not old:
+                    raise StylePresetNotFoundError()
+                name = old["name"] if name is None else name
+                self._check_name(conn, name, preset_id)
+                version = int(old["version"] or 1) + 1
+                conn.execute(
+                    "UPDATE report_styles SET deleted_at = ? WHERE id = ?",
+                    (iso(now), preset_id),
+                )
+                conn.execute(
+                    """
+                    INSERT INTO report_styles (name, style, version, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (name, style_text, version, iso(now), iso(now)),
+                )
+                new_id = int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+                self._move_blob_refs(conn, set(), new_refs)
+                conn.commit()
+        finally:
+            conn.close()
+        return {
+            "id": new_id,
+            "name": name,
+            "version": version,
+            "created_at": iso(now),
+            "updated_at": iso(now),
+            "style": style,
+        }
+
+    def _rename_preset(self, preset_id: int, name: str | None) -> dict[str, object]:
+        now = datetime.now(timezone.utc)
+        assignments = ["updated_at = {p}"]
+        params: list[object] = [now if self.use_postgres else iso(now)]
+        if name is not None:
+            assignments.append("name = {p}")
+            params.append(name)
+        query = (
+            f"UPDATE report_styles SET {', '.join(assignments)} "
+            "WHERE id = {p} AND deleted_at IS NULL"
+        )
+        params.append(preset_id)
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        if name is not None:
+                            self._check_name(cur, name, preset_id)
+                        cur.execute(query.format(p="%s"), params)
+                        updated = cur.rowcount
+            else:
+                if name is not None:
+                    self._check_name(conn, name, preset_id)
+                updated = conn.execute(query.format(p="?"), params).rowcount
+                conn.commit()
+        finally:
+            conn.close()
+        if not updated:
+            raise StylePresetNotFoundError()
+        return self.get_preset(preset_id) or {"id": preset_id}
+
+    def delete_preset(self, preset_id: int) -> None:
+        now = datetime.now(timezone.utc)
+        query = "UPDATE report_styles SET deleted_at = {p} WHERE id = {p} AND deleted_at IS NULL"
+        conn = get_db()
+        try:
+            if self.use_postgres:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(query.format(p="%s"), (now, int(preset_id)))
+                        deleted = cur.rowcount
+            else:
+                deleted = conn.execute(query.format(p="?"), (iso(now), int(preset_id))).rowcount
+                conn.commit()
+        finally:
+            conn.close()
+        if not deleted:
+            raise StylePresetNotFoundError()
+
+    def style(self, preset_id: int) -> dict | None:
+        """The preset's style from the process cache, reloaded when its version moves.
+
+        Deleted presets still resolve. Callers must not mutate the result.
+        """
+        preset_id = int(preset_id)
+        row = self._fetch("SELECT version FROM report_styles WHERE id = {p}", (preset_id,))
+        if row is None:
+            return None
+        version = int((self._row_to_dict(row) or {}).get("version") or 0)
+        with self._lock:
+            cached = self._styles.get(preset_id)
+            if cached is not None and cached[0] == version:
+                self._counters["hits"] += 1
+                return cached[1]
+        row = self._fetch("SELECT version, style FROM report_styles WHERE id = {p}", (preset_id,))
+        data = self._row_to_dict(row)
+        if not data:
+            return None
+        style = json.loads(data.get("style") or "{}")
+        if not isinstance(style, dict):
+            style = {}
+        with self._lock:
+            self._styles[preset_id] = (int(data.get("version") or 0), style)
+            self._counters["loads"] += 1
+        return style
+
+    def expand_payload(self, payload: dict) -> dict:
+        """Replace a stored payload's style overrides with the full effective style."""
+        try:
+            preset_id = int(payload.get("reportStyleId") or 0)
+        except (TypeError, ValueError):
+            preset_id = 0
+        if not preset_id:
+            return payload
+        overrides = payload.get("reportStyle")
+        overrides = overrides if isinstance(overrides, dict) else {}
+        preset_style = self.style(preset_id) or {}
+        payload["reportStyle"] = {**preset_style, **overrides}
+        return payload
+
+    def compact_style(self, preset_id, report_style: dict) -> tuple[int | None, dict]:
+        """``(preset_id, overrides)`` to store; an unknown preset keeps the full style."""
+        try:
+            preset_id = int(preset_id or 0)
+        except (TypeError, ValueError):
+            preset_id = 0
+        preset_style = self.style(preset_id) if preset_id else None
+        if preset_style is None:
+            return None, report_style
+        overrides = {
+            key: value
+            for key, value in report_style.items()
+            if key not in preset_style or preset_style[key] != value
+        }
+        return preset_id, overrides
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._styles.clear()
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._styles)
+        return {"pid": os.getpid(), "entries": entries, **counters}
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from itertools import accumulate
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+ELLIPSIS = "..."
+
+
+def _points(units: float, font_size: float) -> float:
+    # Same operation order as reportlab's stringWidth, so widths match exactly.
+    return units * 0.001 * font_size
+
+
+class TextMetrics:
+    """Glyph advance widths cached per font, for linear-time text layout.
+
+    Widths are kept in font units (the width at size 1000) and scaled by
+    ``size / 1000`` on use, which is how reportlab's ``stringWidth`` adds up
+    a string, so results match it exactly while each glyph is measured once
+    per process.
+    """
+
+    def __init__(self):
+        self._fonts: dict[str, dict[str, float]] = {}
+
+    def _glyph_table(self, font_name: str) -> dict[str, float]:
+        table = self._fonts.get(font_name)
+        if table is None:
+            table = self._fonts.setdefault(font_name, {})
+        return table
+
+    def glyph_units(self, text: str, font_name: str) -> list[float]:
+        table = self._glyph_table(font_name)
+        try:
+            return list(map(table.__getitem__, text))
+        except KeyError:
+            pass
+        for ch in set(text).difference(table):
+            # Rounding strips the 0.001 * 1000 float noise from the metric.
+            table[ch] = round(stringWidth(ch, font_name, 1000), 6)
+        return list(map(table.__getitem__, text))
+
+    def units(self, text: str, font_name: str) -> float:
+        return sum(self.glyph_units(text, font_name))
+
+    def width(self, text: str, font_name: str, font_size: float) -> float:
+        return _points(self.units(text, font_name), font_size)
+
+    def fit(self, text: str, max_width: float, font_name: str, font_size: float) -> str:
+        """Longest prefix of ``text`` plus an ellipsis that fits ``max_width``."""
+        if not text:
+            return ""
+        glyphs = self.glyph_units(text, font_name)
+        if _points(sum(glyphs), font_size) <= max_width:
+            return text
+        prefix = [0.0, *accumulate(glyphs)]
+        ellipsis_units = self.units(ELLIPSIS, font_name)
+        keep = bisect_right(
+            range(len(prefix)),
+            max_width,
+            key=lambda index: _points(prefix[index] + ellipsis_units, font_size),
+        ) - 1
+        return (text[:keep] + ELLIPSIS) if keep > 0 else ""
+
+    def wrap(self, text: str, max_width: float, font_name: str, font_size: float) -> list[str]:
+        """Greedy word wrap; words wider than a line are split by character."""
+        if not text:
+            return [""]
+        words = str(text).split()
+        if not words:
+            return [""]
+        space_units = self.units(" ", font_name)
+        lines: list[str] = []
+        current: list[str] = []
+        current_units = 0.0
+        for word in words:
+            glyphs = self.glyph_units(word, font_name)
+            word_units = sum(glyphs)
+            if current and _points(current_units + space_units + word_units, font_size) <= max_width:
+                current.append(word)
+                current_units += space_units + word_units
+                continue
+            if not current and _points(word_units, font_size) <= max_width:
+                current = [word]
+                current_units = word_units
+                continue
+            if current:
+                lines.append(" ".join(current))
+                current = []
+                current_units = 0.0
+            if _points(word_units, font_size) <= max_width:
+                current = [word]
+                current_units = word_units
+                continue
+            start = 0
+            chunk_units = 0.0
+            for index, glyph in enumerate(glyphs):
+                if index > start and _points(chunk_units + glyph, font_size) > max_width:
+                    lines.append(word[start:index])
+                    start = index
+                    chunk_units = 0.0
+                chunk_units += glyph
+            current = [word[start:]]
+            current_units = chunk_units
+        if current:
+            lines.append(" ".join(current))
+        return lines
+
+
+_text_metrics = TextMetrics()
+
+
+def text_width(text: str, font_name: str, font_size: float) -> float:
+    return _text_metrics.width(text, font_name, font_size)
+
+
+def fit_text(text: str, max_width: float, font_name: str, font_size: float) -> str:
+    return _text_metrics.fit(text, max_width, font_name, font_size)
+
+
+def wrap_text(text: str, max_width: float, font_name: str, font_size: float) -> list[str]:
+    return _text_metrics.wrap(text, max_width, font_name, font_size)
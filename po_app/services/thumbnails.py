@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+import pypdfium2 as pdfium
+from PIL import features
+
+from ..config import (
+    THUMBNAIL_CACHE_MAX_MB,
+    THUMBNAIL_DIR,
+    THUMBNAIL_WARM_INTERVAL_SECONDS,
+    THUMBNAIL_WARM_LIMIT,
+    THUMBNAIL_WIDTH,
+)
+from .pdf import PdfCache, open_pdf_export, pdf_cache_key
+from .pdf_pool import PdfRenderBusyError, render_pdf_to_path
+from .po_repository import PORepository
+
+# pdfium is not thread-safe; every call into it goes through this lock.
+_PDFIUM_LOCK = threading.Lock()
+
+
+class ThumbnailService:
+    """Page-1 previews of saved POs, rasterized on demand and kept on disk.
+
+    A thumbnail's key is a digest of the PO's PDF cache key, width and
+    format, so anything that changes the PDF gets a new file, and the key
+    doubles as the ETag. Files live in a ``PdfCache`` store of their own and
+    share its LRU eviction. The warmer thread renders thumbnails for the
+    most recently updated POs, then for POs queued with ``notify`` after a
+    save.
+    """
+
+    # Autosave sends bursts of saves; wait for them to settle before rendering.
+    WARM_DEBOUNCE_SECONDS = 2.0
+
+    def __init__(
+        self,
+        *,
+        po_repository: PORepository,
+        cache_dir: Path = THUMBNAIL_DIR,
+        max_bytes: int = THUMBNAIL_CACHE_MAX_MB * 1024 * 1024,
+        width: int = THUMBNAIL_WIDTH,
+        warm_interval_seconds: int = THUMBNAIL_WARM_INTERVAL_SECONDS,
+        warm_limit: int = THUMBNAIL_WARM_LIMIT,
+    ):
+        self._po_repository = po_repository
+        self.width = max(1, int(width))
+        self.format = "webp" if features.check("webp") else "png"
+        self.store = PdfCache(cache_dir, max_bytes=max_bytes, suffix=f".{self.format}")
+        self.warm_interval_seconds = max(0, int(warm_interval_seconds))
+        self.warm_limit = max(0, int(warm_limit))
+        self._lock = threading.Lock()
+        self._pending: set[int] = set()
+        self._wake = threading.Event()
+        self._warmer: threading.Thread | None = None
+        self._counters = {"rendered": 0, "warmed": 0, "warm_errors": 0}
+
+    @property
+    def mimetype(self) -> str:
+        return f"image/{self.format}"
+
+    def thumbnail_key(self, payload: dict) -> str:
+        pdf_key = pdf_cache_key(
+            payload.get("fields") or {},
+            payload.get("items") or [],
+            payload.get("signatures") or {},
+            payload.get("reportStyle") or {},
+        )
+        return hashlib.sha256(f"{pdf_key}:{self.width}:{self.format}".encode("ascii")).hexdigest()
+
+    def image(self, key: str, payload: dict, *, po_id: int | None = None) -> bytes:
+        """Thumbnail bytes for ``key``, rendering and storing them on a miss."""
+        data = self.store.get(key)
+        if data is None:
+            data = self.render(payload, po_id=po_id)
+            self.store.put(key, data, po_id=po_id)
+        return data
+
+    def render(self, payload: dict, *, po_id: int | None = None) -> bytes:
+        export = open_pdf_export(
+            payload.get("fields") or {},
+            payload.get("items") or [],
+            payload.get("signatures") or {},
+            payload.get("reportStyle") or {},
+            po_id=po_id,
+            render_to_path=render_pdf_to_path,
+        )
+        with export.open() as stream:
+            with _PDFIUM_LOCK:
+                document = pdfium.PdfDocument(stream)
+                try:
+                    page = document[0]
+                    bitmap = page.render(scale=self.width / page.get_width())
+                    image = bitmap.to_pil().convert("RGB")
+                finally:
+                    document.close()
+        buffer = BytesIO()
+        if self.format == "webp":
+            image.save(buffer, format="WEBP", quality=80, method=4)
+        else:
+            image.save(buffer, format="PNG", optimize=True)
+        with self._lock:
+            self._counters["rendered"] += 1
+        return buffer.getvalue()
+
+    def invalidate(self, po_id: int) -> bool:
+        return self.store.invalidate_po(po_id)
+
+    def notify(self, po_id: int) -> None:
+        """Queue a saved PO for the warmer; call after its transaction commits."""
+        if not self.warm_interval_seconds:
+            return
+        self.start_warmer()
+        with self._lock:
+            self._pending.add(int(po_id))
+        self._wake.set()
+
+    def warm(self, po_ids: list[int]) -> int:
+        """Render missing thumbnails for ``po_ids``; returns how many were rendered."""
+        rendered = 0
+        for po_id in po_ids:
+            payload = self._po_repository.get_po(po_id)
+            if not payload:
+                continue
+            key = self.thumbnail_key(payload)
+            if self.store.has(key):
+                continue
+            try:
+                self.image(key, payload, po_id=po_id)
+            except PdfRenderBusyError:
+                # Leave the render pool to people waiting on an export.
+                break
+            except Exception:
+                with self._lock:
+                    self._counters["warm_errors"] += 1
+                continue
+            rendered += 1
+        with self._lock:
+            self._counters["warmed"] += rendered
+        return rendered
+
+    def _recent_ids(self) -> list[int]:
+        if not self.warm_limit:
+            return []
+        page = self._po_repository.list_pos_page(limit=self.warm_limit)
+        return [int(row["id"]) for row in page["items"]]
+
+    def _take_pending(self) -> list[int]:
+        with self._lock:
+            po_ids, self._pending = sorted(self._pending), set()
+        return po_ids
+
+    def _warm_loop(self) -> None:
+        recent = True
+        while True:
+            try:
+                self.warm(self._recent_ids() if recent else self._take_pending())
+            except Exception:
+                with self._lock:
+                    self._counters["warm_errors"] += 1
+            # Woken by ``notify``: render the queued POs; timed out: recheck recent ones.
+            recent = not self._wake.wait(self.warm_interval_seconds)
+            if not recent:
+                time.sleep(self.WARM_DEBOUNCE_SECONDS)
+                self._wake.clear()
+
+    def start_warmer(self) -> bool:
+        """Start the warmer on first use; ``False`` if disabled or already running."""
+        if not self.warm_interval_seconds:
+            return False
+        with self._lock:
+            if self._warmer is not None:
+                return False
+            self._warmer = threading.Thread(
+                target=self._warm_loop,
+                name="po-thumbnail-warmer",
+                daemon=True,
+            )
+        self._warmer.start()
+        return True
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            pending = len(self._pending)
+        return {
+            "format": self.format,
+            "width": self.width,
+            "warmer": self._warmer is not None,
+            "pending": pending,
+            **counters,
+            "store": self.store.stats(),
+        }
+
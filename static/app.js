@@ -150,6 +150,7 @@ const authModalCard = authModal?.querySelector(".auth-modal-card");
 const poPreviewRoot = document.getElementById("po-preview");
 const reportLogoPreview = document.getElementById("report-logo-preview");
 const previewBrand = document.querySelector(".preview-brand");
+const previewPageNumber = poPreviewRoot?.querySelector(".page-number");
 const legacyAuthUsernameField = document.getElementById("auth-username")?.closest(".auth-field");
 if (legacyAuthUsernameField) {
   legacyAuthUsernameField.remove();
@@ -280,7 +281,9 @@ const state = {
   currentUpdatedAt: "",
   isDirty: false,
   savedList: [],
+  savedListCursor: "",
   trashList: [],
+  trashListCursor: "",
   backups: [],
   dbToolsBusy: false,
   initialState: null,
@@ -296,6 +299,7 @@ const state = {
   canApproveLoginRequests: false,
   updatesAvailable: false,
   reportStyle: { ...reportStyleDefaults },
+  reportStyleId: null,
 };
 
 const autosaveEnabled = true;
@@ -303,6 +307,9 @@ const autosaveDelayMs = 1200;
 let autosaveTimer = null;
 let previewUrl = null;
 let previewFileName = null;
+const PREVIEW_LAYOUT_DELAY_MS = 500;
+let previewLayoutTimer = null;
+let previewLayoutToken = 0;
 let currentTheme = "light";
 let authStatusTimer = null;
 let updatesReloadTimer = null;
@@ -318,10 +325,17 @@ let loginApprovalCountdownTimer = null;
 let loginApprovalActiveRequestId = "";
 const loginApprovalPendingCache = new Map();
 const LOGIN_APPROVAL_LATER_SNOOZE_MS = 120000;
+const LOGIN_APPROVAL_POLL_INTERVAL_MS = 4000;
 const DATA_SYNC_POLL_INTERVAL_MS = 5000;
+const DATA_EVENT_STREAM_URL = "/api/events";
+const DATA_EVENT_STREAM_RETRY_MS = 30000;
 let dataSyncPollTimer = null;
 let dataSyncBusy = false;
-let dataSyncSnapshot = null;
+let dataSyncRerun = false;
+let dataSyncToken = "";
+let dataEventSource = null;
+let dataEventStreamLive = false;
+let dataEventRetryTimer = null;
 
 const authMethodDefinitions = [
   {
@@ -546,6 +560,10 @@ const normalizeReportStyle = (rawStyle = {}) => {
     if (/^data:image\/[a-zA-Z0-9.+-]+;base64,/i.test(raw)) {
       return raw;
     }
+    // Saved styles reference images kept in the server's blob store.
+    if (/^\/api\/blobs\/[0-9a-f]{64}$/.test(raw)) {
+      return raw;
+    }
     return "";
   };
   const density = String(rawStyle.density || "").trim().toLowerCase();
@@ -942,9 +960,43 @@ const setItems = (items) => {
   items.forEach((item) => addRow(item));
 };
 
+const refreshPreviewLayout = async () => {
+  previewLayoutTimer = null;
+  if (!state.isAuthenticated || !previewPageNumber) return;
+  const token = ++previewLayoutToken;
+  // The logo does not affect pagination; skip sending it on every keystroke.
+  const { logoDataUrl, ...reportStyle } = state.reportStyle || {};
+  try {
+    const response = await apiFetch("/api/po/layout", {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ fields: getFormFields(), items: getItems(), reportStyle }),
+    });
+    if (!response.ok || token !== previewLayoutToken) return;
+    const layout = await response.json();
+    const pageCount = Math.max(1, Number(layout.page_count) || 1);
+    previewPageNumber.textContent = `Page 1/${pageCount}`;
+    previewPageNumber.title = (layout.pages || [])
+      .map((page) => `Page ${page.number}: ${(page.rows || []).length} rows`)
+      .join("\n");
+  } catch (error) {
+    // Page count is a hint; keep the last value if the request fails.
+  }
+};
+
+const schedulePreviewLayout = () => {
+  if (previewLayoutTimer) {
+    clearTimeout(previewLayoutTimer);
+  }
+  previewLayoutTimer = setTimeout(refreshPreviewLayout, PREVIEW_LAYOUT_DELAY_MS);
+};
+
 const updateItemsPreview = () => {
   const items = getItems();
   syncItemsActionButtons(items);
+  schedulePreviewLayout();
   const showRowNumber = state.reportStyle?.showRowNumber !== false;
   const emptyText = state.reportStyle?.emptyText || "No items yet";
   previewItems.innerHTML = "";
@@ -1406,7 +1458,7 @@ const closeAllTransientOverlays = () => {
 const showAuthModal = (status = {}, message = "") => {
   if (!authModal) return;
   stopLoginApprovalPolling();
-  stopDataSyncPolling();
+  stopDataSync();
   clearAuthPendingState();
   closeAllTransientOverlays();
   state.isAuthenticated = false;
@@ -1644,7 +1696,7 @@ const fetchAuthStatus = async () => {
 
 const handleUnauthorized = async () => {
   stopLoginApprovalPolling();
-  stopDataSyncPolling();
+  stopDataSync();
   state.isAuthenticated = false;
   state.authUser = "";
   setLoginApprovalCapability(false);
@@ -2027,9 +2079,10 @@ const startLoginApprovalPolling = () => {
   stopLoginApprovalPolling();
   if (!state.isAuthenticated || !state.canApproveLoginRequests) return;
   void handlePendingLoginApprovals();
+  if (dataEventStreamLive) return;
   loginApprovalPollTimer = setInterval(() => {
     void handlePendingLoginApprovals();
-  }, 4000);
+  }, LOGIN_APPROVAL_POLL_INTERVAL_MS);
 };
 
 const waitForLoginApproval = async (timeoutSeconds = 120) => {
@@ -2099,8 +2152,9 @@ const completeAuth = async (userName, options = {}) => {
   const defaultStatus = getDefaultStatus();
   setSaveStatus(defaultStatus.text, defaultStatus.variant);
   await refreshLists();
-  startDataSyncPolling();
+  startDataSync();
   startLoginApprovalPolling();
+  schedulePreviewLayout();
 };
 
 const logoutAuth = async () => {
@@ -2110,12 +2164,14 @@ const logoutAuth = async () => {
       throw new Error("Logout failed");
     }
     stopLoginApprovalPolling();
-    stopDataSyncPolling();
+    stopDataSync();
     state.isAuthenticated = false;
     state.authUser = "";
     setLoginApprovalCapability(false);
     state.savedList = [];
+    state.savedListCursor = "";
     state.trashList = [];
+    state.trashListCursor = "";
     renderSavedList();
     renderTrashList();
     closeAllTransientOverlays();
@@ -2315,13 +2371,14 @@ const initAuthGate = async () => {
       const defaultStatus = getDefaultStatus();
       setSaveStatus(defaultStatus.text, defaultStatus.variant);
       await refreshLists();
-      startDataSyncPolling();
+      startDataSync();
       startLoginApprovalPolling();
+      schedulePreviewLayout();
       return;
     }
     showAuthModal(status);
   } catch (error) {
-    stopDataSyncPolling();
+    stopDataSync();
     state.isAuthenticated = false;
     state.authUser = "";
     setLoginApprovalCapability(false);
@@ -2799,7 +2856,7 @@ const restoreBackup = async () => {
       throw new Error(msg);
     }
     await response.json();
-    await refreshLists();
+    await refreshLists({ full: true });
     startNewForm({ keepValues: false });
     setDbToolsStatus(`Restore completed: ${fileName}`, "good");
     setSaveStatus("Database restored successfully", "good");
@@ -2983,12 +3040,43 @@ const hasChangesBeyondFormNo = () => {
   return hasFieldChanges || hasItems || hasSignatures;
 };
 
+// The default style is also kept on the server as a preset, so saved POs
+// reference it by ID and store only the keys they change.
+const REPORT_STYLE_DEFAULT_ID_KEY = "po-report-style-default-id";
+
+const saveDefaultStylePreset = async (style) => {
+  const send = (url, method) =>
+    apiFetch(url, {
+      method,
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ name: "Default", style }),
+    });
+  const storedId = Number(localStorage.getItem(REPORT_STYLE_DEFAULT_ID_KEY) || 0);
+  let response = storedId ? await send(`/api/report-styles/${storedId}`, "PUT") : null;
+  if (!response || response.status === 404) {
+    response = await send("/api/report-styles", "POST");
+  }
+  if (response.status === 409) {
+    // A style PUT creates a new preset row, so POs saved with the old one keep their look.
+    const err = await response.json();
+    response = await send(`/api/report-styles/${err.existing_id}`, "PUT");
+  }
+  if (!response.ok) throw new Error("Preset save failed");
+  const preset = await response.json();
+  localStorage.setItem(REPORT_STYLE_DEFAULT_ID_KEY, String(preset.id));
+  state.reportStyleId = preset.id;
+  return preset.id;
+};
+
 const buildPayload = () => ({
   id: state.currentId,
   fields: getFormFields(),
   items: getItems(),
   signatures: state.signatures,
   reportStyle: state.reportStyle,
+  reportStyleId: state.reportStyleId,
 });
 
 const applyPayload = (payload) => {
@@ -2997,6 +3085,7 @@ const applyPayload = (payload) => {
   const signatures = payload.signatures || {};
   const reportStyle = payload.reportStyle || reportStyleDefaults;
   state.currentId = payload.id || null;
+  state.reportStyleId = payload.reportStyleId || null;
   state.currentUpdatedAt = String(payload.updated_at || "");
   if (!state.currentUpdatedAt && state.currentId) {
     const currentRow = state.savedList.find((row) => Number(row.id) === Number(state.currentId));
@@ -3119,58 +3208,56 @@ const parseSyncTimestamp = (value) => {
   return Number.isFinite(time) ? time : 0;
 };
 
-const normalizeSyncSnapshot = (payload = {}) => ({
-  saved_count: Math.max(0, Number(payload.saved_count) || 0),
-  trash_count: Math.max(0, Number(payload.trash_count) || 0),
-  latest_saved_at: String(payload.latest_saved_at || ""),
-  latest_trash_at: String(payload.latest_trash_at || ""),
-});
-
-const buildSyncSnapshotFromLists = () => {
-  let latestSavedAt = "";
-  let latestSavedTs = 0;
-  (state.savedList || []).forEach((row) => {
-    const candidate = String(row?.updated_at || "");
-    const candidateTs = parseSyncTimestamp(candidate);
-    if (candidateTs > latestSavedTs) {
-      latestSavedTs = candidateTs;
-      latestSavedAt = candidate;
-    }
+const fetchSyncChanges = async (since = "") => {
+  const params = new URLSearchParams();
+  if (since) params.set("since", since);
+  const query = params.toString();
+  const response = await apiFetch(`/api/sync/changes${query ? `?${query}` : ""}`, {
+    cache: "no-store",
   });
+  if (!response.ok) throw new Error("Sync changes failed");
+  return response.json();
+};
 
-  let latestTrashAt = "";
-  let latestTrashTs = 0;
-  (state.trashList || []).forEach((row) => {
-    const candidate = String(row?.deleted_at || "");
-    const candidateTs = parseSyncTimestamp(candidate);
-    if (candidateTs > latestTrashTs) {
-      latestTrashTs = candidateTs;
-      latestTrashAt = candidate;
-    }
-  });
+const compareSavedRows = (left, right) =>
+  parseSyncTimestamp(right.updated_at) - parseSyncTimestamp(left.updated_at) ||
+  Number(right.id) - Number(left.id);
 
-  return normalizeSyncSnapshot({
-    saved_count: (state.savedList || []).length,
-    trash_count: (state.trashList || []).length,
-    latest_saved_at: latestSavedAt,
-    latest_trash_at: latestTrashAt,
-  });
-};
+const compareTrashRows = (left, right) =>
+  parseSyncTimestamp(right.deleted_at) - parseSyncTimestamp(left.deleted_at) ||
+  Number(right.id) - Number(left.id);
 
-const syncSnapshotsEqual = (left, right) => {
-  if (!left || !right) return false;
-  return (
-    Number(left.saved_count || 0) === Number(right.saved_count || 0) &&
-    Number(left.trash_count || 0) === Number(right.trash_count || 0) &&
-    parseSyncTimestamp(left.latest_saved_at) === parseSyncTimestamp(right.latest_saved_at) &&
-    parseSyncTimestamp(left.latest_trash_at) === parseSyncTimestamp(right.latest_trash_at)
+const applySyncDelta = (delta = {}) => {
+  const upserted = Array.isArray(delta.upserted) ? delta.upserted : [];
+  const trashed = Array.isArray(delta.trashed) ? delta.trashed : [];
+  const dropSaved = new Set(
+    [...(delta.removed || []), ...upserted.map((row) => row.id)].map(Number)
   );
-};
-
-const fetchRemoteSyncSnapshot = async () => {
-  const response = await apiFetch("/api/sync/status", { cache: "no-store" });
-  if (!response.ok) throw new Error("Sync status failed");
-  return normalizeSyncSnapshot(await response.json());
+  const dropTrash = new Set(
+    [...(delta.purged || []), ...(delta.restored || []), ...trashed.map((row) => row.id)].map(
+      Number
+    )
+  );
+  const savedChanged = dropSaved.size > 0;
+  const trashChanged = dropTrash.size > 0;
+
+  if (savedChanged) {
+    state.savedList = (state.savedList || [])
+      .filter((row) => !dropSaved.has(Number(row.id)))
+      .concat(upserted)
+      .sort(compareSavedRows);
+    renderSavedList();
+    validateField(document.getElementById("formNo"));
+    updateExportState();
+  }
+  if (trashChanged) {
+    state.trashList = (state.trashList || [])
+      .filter((row) => !dropTrash.has(Number(row.id)))
+      .concat(trashed)
+      .sort(compareTrashRows);
+    if (trashBody) renderTrashList();
+  }
+  return savedChanged || trashChanged;
 };
 
 const getSavedPoRowById = (id) => {
@@ -3184,11 +3271,91 @@ const getCurrentSavedPoUpdatedAt = () => {
   return String(getSavedPoRowById(state.currentId)?.updated_at || "");
 };
 
+const LIST_PAGE_LIMIT = 100;
+
+const fetchListPage = async (baseUrl, after, errorMessage) => {
+  const params = new URLSearchParams({ limit: String(LIST_PAGE_LIMIT) });
+  if (after) params.set("after", after);
+  const response = await apiFetch(`${baseUrl}?${params.toString()}`);
+  if (!response.ok) throw new Error(errorMessage);
+  const page = await response.json();
+  return {
+    items: Array.isArray(page?.items) ? page.items : [],
+    cursor: String(page?.next_cursor || ""),
+  };
+};
+
+// Rows already merged in by a sync delta may reappear on a later page.
+const appendListPage = (rows, items) => {
+  const seen = new Set(rows.map((row) => Number(row.id)));
+  return rows.concat(items.filter((row) => !seen.has(Number(row.id))));
+};
+
+const listPageLoads = { saved: null, trash: null };
+
+const loadMoreSavedList = () => {
+  if (!state.savedListCursor || listPageLoads.saved) return listPageLoads.saved;
+  listPageLoads.saved = (async () => {
+    try {
+      const page = await fetchListPage("/api/po", state.savedListCursor, "List failed");
+      state.savedList = appendListPage(state.savedList, page.items);
+      state.savedListCursor = page.cursor;
+      renderSavedList();
+      validateField(document.getElementById("formNo"));
+    } catch (error) {
+      if (!isUnauthorizedError(error)) setSaveStatus("Could not load more saved POs", "warn");
+    } finally {
+      listPageLoads.saved = null;
+    }
+  })();
+  return listPageLoads.saved;
+};
+
+const loadMoreTrashList = () => {
+  if (!state.trashListCursor || listPageLoads.trash) return listPageLoads.trash;
+  listPageLoads.trash = (async () => {
+    try {
+      const page = await fetchListPage("/api/po/trash", state.trashListCursor, "Trash list failed");
+      state.trashList = appendListPage(state.trashList, page.items);
+      state.trashListCursor = page.cursor;
+      renderTrashList();
+    } catch (error) {
+      if (!isUnauthorizedError(error)) setSaveStatus("Could not load more trash records", "warn");
+    } finally {
+      listPageLoads.trash = null;
+    }
+  })();
+  return listPageLoads.trash;
+};
+
+// Loads the next page once the "Load more" row scrolls into view.
+const createListPageObserver = (loadMore) =>
+  "IntersectionObserver" in window
+    ? new IntersectionObserver((entries) => {
+        if (entries.some((entry) => entry.isIntersecting)) void loadMore();
+      })
+    : null;
+
+const savedPageObserver = createListPageObserver(loadMoreSavedList);
+const trashPageObserver = createListPageObserver(loadMoreTrashList);
+
+const appendLoadMoreRow = (body, observer) => {
+  const tr = document.createElement("tr");
+  tr.className = "load-more-row";
+  tr.innerHTML = `
+    <td colspan="8">
+      <button type="button" class="ghost" data-action="load-more">Load more</button>
+    </td>
+  `;
+  body.appendChild(tr);
+  if (observer) observer.observe(tr);
+};
+
 const loadSavedList = async () => {
   try {
-    const response = await apiFetch("/api/po");
-    if (!response.ok) throw new Error("List failed");
-    state.savedList = await response.json();
+    const page = await fetchListPage("/api/po", "", "List failed");
+    state.savedList = page.items;
+    state.savedListCursor = page.cursor;
     if (state.currentId && !state.currentUpdatedAt) {
       state.currentUpdatedAt = getCurrentSavedPoUpdatedAt();
     }
@@ -3198,6 +3365,7 @@ const loadSavedList = async () => {
   } catch (error) {
     if (isUnauthorizedError(error)) return;
     state.savedList = [];
+    state.savedListCursor = "";
     renderSavedList();
   }
 };
@@ -3205,51 +3373,160 @@ const loadSavedList = async () => {
 const loadTrashList = async () => {
   if (!trashBody) return;
   try {
-    const response = await apiFetch("/api/po/trash");
-    if (!response.ok) throw new Error("Trash list failed");
-    state.trashList = await response.json();
+    const page = await fetchListPage("/api/po/trash", "", "Trash list failed");
+    state.trashList = page.items;
+    state.trashListCursor = page.cursor;
     renderTrashList();
   } catch (error) {
     if (isUnauthorizedError(error)) return;
     state.trashList = [];
+    state.trashListCursor = "";
     renderTrashList();
   }
 };
 
-const refreshLists = async (options = {}) => {
-  const { updateSyncSnapshot = true } = options;
+const reloadLists = async () => {
+  let token = "";
+  try {
+    token = String((await fetchSyncChanges())?.token || "");
+  } catch (error) {
+    if (isUnauthorizedError(error)) return;
+  }
   await Promise.all([loadSavedList(), loadTrashList()]);
-  if (updateSyncSnapshot) {
-    dataSyncSnapshot = buildSyncSnapshotFromLists();
+  dataSyncToken = token;
+};
+
+// Pulls changes since the last sync token; returns null when the server asks for a reload.
+const pullSyncDelta = async () => {
+  if (!dataSyncToken) return null;
+  const delta = await fetchSyncChanges(dataSyncToken);
+  if (!delta || delta.reset) return null;
+  applySyncDelta(delta);
+  dataSyncToken = String(delta.token || dataSyncToken);
+  return delta;
+};
+
+const refreshLists = async (options = {}) => {
+  const { full = false } = options;
+  if (!full) {
+    try {
+      if (await pullSyncDelta()) return;
+    } catch (error) {
+      if (isUnauthorizedError(error)) return;
+    }
+  }
+  await reloadLists();
+};
+
+// Interval polling is only the fallback while the event stream is down.
+const setDataEventStreamLive = (live) => {
+  dataEventStreamLive = live;
+  if (live) {
+    if (dataSyncPollTimer) {
+      clearInterval(dataSyncPollTimer);
+      dataSyncPollTimer = null;
+    }
+    if (loginApprovalPollTimer) {
+      clearInterval(loginApprovalPollTimer);
+      loginApprovalPollTimer = null;
+    }
+    return;
+  }
+  if (!state.isAuthenticated) return;
+  if (!dataSyncPollTimer) {
+    dataSyncPollTimer = setInterval(() => {
+      void runDataSyncTick();
+    }, DATA_SYNC_POLL_INTERVAL_MS);
+  }
+  if (state.canApproveLoginRequests && !loginApprovalPollTimer) {
+    loginApprovalPollTimer = setInterval(() => {
+      void handlePendingLoginApprovals();
+    }, LOGIN_APPROVAL_POLL_INTERVAL_MS);
+  }
+};
+
+const closeDataEventStream = () => {
+  if (dataEventRetryTimer) {
+    clearTimeout(dataEventRetryTimer);
+    dataEventRetryTimer = null;
   }
+  if (dataEventSource) {
+    dataEventSource.close();
+    dataEventSource = null;
+  }
+  dataEventStreamLive = false;
 };
 
-const stopDataSyncPolling = () => {
+const openDataEventStream = () => {
+  closeDataEventStream();
+  if (!state.isAuthenticated) return;
+  if (typeof window.EventSource !== "function") {
+    setDataEventStreamLive(false);
+    return;
+  }
+  const source = new EventSource(DATA_EVENT_STREAM_URL);
+  dataEventSource = source;
+  source.addEventListener("ready", () => {
+    setDataEventStreamLive(true);
+    // Catch up on anything missed while the stream was (re)connecting.
+    void runDataSyncTick();
+    if (state.canApproveLoginRequests) {
+      void handlePendingLoginApprovals();
+    }
+  });
+  source.addEventListener("po", () => {
+    void runDataSyncTick();
+  });
+  source.addEventListener("login-requests", () => {
+    void handlePendingLoginApprovals();
+  });
+  source.addEventListener("error", () => {
+    if (dataEventSource !== source) return;
+    setDataEventStreamLive(false);
+    if (source.readyState !== EventSource.CLOSED) return;
+    // The server refused the stream (busy, disabled, signed out): poll for a
+    // while, then try the stream again.
+    dataEventSource = null;
+    dataEventRetryTimer = setTimeout(() => {
+      dataEventRetryTimer = null;
+      if (state.isAuthenticated) openDataEventStream();
+    }, DATA_EVENT_STREAM_RETRY_MS);
+  });
+};
+
+const stopDataSync = () => {
+  closeDataEventStream();
   if (dataSyncPollTimer) {
     clearInterval(dataSyncPollTimer);
     dataSyncPollTimer = null;
   }
   dataSyncBusy = false;
-  dataSyncSnapshot = null;
+  dataSyncRerun = false;
+  dataSyncToken = "";
 };
 
-const runDataSyncPollingTick = async () => {
-  if (!state.isAuthenticated || dataSyncBusy) return;
+const runDataSyncTick = async () => {
+  if (!state.isAuthenticated) return;
+  if (dataSyncBusy) {
+    dataSyncRerun = true;
+    return;
+  }
   dataSyncBusy = true;
+  dataSyncRerun = false;
   try {
-    const remoteSnapshot = await fetchRemoteSyncSnapshot();
-    if (!dataSyncSnapshot) {
-      dataSyncSnapshot = buildSyncSnapshotFromLists();
-    }
-    if (syncSnapshotsEqual(remoteSnapshot, dataSyncSnapshot)) {
-      return;
-    }
-
     const currentId = Number(state.currentId) || 0;
     const previousUpdatedAt = currentId
       ? String(getCurrentSavedPoUpdatedAt() || state.currentUpdatedAt || "")
       : "";
-    await refreshLists({ updateSyncSnapshot: true });
+    const delta = await pullSyncDelta();
+    if (!delta) {
+      await reloadLists();
+    } else if (
+      !(delta.upserted || []).length &&
+      !(delta.removed || []).length
+    ) {
+      return;
+    }
 
     if (currentId) {
       const currentRow = getSavedPoRowById(currentId);
@@ -3283,24 +3560,28 @@ const runDataSyncPollingTick = async () => {
         state.currentUpdatedAt = latestUpdatedAt || state.currentUpdatedAt;
       }
     }
-    dataSyncSnapshot = buildSyncSnapshotFromLists();
   } catch (error) {
     if (!isUnauthorizedError(error)) {
       // Ignore transient sync errors; the next tick will retry.
     }
   } finally {
     dataSyncBusy = false;
+    if (dataSyncRerun && state.isAuthenticated) {
+      dataSyncRerun = false;
+      void runDataSyncTick();
+    }
   }
 };
 
-const startDataSyncPolling = () => {
-  stopDataSyncPolling();
+const startDataSync = () => {
+  const token = dataSyncToken;
+  stopDataSync();
   if (!state.isAuthenticated) return;
-  dataSyncSnapshot = buildSyncSnapshotFromLists();
-  void runDataSyncPollingTick();
-  dataSyncPollTimer = setInterval(() => {
-    void runDataSyncPollingTick();
-  }, DATA_SYNC_POLL_INTERVAL_MS);
+  dataSyncToken = token;
+  openDataEventStream();
+  if (!dataEventSource) {
+    void runDataSyncTick();
+  }
 };
 
 const renderSavedList = () => {
@@ -3317,11 +3598,12 @@ const renderSavedList = () => {
     return haystack.includes(query);
   });
 
+  if (savedPageObserver) savedPageObserver.disconnect();
   savedBody.innerHTML = "";
   if (savedTableWrap) {
     savedTableWrap.classList.toggle("saved-scroll", rows.length > 4);
   }
-  if (rows.length === 0) {
+  if (rows.length === 0 && !state.savedListCursor) {
     const emptyRow = document.createElement("tr");
     emptyRow.innerHTML = `<td colspan="8" class="empty-row">No saved POs yet</td>`;
     savedBody.appendChild(emptyRow);
@@ -3334,6 +3616,15 @@ const renderSavedList = () => {
       <td data-label="ID"><span class="badge">#${row.id}</span></td>
       <td data-label="Form No">
         <button class="link-button has-icon" data-action="open" data-id="${row.id}">
+          <img
+            class="saved-thumb"
+            src="/api/po/${row.id}/thumbnail?v=${encodeURIComponent(row.updated_at || "")}"
+            alt=""
+            loading="lazy"
+            decoding="async"
+            width="48"
+            height="68"
+          />
           <span class="btn-icon" aria-hidden="true">
             <svg viewBox="0 0 24 24" role="img" focusable="false">
               <path d="M4 7h6l2 2h8v8a2 2 0 0 1-2 2H6a2 2 0 0 1-2-2z"></path>
@@ -3382,16 +3673,18 @@ const renderSavedList = () => {
     `;
     savedBody.appendChild(tr);
   });
+  if (state.savedListCursor) appendLoadMoreRow(savedBody, savedPageObserver);
 };
 
 const renderTrashList = () => {
   if (!trashBody) return;
   const rows = state.trashList || [];
+  if (trashPageObserver) trashPageObserver.disconnect();
   trashBody.innerHTML = "";
   if (trashTableWrap) {
     trashTableWrap.classList.toggle("saved-scroll", rows.length > 6);
   }
-  if (rows.length === 0) {
+  if (rows.length === 0 && !state.trashListCursor) {
     const emptyRow = document.createElement("tr");
     emptyRow.innerHTML = `<td colspan="8" class="empty-row">Trash is empty</td>`;
     trashBody.appendChild(emptyRow);
@@ -3436,6 +3729,7 @@ const renderTrashList = () => {
     `;
     trashBody.appendChild(tr);
   });
+  if (state.trashListCursor) appendLoadMoreRow(trashBody, trashPageObserver);
 };
 
 const loadPO = async (id, options = {}) => {
@@ -3741,6 +4035,9 @@ savedBody.addEventListener("click", (event) => {
   if (!button) return;
   const id = Number(button.dataset.id);
   const action = button.dataset.action;
+  if (action === "load-more") {
+    void loadMoreSavedList();
+  }
   if (action === "open") {
     openPO(id);
   }
@@ -3760,6 +4057,9 @@ if (trashBody) {
     if (!button) return;
     const id = Number(button.dataset.id);
     const action = button.dataset.action;
+    if (action === "load-more") {
+      void loadMoreTrashList();
+    }
     if (action === "restore") {
       const proceed = confirm(`Restore trash record #${id}?`);
       if (!proceed) return;
@@ -3779,6 +4079,7 @@ syncDefaultsFromPreview();
 setDefaultDate();
 addRow();
 const storedReportStyleRaw = localStorage.getItem("po-report-style-default");
+state.reportStyleId = Number(localStorage.getItem(REPORT_STYLE_DEFAULT_ID_KEY) || 0) || null;
 let storedReportStyle = null;
 if (storedReportStyleRaw) {
   try {
@@ -3921,6 +4222,9 @@ if (reportStyleSaveDefaultButton) {
         resetAfterMs: 2800,
       });
     }
+    saveDefaultStylePreset(state.reportStyle).catch(() => {
+      setSaveStatus("Default style kept on this device only", "warn", { resetAfterMs: 2800 });
+    });
   });
 }
 if (reportStyleResetButton) {
@@ -1,13 +1,29 @@
 from __future__ import annotations
 
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+from io import BytesIO
 from uuid import uuid4
 
 import pytest
+from PIL import Image
+from pypdf import PdfReader
 
 from po_app import create_app
 from po_app import db as db_mod
+from po_app.migrations import SCHEMA_VERSION
 from po_app.routes import api as api_mod
 from po_app.routes import main as main_mod
+from po_app.services import blob_store as blob_store_mod
+from po_app.services import pdf as pdf_mod
+from po_app.services import pdf_pool as pdf_pool_mod
+from po_app.services.change_feed import ChangeFeed, ChangeFeedBusyError
+from po_app.services.export_jobs import ExportJobService
 
 
 @pytest.fixture()
@@ -15,8 +31,18 @@ def app(tmp_path):
     original_path = db_mod._database_manager.db_path
     original_use_postgres = db_mod._database_manager.use_postgres
     original_po_repo_use_postgres = api_mod._po_repository.use_postgres
+    original_style_preset_use_postgres = api_mod._style_preset_repository.use_postgres
+    original_api_blob_store_use_postgres = api_mod._blob_store.use_postgres
+    original_render_blob_store_use_postgres = blob_store_mod._blob_store.use_postgres
     original_passkey_repo_use_postgres = api_mod._passkey_repository.use_postgres
     original_auth_flow_use_postgres = api_mod._auth_flow_service._use_postgres
+    original_change_feed_use_postgres = api_mod._change_feed.use_postgres
+    original_pdf_cache = pdf_mod._pdf_cache
+    original_render_pool_enabled = pdf_pool_mod._render_pool.enabled
+    original_export_job_dir = api_mod._export_job_service.artifact_dir
+    original_export_job_use_postgres = api_mod._export_job_service.use_postgres
+    original_thumbnail_store = api_mod._thumbnail_service.store
+    original_thumbnail_warm_interval = api_mod._thumbnail_service.warm_interval_seconds
     original_api_auth_disabled = api_mod.AUTH_DISABLED
     original_main_auth_disabled = main_mod.AUTH_DISABLED
     test_db_path = tmp_path / "test_po.db"
@@ -24,8 +50,23 @@ def app(tmp_path):
     db_mod._database_manager.db_path = test_db_path
     db_mod._database_manager.use_postgres = False
     api_mod._po_repository.use_postgres = False
+    api_mod._style_preset_repository.use_postgres = False
+    api_mod._style_preset_repository.clear_cache()
+    api_mod._blob_store.use_postgres = False
+    blob_store_mod._blob_store.use_postgres = False
     api_mod._passkey_repository.use_postgres = False
     api_mod._auth_flow_service._use_postgres = False
+    api_mod._change_feed.use_postgres = False
+    pdf_mod._pdf_cache = pdf_mod.PdfCache(tmp_path / "pdf-cache", max_bytes=16 * 1024 * 1024)
+    pdf_pool_mod._render_pool.enabled = False
+    api_mod._export_job_service.artifact_dir = tmp_path / "exports"
+    api_mod._export_job_service.use_postgres = False
+    api_mod._thumbnail_service.store = pdf_mod.PdfCache(
+        tmp_path / "thumbnails",
+        max_bytes=4 * 1024 * 1024,
+        suffix=original_thumbnail_store.suffix,
+    )
+    api_mod._thumbnail_service.warm_interval_seconds = 0
     api_mod.AUTH_DISABLED = False
     main_mod.AUTH_DISABLED = False
 
@@ -38,8 +79,20 @@ def app(tmp_path):
         db_mod._database_manager.db_path = original_path
         db_mod._database_manager.use_postgres = original_use_postgres
         api_mod._po_repository.use_postgres = original_po_repo_use_postgres
+        api_mod._style_preset_repository.use_postgres = original_style_preset_use_postgres
+        api_mod._style_preset_repository.clear_cache()
+        api_mod._blob_store.use_postgres = original_api_blob_store_use_postgres
+        blob_store_mod._blob_store.use_postgres = original_render_blob_store_use_postgres
         api_mod._passkey_repository.use_postgres = original_passkey_repo_use_postgres
         api_mod._auth_flow_service._use_postgres = original_auth_flow_use_postgres
+        api_mod._change_feed.use_postgres = original_change_feed_use_postgres
+        pdf_mod._pdf_cache = original_pdf_cache
+        pdf_pool_mod._render_pool.enabled = original_render_pool_enabled
+        api_mod._export_job_service.shutdown()
+        api_mod._export_job_service.artifact_dir = original_export_job_dir
+        api_mod._export_job_service.use_postgres = original_export_job_use_postgres
+        api_mod._thumbnail_service.store = original_thumbnail_store
+        api_mod._thumbnail_service.warm_interval_seconds = original_thumbnail_warm_interval
         api_mod.AUTH_DISABLED = original_api_auth_disabled
         main_mod.AUTH_DISABLED = original_main_auth_disabled
 
@@ -149,6 +202,35 @@ def test_admin_tools_status_endpoints(auth_client):
     assert updates_res.status_code in {200, 500}
 
 
+def test_restoring_an_older_backup_migrates_its_schema(auth_client, monkeypatch, tmp_path):
+    assert auth_client.get("/api/po").status_code == 200
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    (backup_dir / "old.dump").write_bytes(b"")
+
+    def restore_old_schema(script_name, args=None):
+        assert script_name == "restore_db.ps1"
+        conn = db_mod._database_manager.connect()
+        try:
+            for table in ("po_changes", "export_jobs", "report_styles", "blobs"):
+                conn.execute(f"DROP TABLE {table}")
+            conn.execute("DELETE FROM schema_version WHERE version > 2")
+            conn.commit()
+        finally:
+            conn.close()
+        return 0, "Restore complete"
+
+    monkeypatch.setattr(api_mod._backup_service, "_backup_dir", backup_dir)
+    monkeypatch.setattr(api_mod._backup_service._runner, "run_script", restore_old_schema)
+    response = auth_client.post("/api/admin/backups/restore", json={"filename": "old.dump"})
+    assert response.status_code == 200
+    assert response.get_json()["migrations"] == list(range(3, SCHEMA_VERSION + 1))
+
+    payload = {"fields": {"formNo": f"RESTORED-{uuid4().hex[:8]}"}, "items": []}
+    assert auth_client.post("/api/po", json=payload).status_code == 200
+    assert auth_client.get("/api/sync/changes").status_code == 200
+
+
 def test_access_code_login_success(client, monkeypatch):
     api_mod._access_login_attempts.clear()
     monkeypatch.setattr(api_mod, "_current_access_login_code", lambda: "dev-access-123")
@@ -172,3 +254,490 @@ def test_access_code_login_invalid_code(client, monkeypatch):
     assert response.status_code == 403
     payload = response.get_json() or {}
     assert "remaining_attempts" in payload
+
+
+def test_authenticated_request_uses_single_connection(auth_client):
+    before = int(db_mod.get_db_pool_stats().get("acquired") or 0)
+    response = auth_client.get("/api/po")
+    assert response.status_code == 200
+    after = int(db_mod.get_db_pool_stats().get("acquired") or 0)
+    assert after - before == 1
+
+
+def test_handled_database_error_fails_the_whole_request(app, auth_client):
+    deleted_ids: list[int] = []
+
+    def swallow_error():
+        conn = db_mod.get_db()
+        conn.execute("DELETE FROM purchase_orders WHERE id = ?", (deleted_ids[0],))
+        try:
+            conn.execute("SELECT * FROM missing_table")
+        except sqlite3.Error:
+            pass
+        return {"ok": True}
+
+    app.add_url_rule("/test/swallow-db-error", view_func=swallow_error)
+
+    create_res = auth_client.post(
+        "/api/po",
+        json={"fields": {"formNo": f"TEST-{uuid4().hex[:8]}"}, "items": [], "signatures": {}, "reportStyle": {}},
+    )
+    assert create_res.status_code == 200
+    po_id = int((create_res.get_json() or {}).get("id") or 0)
+    deleted_ids.append(po_id)
+
+    response = auth_client.get("/test/swallow-db-error")
+    assert response.status_code == 500
+    assert auth_client.get(f"/api/po/{po_id}").status_code == 200
+
+
+def test_po_list_keyset_pagination(auth_client):
+    created_ids = []
+    for index in range(3):
+        res = auth_client.post(
+            "/api/po",
+            json={"fields": {"formNo": f"PAGE-{index}-{uuid4().hex[:6]}"}, "items": []},
+        )
+        assert res.status_code == 200
+        created_ids.append(int(res.get_json()["id"]))
+
+    first = auth_client.get("/api/po?limit=2").get_json()
+    assert first["total"] == 3
+    assert len(first["items"]) == 2
+    assert first["next_cursor"]
+
+    second = auth_client.get(f"/api/po?limit=2&after={first['next_cursor']}").get_json()
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+
+    paged_ids = [row["id"] for row in first["items"] + second["items"]]
+    assert paged_ids == sorted(created_ids, reverse=True)
+
+    legacy = auth_client.get("/api/po?all=1").get_json()
+    assert [row["id"] for row in legacy] == paged_ids
+
+    bad = auth_client.get("/api/po?after=not-a-cursor")
+    assert bad.status_code == 400
+
+
+def test_sync_changes_returns_only_deltas(auth_client):
+    initial = auth_client.get("/api/sync/changes").get_json()
+    assert initial["reset"] is True
+    token = initial["token"]
+
+    created = auth_client.post(
+        "/api/po",
+        json={"fields": {"formNo": f"SYNC-{uuid4().hex[:6]}"}, "items": []},
+    ).get_json()
+    po_id = int(created["id"])
+
+    delta = auth_client.get(f"/api/sync/changes?since={token}").get_json()
+    assert delta["reset"] is False
+    assert [row["id"] for row in delta["upserted"]] == [po_id]
+    assert delta["removed"] == [] and delta["trashed"] == []
+
+    trashed_id = int(auth_client.delete(f"/api/po/{po_id}").get_json()["trashed_id"])
+    delta = auth_client.get(f"/api/sync/changes?since={delta['token']}").get_json()
+    assert delta["upserted"] == []
+    assert delta["removed"] == [po_id]
+    assert [row["id"] for row in delta["trashed"]] == [trashed_id]
+
+    auth_client.delete(f"/api/po/trash/{trashed_id}")
+    delta = auth_client.get(f"/api/sync/changes?since={delta['token']}").get_json()
+    assert delta["purged"] == [trashed_id]
+
+    unchanged = auth_client.get(f"/api/sync/changes?since={delta['token']}").get_json()
+    assert unchanged["token"] == delta["token"]
+    assert unchanged["upserted"] == [] and unchanged["purged"] == []
+
+
+def test_event_stream_opens_with_ready_event(auth_client):
+    response = auth_client.get("/api/events", buffered=False)
+    try:
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+        chunks = iter(response.response)
+        assert next(chunks).startswith(b"retry:")
+        assert next(chunks).startswith(b"event: ready\n")
+    finally:
+        response.close()
+    assert api_mod._change_feed.stats()["subscribers"] == 0
+
+
+def test_change_feed_wakes_subscribers_on_po_change(auth_client):
+    feed = ChangeFeed(use_postgres=False, max_subscribers=1, poll_interval_seconds=0.05)
+    with feed.subscribe() as subscription:
+        with pytest.raises(ChangeFeedBusyError):
+            feed.subscribe()
+        created = auth_client.post(
+            "/api/po",
+            json={"fields": {"formNo": f"FEED-{uuid4().hex[:8]}"}, "items": []},
+        )
+        assert created.status_code == 200
+        events = subscription.wait(5)
+        assert [name for name, _ in events] == ["po"]
+        assert int(events[0][1]["token"]) > 0
+    assert feed.stats()["subscribers"] == 0
+
+
+def test_export_reuses_cached_pdf_until_po_is_saved(auth_client):
+    payload = {"fields": {"formNo": f"CACHE-{uuid4().hex[:8]}"}, "items": [{"item": "Bolt"}]}
+    po_id = int(auth_client.post("/api/po", json=payload).get_json()["id"])
+
+    first = auth_client.get(f"/api/po/{po_id}/export")
+    second = auth_client.get(f"/api/po/{po_id}/export")
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    stats = auth_client.get("/api/admin/cache/stats").get_json()["pdf"]
+    assert (stats["misses"], stats["hits"]) == (1, 1)
+
+    payload["id"] = po_id
+    payload["items"] = [{"item": "Nut"}]
+    assert auth_client.post("/api/po", json=payload).status_code == 200
+    stats = auth_client.get("/api/admin/cache/stats").get_json()["pdf"]
+    assert stats["invalidations"] == 1
+    assert auth_client.get(f"/api/po/{po_id}/export").data != first.data
+
+
+def test_export_can_hand_cache_file_to_front_server(auth_client, monkeypatch):
+    monkeypatch.setattr(api_mod, "PDF_SENDFILE", "x-accel-redirect")
+    payload = {"fields": {"formNo": f"ACCEL-{uuid4().hex[:8]}"}, "items": [{"item": "Bolt"}]}
+    po_id = int(auth_client.post("/api/po", json=payload).get_json()["id"])
+
+    response = auth_client.get(f"/api/po/{po_id}/export")
+    assert response.status_code == 200
+    assert response.data == b""
+    target = response.headers["X-Accel-Redirect"]
+    assert target.startswith("/_pdf_cache/") and target.endswith(".pdf")
+    cached = pdf_mod._pdf_cache.cache_dir / target.removeprefix("/_pdf_cache/")
+    cached_bytes = cached.read_bytes()
+    assert cached_bytes.startswith(b"%PDF-")
+    assert "X-Sendfile" not in response.headers
+
+    # Evicted between lookup and send: stream from the open handle instead.
+    open_pdf_export = api_mod.open_pdf_export
+
+    def open_then_evict(*args, **kwargs):
+        export = open_pdf_export(*args, **kwargs)
+        export.path.unlink()
+        return export
+
+    monkeypatch.setattr(api_mod, "open_pdf_export", open_then_evict)
+    response = auth_client.get(f"/api/po/{po_id}/export")
+    assert response.status_code == 200
+    assert "X-Accel-Redirect" not in response.headers
+    assert response.data == cached_bytes
+
+
+def test_po_references_style_preset_and_stores_only_overrides(auth_client):
+    logo = "data:image/png;base64," + "A" * 4000
+    preset_style = {"density": "compact", "logoDataUrl": logo, "titleText": "ORDER"}
+    created = auth_client.post("/api/report-styles", json={"name": "House", "style": preset_style})
+    assert created.status_code == 201
+    preset_id = created.get_json()["id"]
+    logo_ref = created.get_json()["style"]["logoDataUrl"]
+    assert logo_ref.startswith("/api/blobs/")
+    duplicate = auth_client.post("/api/report-styles", json={"name": "House", "style": {}})
+    assert duplicate.status_code == 409
+    assert [row["name"] for row in auth_client.get("/api/report-styles").get_json()] == ["House"]
+
+    payload = {
+        "fields": {"formNo": f"STYLE-{uuid4().hex[:8]}"},
+        "items": [{"item": "Bolt"}],
+        "reportStyle": {**preset_style, "titleText": "QUOTE REQUEST"},
+        "reportStyleId": preset_id,
+    }
+    po_id = int(auth_client.post("/api/po", json=payload).get_json()["id"])
+    conn = db_mod.get_db()
+    try:
+        row = conn.execute("SELECT payload FROM purchase_orders WHERE id = ?", (po_id,)).fetchone()
+    finally:
+        conn.close()
+    stored = json.loads(row["payload"])
+    assert stored["reportStyleId"] == preset_id
+    assert stored["reportStyle"] == {"titleText": "QUOTE REQUEST"}
+
+    loaded = auth_client.get(f"/api/po/{po_id}").get_json()
+    assert loaded["reportStyle"] == {**preset_style, "logoDataUrl": logo_ref, "titleText": "QUOTE REQUEST"}
+
+    updated = auth_client.put(
+        f"/api/report-styles/{preset_id}",
+        json={"style": {**preset_style, "density": "comfortable"}},
+    ).get_json()
+    assert updated["version"] == 2
+    assert updated["id"] != preset_id
+    # The edit is a new preset; the saved PO keeps the style it was saved with.
+    assert auth_client.get(f"/api/po/{po_id}").get_json()["reportStyle"]["density"] == "compact"
+    assert auth_client.get(f"/api/report-styles/{preset_id}").status_code == 404
+    presets = auth_client.get("/api/report-styles").get_json()
+    assert [(row["id"], row["name"]) for row in presets] == [(updated["id"], "House")]
+    renamed = auth_client.put(f"/api/report-styles/{updated['id']}", json={"name": "Shop"})
+    assert renamed.get_json()["id"] == updated["id"]
+
+    assert auth_client.delete(f"/api/report-styles/{updated['id']}").status_code == 200
+    assert auth_client.get("/api/report-styles").get_json() == []
+    assert auth_client.get(f"/api/po/{po_id}").get_json()["reportStyle"]["logoDataUrl"] == logo_ref
+    assert auth_client.get(f"/api/po/{po_id}/export").status_code == 200
+
+
+def test_signatures_are_stored_once_as_blobs(auth_client):
+    buffer = BytesIO()
+    Image.new("RGBA", (40, 20), (0, 0, 0, 255)).save(buffer, format="PNG")
+    signature = "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    def refcount(digest):
+        conn = db_mod.get_db()
+        try:
+            row = conn.execute("SELECT refcount FROM blobs WHERE sha256 = ?", (digest,)).fetchone()
+        finally:
+            conn.close()
+        return row["refcount"] if row else None
+
+    po_ids = []
+    for _ in range(2):
+        payload = {
+            "fields": {"formNo": f"BLOB-{uuid4().hex[:8]}"},
+            "items": [{"item": "Bolt"}],
+            "signatures": {"formCreator": signature, "manager": signature},
+        }
+        po_ids.append(int(auth_client.post("/api/po", json=payload).get_json()["id"]))
+    ref = auth_client.get(f"/api/po/{po_ids[0]}").get_json()["signatures"]["formCreator"]
+    assert ref.startswith("/api/blobs/")
+    digest = ref.rsplit("/", 1)[1]
+    assert refcount(digest) == 2
+
+    response = auth_client.get(ref)
+    assert response.status_code == 200
+    assert response.data == buffer.getvalue()
+    assert response.mimetype == "image/png"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert response.headers["Content-Security-Policy"] == "sandbox"
+    revalidated = auth_client.get(ref, headers={"If-None-Match": response.headers["ETag"]})
+    assert revalidated.status_code == 304
+    assert auth_client.get("/api/blobs/" + "0" * 64).status_code == 404
+
+    assert auth_client.get(f"/api/po/{po_ids[0]}/export").status_code == 200
+
+    trashed_id = auth_client.delete(f"/api/po/{po_ids[0]}").get_json()["trashed_id"]
+    assert refcount(digest) == 2
+    assert auth_client.delete(f"/api/po/trash/{trashed_id}").status_code == 200
+    assert refcount(digest) == 1
+
+
+def test_svg_images_are_not_stored_as_blobs(auth_client):
+    svg = "data:image/svg+xml;base64," + base64.b64encode(
+        b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>'
+    ).decode("ascii")
+    payload = {"fields": {"formNo": f"SVG-{uuid4().hex[:8]}"}, "signatures": {"formCreator": svg}}
+    po_id = int(auth_client.post("/api/po", json=payload).get_json()["id"])
+    assert auth_client.get(f"/api/po/{po_id}").get_json()["signatures"]["formCreator"] == svg
+
+    conn = db_mod.get_db()
+    try:
+        count = conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+    finally:
+        conn.close()
+    assert count == 0
+
+
+def test_saved_po_thumbnail_is_cached_and_revalidated(auth_client):
+    payload = {"fields": {"formNo": f"THUMB-{uuid4().hex[:8]}"}, "items": [{"item": "Bolt"}]}
+    po_id = int(auth_client.post("/api/po", json=payload).get_json()["id"])
+
+    response = auth_client.get(f"/api/po/{po_id}/thumbnail?v=1")
+    assert response.status_code == 200
+    assert response.mimetype == api_mod._thumbnail_service.mimetype
+    assert "immutable" in response.headers["Cache-Control"]
+    with Image.open(BytesIO(response.data)) as image:
+        assert image.width == api_mod._thumbnail_service.width
+        assert image.height > image.width
+    etag = response.headers["ETag"]
+
+    revalidated = auth_client.get(f"/api/po/{po_id}/thumbnail", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["Cache-Control"] == "private, no-cache"
+
+    payload["id"] = po_id
+    payload["items"].append({"item": "Nut"})
+    auth_client.post("/api/po", json=payload)
+    changed = auth_client.get(f"/api/po/{po_id}/thumbnail", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert api_mod._thumbnail_service.stats()["rendered"] >= 2
+
+    assert auth_client.get("/api/po/999999/thumbnail").status_code == 404
+
+
+def test_export_returns_503_when_render_pool_is_full(auth_client, monkeypatch):
+    def busy(*args, **kwargs):
+        raise pdf_pool_mod.PdfRenderBusyError(retry_after=7)
+
+    monkeypatch.setattr(api_mod, "render_pdf_to_path", busy)
+    response = auth_client.post("/api/po/export", json={"fields": {"formNo": "BUSY"}, "items": []})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+
+
+def test_layout_preflight_matches_exported_pages(auth_client):
+    payload = {
+        "fields": {"formNo": "LAYOUT-1"},
+        "items": [{"model": f"M-{index}", "item": "Bolt " * (index % 12 + 1)} for index in range(80)],
+        "reportStyle": {"showSignatures": True, "density": "compact"},
+    }
+    response = auth_client.post("/api/po/layout", json=payload)
+    assert response.status_code == 200
+    layout = response.get_json()
+    assert layout["row_count"] == 80
+    assert sum(len(page["rows"]) for page in layout["pages"]) == 80
+    assert layout["signatures"]["page"] == layout["page_count"]
+    first_row = layout["pages"][0]["rows"][0]
+    assert first_row["top"] - first_row["bottom"] == pytest.approx(first_row["height"], abs=0.02)
+
+    exported = auth_client.post("/api/po/export", json=payload)
+    assert len(PdfReader(BytesIO(exported.data)).pages) == layout["page_count"] > 1
+    assert auth_client.post("/api/po/layout", json={"items": "nope"}).status_code == 400
+
+
+def test_export_job_renders_in_background_and_downloads(auth_client):
+    payload = {"fields": {"formNo": f"JOB-{uuid4().hex[:8]}"}, "items": [{"item": "Bolt"}]}
+    po_id = int(auth_client.post("/api/po", json=payload).get_json()["id"])
+
+    assert auth_client.post("/api/po/999999/export-jobs").status_code == 404
+    created = auth_client.post(f"/api/po/{po_id}/export-jobs")
+    assert created.status_code == 202
+    job = created.get_json()
+    assert created.headers["Location"] == job["status_url"]
+
+    api_mod._export_job_service.shutdown()
+    status = auth_client.get(job["status_url"]).get_json()
+    assert status["status"] == "done"
+    assert status["progress"] == 100
+
+    download = auth_client.get(status["download_url"])
+    assert download.status_code == 200
+    assert download.data.startswith(b"%PDF")
+    assert payload["fields"]["formNo"] in download.headers["Content-Disposition"]
+    assert auth_client.get("/api/export-jobs/missing").status_code == 404
+
+    conn = db_mod._database_manager.lease()
+    conn.execute("UPDATE export_jobs SET expires_at = ?", ("2000-01-01T00:00:00Z",))
+    conn.commit()
+    conn.close()
+    assert api_mod._export_job_service.cleanup_expired() == 1
+    assert auth_client.get(job["status_url"]).status_code == 404
+
+
+def test_export_job_cleanup_runs_on_a_timer(app, tmp_path):
+    service = ExportJobService(
+        po_repository=api_mod._po_repository,
+        artifact_dir=tmp_path / "timer-exports",
+        use_postgres=False,
+        cleanup_interval_seconds=1,
+    )
+
+    def write_echo(job, path, report_progress):
+        path.write_bytes(b"echo")
+        return "echo.txt"
+
+    service.register_handler("echo", write_echo)
+    try:
+        job = service.create_job("echo")
+        service.run(str(job["id"]))
+        _, artifact = service.artifact_path(str(job["id"]))
+        orphan = service.artifact_dir / "crashed.part"
+        orphan.write_bytes(b"partial")
+        old = time.time() - service.ttl_seconds - 60
+        os.utime(orphan, (old, old))
+
+        conn = db_mod._database_manager.lease()
+        conn.execute("UPDATE export_jobs SET expires_at = ?", ("2000-01-01T00:00:00Z",))
+        conn.commit()
+        conn.close()
+        assert service.get_job(str(job["id"])) is None
+
+        deadline = time.monotonic() + 10
+        while (artifact.exists() or orphan.exists()) and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert not artifact.exists()
+        assert not orphan.exists()
+    finally:
+        service.shutdown()
+
+
+def test_cleanup_spares_running_jobs_that_keep_their_heartbeat(app, tmp_path):
+    service = ExportJobService(
+        po_repository=api_mod._po_repository,
+        artifact_dir=tmp_path / "heartbeat-exports",
+        use_postgres=False,
+        cleanup_interval_seconds=0,
+        heartbeat_seconds=1,
+    )
+    release = threading.Event()
+
+    def slow_echo(job, path, report_progress):
+        release.wait(30)
+        path.write_bytes(b"echo")
+        return "echo.txt"
+
+    service.register_handler("echo", slow_echo)
+    try:
+        live = service.create_job("echo")
+        dead = service.create_job("echo")
+        service.start(str(live["id"]))
+        deadline = time.monotonic() + 10
+        while service.get_job(str(live["id"]))["status"] != "running" and time.monotonic() < deadline:
+            time.sleep(0.05)
+        # Both look as if they started long ago; only the live one still beats.
+        conn = db_mod._database_manager.lease()
+        conn.execute(
+            "UPDATE export_jobs SET status = 'running', updated_at = ?",
+            ("2000-01-01T00:00:00Z",),
+        )
+        conn.commit()
+        conn.close()
+        time.sleep(1.5)
+        service.cleanup_expired()
+        assert service.get_job(str(live["id"]))["status"] == "running"
+        assert service.get_job(str(dead["id"]))["status"] == "failed"
+        release.set()
+        deadline = time.monotonic() + 10
+        while service.get_job(str(live["id"]))["status"] != "done" and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert service.artifact_path(str(live["id"]))[1] is not None
+    finally:
+        release.set()
+        service.shutdown()
+
+
+def test_batch_export_streams_zip_and_merges_pdf(auth_client):
+    ids = []
+    for index, company in enumerate(("Acme", "Acme", "Other")):
+        payload = {
+            "fields": {
+                "formNo": f"BATCH-{index}-{uuid4().hex[:6]}",
+                "date": f"2024-01-0{index + 1}",
+                "companyName": company,
+            },
+            "items": [{"item": f"Item {index}"}],
+        }
+        ids.append(int(auth_client.post("/api/po", json=payload).get_json()["id"]))
+
+    response = auth_client.post("/api/po/export/batch", json={"ids": ids + [999999]})
+    assert response.status_code == 200
+    assert response.mimetype == "application/zip"
+    archive = zipfile.ZipFile(BytesIO(response.data))
+    manifest = json.loads(archive.read("manifest.json"))["items"]
+    assert [row["ok"] for row in manifest] == [True, True, True, False]
+    assert len([name for name in archive.namelist() if name.endswith(".pdf")]) == 3
+
+    merged = auth_client.post(
+        "/api/po/export/batch",
+        json={"format": "pdf", "company": "acme", "date_to": "2024-01-31"},
+    )
+    assert merged.status_code == 200
+    assert merged.headers["X-Batch-Exported"] == "2"
+    assert merged.headers["X-Batch-Failed-Ids"] == ""
+    assert len(PdfReader(BytesIO(merged.data)).pages) == 2
+
+    assert auth_client.post("/api/po/export/batch", json={}).status_code == 400
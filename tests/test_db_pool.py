@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from po_app.db import DatabaseManager, PoolTimeoutError, PostgresConnectionPool
+
+
+class _FakePgCursor:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if self._conn.broken:
+            raise RuntimeError("server closed the connection")
+
+    def fetchone(self):
+        return (1,)
+
+
+class _FakePgConnection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return _FakePgCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+def _fake_pool(**kwargs):
+    opened: list[_FakePgConnection] = []
+
+    def connect():
+        conn = _FakePgConnection()
+        opened.append(conn)
+        return conn
+
+    return PostgresConnectionPool(connect, **kwargs), opened
+
+
+def test_postgres_pool_reuses_released_connections():
+    pool, opened = _fake_pool(min_size=0, max_size=2)
+    first = pool.acquire()
+    raw = first.raw
+    first.close()
+    second = pool.acquire()
+    assert second.raw is raw
+    second.close()
+    stats = pool.stats()
+    assert stats["created"] == 1
+    assert stats["acquired"] == 2
+    assert stats["idle"] == 1
+    assert len(opened) == 1
+
+
+def test_postgres_pool_times_out_when_exhausted():
+    pool, _ = _fake_pool(min_size=0, max_size=1, timeout_seconds=1)
+    lease = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    lease.close()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_postgres_pool_replaces_unhealthy_and_expired_connections():
+    pool, opened = _fake_pool(min_size=0, max_size=2, health_check_seconds=1)
+    lease = pool.acquire()
+    lease.raw.broken = True
+    lease.close()
+    pool._idle[-1].last_used -= 5
+    replacement = pool.acquire()
+    assert replacement.raw is not opened[0]
+    assert opened[0].closed
+    replacement.close()
+    assert pool.stats()["health_check_failures"] == 1
+
+    pool._max_lifetime = 1
+    pool._idle[-1].created_at -= 5
+    recycled = pool.acquire()
+    assert recycled.raw is opened[2]
+    recycled.close()
+    assert pool.stats()["recycled"] == 1
+
+
+def test_sqlite_pool_reuses_connection_per_thread(tmp_path):
+    manager = DatabaseManager(
+        db_url="",
+        db_path=tmp_path / "pool.db",
+        use_postgres=False,
+        pool_enabled=True,
+    )
+    first = manager.lease()
+    raw = first.raw
+    nested = manager.lease()
+    assert nested.raw is not raw
+    nested.close()
+    first.close()
+
+    again = manager.lease()
+    assert again.raw is raw
+    again.close()
+
+    seen: list[object] = []
+
+    def worker():
+        lease = manager.lease()
+        seen.append(lease.raw)
+        lease.close()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert seen and seen[0] is not raw
+
+    manager.db_path = tmp_path / "other.db"
+    moved = manager.lease()
+    assert moved.raw is not raw
+    moved.close()
+
+
+def test_sqlite_performance_profile_is_applied_on_connect(tmp_path):
+    manager = DatabaseManager(
+        db_url="",
+        db_path=tmp_path / "tuned.db",
+        use_postgres=False,
+        sqlite_profile="performance",
+        sqlite_busy_timeout_ms=2500,
+    )
+    report = manager.sqlite_pragma_report()
+    effective = {row["pragma"]: row["effective"] for row in report["pragmas"]}
+    assert str(effective["journal_mode"]).lower() == "wal"
+    assert effective["busy_timeout"] == 2500
+    assert effective["synchronous"] == "NORMAL"
+    assert effective["temp_store"] == "MEMORY"
+    assert effective["foreign_keys"] == "ON"
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import base64
+import json
+import sqlite3
+
+import pytest
+
+from po_app.db import DatabaseManager
+from po_app.migrations import MIGRATIONS, SCHEMA_VERSION, Migration, MigrationRunner
+
+
+def _manager(tmp_path):
+    return DatabaseManager(db_url="", db_path=tmp_path / "migrate.db", use_postgres=False)
+
+
+def test_migrations_apply_once_and_skip_when_current(tmp_path):
+    manager = _manager(tmp_path)
+    applied = manager.init_db()
+    assert applied == list(range(1, SCHEMA_VERSION + 1))
+    assert manager.init_db() == []
+    assert manager.schema_status() == {"version": SCHEMA_VERSION, "latest": SCHEMA_VERSION}
+
+
+def test_baseline_adopts_existing_unversioned_database(tmp_path):
+    conn = sqlite3.connect(tmp_path / "migrate.db")
+    conn.execute(
+        """
+        CREATE TABLE passkey_credentials (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            user_handle TEXT NOT NULL,
+            credential_id TEXT NOT NULL UNIQUE,
+            public_key TEXT NOT NULL,
+            sign_count INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO passkey_credentials
+        (username, user_handle, credential_id, public_key, created_at, updated_at)
+        VALUES ('admin', 'h', 'cred-1', 'pk', '2026-01-01T00:00:00Z', '2026-01-01T00:00:00Z')
+        """
+    )
+    conn.commit()
+    conn.close()
+
+    manager = _manager(tmp_path)
+    assert manager.init_db()[0] == 1
+    check = manager.connect()
+    try:
+        row = check.execute(
+            "SELECT is_approval_device FROM passkey_credentials WHERE credential_id = 'cred-1'"
+        ).fetchone()
+    finally:
+        check.close()
+    assert row[0] == 1
+
+
+def test_failed_migration_rolls_back_and_is_retried(tmp_path):
+    manager = _manager(tmp_path)
+    manager.init_db()
+
+    def broken(conn):
+        conn.execute("CREATE TABLE migration_probe (id INTEGER)")
+        raise RuntimeError("boom")
+
+    extra = Migration(SCHEMA_VERSION + 1, "probe", sqlite=(broken,))
+    runner = MigrationRunner(
+        connect=manager.connect,
+        use_postgres=False,
+        migrations=(*MIGRATIONS, extra),
+    )
+    with pytest.raises(RuntimeError):
+        runner.migrate()
+    assert runner.current_version() == SCHEMA_VERSION
+    check = manager.connect()
+    try:
+        tables = {
+            row[0]
+            for row in check.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+    finally:
+        check.close()
+    assert "migration_probe" not in tables
+
+
+def test_listing_sort_keys_are_backfilled(tmp_path):
+    manager = _manager(tmp_path)
+    MigrationRunner(connect=manager.connect, use_postgres=False, migrations=MIGRATIONS[:1]).migrate()
+    conn = manager.connect()
+    try:
+        conn.execute(
+            """
+            INSERT INTO purchase_orders (created_at, updated_at, payload)
+            VALUES ('2026-01-01T00:00:00Z', '2026-01-02T03:04:05.000006Z', '{}')
+            """
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    manager.init_db()
+    conn = manager.connect()
+    try:
+        row = conn.execute("SELECT updated_ts FROM purchase_orders").fetchone()
+        plan = " ".join(
+            str(part)
+            for part in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM purchase_orders "
+                "ORDER BY updated_ts DESC, id DESC LIMIT 10"
+            ).fetchone()
+        )
+    finally:
+        conn.close()
+    assert row[0] == 1767323045000006
+    assert "idx_purchase_orders_updated_ts_id" in plan
+
+
+def test_inline_images_are_moved_into_blobs(tmp_path):
+    manager = _manager(tmp_path)
+    MigrationRunner(connect=manager.connect, use_postgres=False, migrations=MIGRATIONS[:6]).migrate()
+    image = "data:image/png;base64," + base64.b64encode(b"\x89PNG-signature").decode("ascii")
+    svg = "data:image/svg+xml;base64," + base64.b64encode(b"<svg/>").decode("ascii")
+    live = {"fields": {}, "signatures": {"formCreator": image, "manager": image}, "reportStyle": {}}
+    trashed = {"fields": {}, "signatures": {"manager": svg}, "reportStyle": {"logoDataUrl": image}}
+    conn = manager.connect()
+    try:
+        conn.execute(
+            "INSERT INTO purchase_orders (created_at, updated_at, payload) VALUES ('t', 't', ?)",
+            (json.dumps(live),),
+        )
+        conn.execute(
+            "INSERT INTO deleted_purchase_orders (deleted_at, payload) VALUES ('t', ?)",
+            (json.dumps(trashed),),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert manager.init_db() == [7]
+    conn = manager.connect()
+    try:
+        live_row = json.loads(conn.execute("SELECT payload FROM purchase_orders").fetchone()[0])
+        trash_row = json.loads(conn.execute("SELECT payload FROM deleted_purchase_orders").fetchone()[0])
+        blobs = conn.execute("SELECT sha256, mime, refcount FROM blobs").fetchall()
+    finally:
+        conn.close()
+    assert len(blobs) == 1
+    ref = "/api/blobs/" + blobs[0][0]
+    assert live_row["signatures"] == {"formCreator": ref, "manager": ref}
+    assert trash_row["reportStyle"]["logoDataUrl"] == ref
+    assert trash_row["signatures"]["manager"] == svg
+    assert (blobs[0][1], blobs[0][2]) == ("image/png", 2)
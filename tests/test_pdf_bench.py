@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import json
+
+from benchmarks.pdf_bench import build_cases, compare_results, main
+
+
+def test_cases_cover_sizes_and_every_style_combination():
+    names = set(build_cases())
+    assert {"empty", "items_10", "items_500", "items_10k", "long_text", "large_images"} <= names
+    assert sum(name.startswith("style_") for name in names) == 6
+
+
+def test_compare_flags_only_metrics_past_their_ratio():
+    baseline = {"cases": {"a": {"seconds": 1.0, "peak_bytes": 1000, "output_bytes": 100}}}
+    current = {
+        "cases": {
+            "a": {"seconds": 1.1, "peak_bytes": 2000, "output_bytes": 100},
+            "new": {"seconds": 9.0, "peak_bytes": 1, "output_bytes": 1},
+        }
+    }
+    regressions = compare_results(baseline, current, {"time": 1.2})
+    assert [(item["case"], item["metric"]) for item in regressions] == [("a", "memory")]
+    assert compare_results(baseline, current, {"memory": 3.0}) == []
+
+
+def test_run_writes_results_and_fails_on_regression(tmp_path):
+    output = tmp_path / "bench.json"
+    assert main(["--cases", "empty", "--repeat", "1", "--output", str(output)]) == 0
+    results = json.loads(output.read_text(encoding="utf-8"))
+    assert results["cases"]["empty"]["output_bytes"] > 0
+
+    results["cases"]["empty"]["output_bytes"] = 1
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(results), encoding="utf-8")
+    assert main(["--cases", "empty", "--repeat", "1", "--baseline", str(baseline)]) == 1
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import base64
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+from reportlab.pdfgen import canvas
+
+from po_app.services import pdf as pdf_mod
+from po_app.services.pdf import (
+    ImageCache,
+    PdfCache,
+    normalize_image,
+    open_pdf_export,
+    pdf_cache_key,
+)
+
+
+def _png_bytes(size: tuple[int, int], color: str = "red") -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_cache_key_tracks_content_and_style():
+    fields = {"formNo": "A-1"}
+    items = [{"item": "Bolt", "qty": "2"}]
+    base = pdf_cache_key(fields, items, {}, {"density": "normal"})
+    assert base == pdf_cache_key(dict(fields), list(items), None, {"density": "normal"})
+    assert base != pdf_cache_key(fields, items, {}, {"density": "compact"})
+    assert base != pdf_cache_key(fields, [{"item": "Bolt", "qty": "3"}], {}, {"density": "normal"})
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = PdfCache(tmp_path, max_bytes=350)
+    for index, key in enumerate(("aa01", "bb02", "cc03")):
+        cache.put(key, b"x" * 100)
+        path = tmp_path / key[:2] / f"{key}.pdf"
+        os.utime(path, (1000 + index, 1000 + index))
+    assert cache.get("aa01") == b"x" * 100
+
+    cache.put("dd04", b"y" * 100)
+
+    assert cache.get("bb02") is None
+    assert cache.get("aa01") is not None
+    assert cache.get("cc03") is not None
+    assert cache.get("dd04") is not None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["approx_bytes"] == 300
+
+
+def test_rendered_po_is_invalidated_by_id(tmp_path):
+    cache = PdfCache(tmp_path, max_bytes=1024 * 1024)
+    calls = []
+
+    def render(fields, items, signatures, report_style):
+        calls.append(fields)
+        return b"%PDF-fake"
+
+    for _ in range(2):
+        assert cache.get_or_render({"formNo": "A"}, [], po_id=7, render=render) == b"%PDF-fake"
+    assert len(calls) == 1
+    assert cache.invalidate_po(7) is True
+    assert cache.invalidate_po(7) is False
+    cache.get_or_render({"formNo": "A"}, [], po_id=7, render=render)
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_file_renders_go_straight_into_the_cache(tmp_path):
+    cache = PdfCache(tmp_path / "cache", max_bytes=1024 * 1024)
+    calls = []
+
+    def render_to_path(path, fields, items, signatures, report_style):
+        calls.append(fields)
+        Path(path).write_bytes(b"%PDF-" + fields["formNo"].encode())
+
+    first, first_handle = cache.get_or_render_file(
+        {"formNo": "A"}, [], po_id=3, render_to_path=render_to_path
+    )
+    second, second_handle = cache.get_or_render_file(
+        {"formNo": "A"}, [], po_id=3, render_to_path=render_to_path
+    )
+    first_handle.close()
+    assert first == second and first.read_bytes() == b"%PDF-A"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    # A concurrent save invalidating the entry must not break a send in progress.
+    assert cache.invalidate_po(3) is True
+    assert not second.exists()
+    with second_handle:
+        assert second_handle.read() == b"%PDF-A"
+
+    small = PdfCache(tmp_path / "small", max_bytes=3)
+    assert small.get_or_render_file({"formNo": "B"}, [], render_to_path=render_to_path) is None
+    assert small.stats()["oversize"] == 1
+    assert not list((tmp_path / "small").rglob("*.pdf"))
+
+
+def test_export_without_cache_spools_the_render(monkeypatch):
+    monkeypatch.setattr(pdf_mod, "_pdf_cache", PdfCache(Path("unused"), max_bytes=0, enabled=False))
+    export = open_pdf_export({"formNo": "SPOOL"}, [{"item": "Bolt"}])
+    assert export.path is None
+    with export.open() as stream:
+        assert stream.read(5) == b"%PDF-"
+
+
+def _same_image(first, second) -> bool:
+    """Two lookups give separate readers over the same pixels."""
+    return first is not second and first.getRGBData() == second.getRGBData()
+
+
+def test_image_cache_reuses_files_until_they_change(tmp_path):
+    cache = ImageCache(max_bytes=1024 * 1024)
+    logo = tmp_path / "logo.png"
+    logo.write_bytes(_png_bytes((10, 10)))
+
+    first = cache.from_path(logo)
+    assert _same_image(cache.from_path(logo), first)
+    assert cache.from_path(tmp_path / "missing.png") is None
+
+    logo.write_bytes(_png_bytes((20, 10), "blue"))
+    os.utime(logo, ns=(1, 1))
+    reloaded = cache.from_path(logo)
+    assert not _same_image(reloaded, first)
+    assert reloaded.getSize() == (20, 10)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_image_cache_keys_data_urls_by_digest_and_evicts(tmp_path):
+    cache = ImageCache(max_bytes=1000)
+    urls = [
+        "data:image/png;base64," + base64.b64encode(_png_bytes((10, 10), color)).decode("ascii")
+        for color in ("red", "green", "blue")
+    ]
+    first = cache.from_data_url(urls[0])
+    assert _same_image(cache.from_data_url(urls[0]), first)
+    assert cache.from_data_url("not-a-data-url") is None
+
+    cache.from_data_url(urls[1])
+    cache.from_data_url(urls[2])
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert _same_image(cache.from_data_url(urls[0]), first)
+    assert cache.stats()["misses"] == stats["misses"] + 1
+
+
+def test_normalize_image_shrinks_flattens_and_picks_encoding():
+    signature = Image.new("RGBA", (1200, 400), (0, 0, 0, 0))
+    signature.paste((43, 43, 43, 255), (100, 190, 1100, 210))
+    line_art = normalize_image(signature, (300, 300), background=(255, 255, 255))
+    assert line_art.getSize() == (300, 100)
+    assert len(line_art.getRGBData()) == 300 * 100  # one grayscale byte per pixel
+    assert line_art.jpeg_fh() is None
+
+    photo = Image.merge("RGB", [Image.effect_noise((800, 600), 64) for _ in range(3)])
+    jpeg = normalize_image(photo, (400, 400))
+    assert jpeg.getSize() == (400, 300)
+    assert jpeg.jpeg_fh() is not None
+
+    assert normalize_image(photo, (800, 600)) is None
+    # Transparency alone is only worth re-encoding when it can be flattened.
+    assert normalize_image(signature, (1200, 400)) is None
+    flattened = normalize_image(signature, (1200, 400), background=(255, 255, 255))
+    assert flattened.getSize() == (1200, 400)
+
+
+def test_image_cache_fits_images_to_the_draw_box(tmp_path):
+    logo = tmp_path / "logo.png"
+    logo.write_bytes(_png_bytes((2000, 1000)))
+
+    cache = ImageCache(max_bytes=64 * 1024 * 1024, dpi=144)
+    fitted = cache.from_path(logo, fit=(100, 100))
+    assert fitted.getSize() == (200, 100)
+    hits = cache.stats()["hits"]
+    assert _same_image(cache.from_path(logo, fit=(100, 100)), fitted)
+    assert cache.stats()["hits"] == hits + 1
+    assert cache.from_path(logo, fit=(50, 50)).getSize() == (100, 50)
+    assert cache.from_path(logo).getSize() == (2000, 1000)
+    assert cache.from_data_url("not-a-data-url", fit=(100, 100)) is None
+
+    unscaled = ImageCache(max_bytes=64 * 1024 * 1024, dpi=0)
+    assert unscaled.from_path(logo, fit=(100, 100)).getSize() == (2000, 1000)
+
+
+def test_cached_jpeg_can_be_drawn_from_many_threads():
+    photo = Image.merge("RGB", [Image.effect_noise((400, 300), 64) for _ in range(3)])
+    buffer = BytesIO()
+    photo.save(buffer, format="JPEG")
+    url = "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+    cache = ImageCache(max_bytes=64 * 1024 * 1024, dpi=72)
+    fits = [None, (200, 150)]
+
+    def draw(index: int) -> None:
+        if index % 10 == 0:
+            cache.clear()  # Races were most likely on a reader's first draw.
+        pdf_canvas = canvas.Canvas(BytesIO())
+        reader = cache.from_data_url(url, fit=fits[index % 2])
+        pdf_canvas.drawImage(reader, 0, 0, width=200, height=150)
+        pdf_canvas.save()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(draw, range(160)))
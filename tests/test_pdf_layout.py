@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from io import BytesIO
+
+from pypdf import PdfReader
+
+from po_app.services.pdf import build_pdf
+from po_app.services.pdf_layout import TableRow, paginate_table
+
+
+def _rows(*heights: float) -> list[TableRow]:
+    return [
+        TableRow(row={"item": str(index)}, lines=[str(index)], height=height)
+        for index, height in enumerate(heights)
+    ]
+
+
+def _paginate(rows, first=100, plain=150, last_first=100, last_plain=150):
+    return paginate_table(
+        rows,
+        first_capacity=first,
+        plain_capacity=plain,
+        last_first_capacity=last_first,
+        last_plain_capacity=last_plain,
+    )
+
+
+def test_empty_table_has_one_empty_page():
+    layout = _paginate([])
+    assert layout.page_count == 1
+    assert list(layout.page_range(0)) == []
+    assert layout.page_height(0) == 0
+
+
+def test_rows_fill_pages_and_offsets_are_cumulative():
+    layout = _paginate(_rows(*([30] * 10)))
+    assert layout.breaks == [0, 3, 8, 10]
+    assert layout.offsets[4] == 120
+    assert layout.row_top(4, 1) == 30
+    assert layout.page_height(1) == 150
+    # A row taller than a page still gets placed.
+    assert _paginate(_rows(40, 500, 40)).breaks == [0, 1, 2, 3]
+
+
+def test_last_page_rows_move_to_make_room_for_signatures():
+    layout = _paginate(_rows(*([30] * 3)), last_first=50)
+    assert layout.breaks == [0, 1, 3]
+    assert layout.page_count == 2
+
+
+def test_large_tables_paginate_every_row_once():
+    layout = _paginate(_rows(*([24] * 10_000)), first=500, plain=700, last_plain=600)
+    covered = [index for page in range(layout.page_count) for index in layout.page_range(page)]
+    assert covered == list(range(10_000))
+    assert layout.offsets[-1] == 240_000
+
+
+def test_repeated_page_chrome_is_shared_as_forms():
+    def xobjects(pdf_bytes: bytes) -> list[set[str]]:
+        pages = PdfReader(BytesIO(pdf_bytes)).pages
+        return [set(page["/Resources"].get("/XObject", {})) for page in pages]
+
+    items = [{"item": f"Bolt {index}"} for index in range(120)]
+    pages = xobjects(build_pdf({"formNo": "F-1"}, items, {}, {"showLogo": False}))
+    assert len(pages) > 1
+    assert all({"/FormXob.bg", "/FormXob.th"} <= names for names in pages)
+    # A single page has nothing to share and draws its chrome inline.
+    assert xobjects(build_pdf({"formNo": "F-1"}, items[:3], {}, {"showLogo": False})) == [set()]
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from po_app.services.pdf_pool import PdfRenderBusyError, PdfRenderPool, PdfRenderTimeoutError
+
+
+def test_pool_renders_in_worker_and_recycles():
+    pool = PdfRenderPool(enabled=True, workers=1, max_queue=0, recycle_after=1)
+    try:
+        pool.warm()
+        first = pool.render({"formNo": "POOL-1"}, [{"item": "Bolt"}])
+        second = pool.render({"formNo": "POOL-2"}, [])
+        assert first.startswith(b"%PDF")
+        assert second.startswith(b"%PDF")
+        stats = pool.stats()
+        assert stats["completed"] == 2
+        assert stats["recycled"] == 1
+        assert stats["in_flight"] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_pool_rejects_jobs_beyond_queue_depth():
+    pool = PdfRenderPool(enabled=True, workers=1, max_queue=0)
+    pool._in_flight = 1
+    with pytest.raises(PdfRenderBusyError) as excinfo:
+        pool.render({}, [])
+    assert excinfo.value.retry_after >= 1
+    assert pool.stats()["rejected"] == 1
+
+
+def _ignore_alarm_and_sleep(seconds):
+    # Stands in for a render stuck in C code, where the worker's alarm cannot land.
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(seconds)
+
+
+def _worker_pid():
+    return os.getpid()
+
+
+def test_timeout_counts_from_job_start_and_spares_the_worker():
+    pool = PdfRenderPool(enabled=True, workers=1, max_queue=1, job_timeout_seconds=2)
+    try:
+        pool.warm()
+        pid = pool._run(_worker_pid)
+        with ThreadPoolExecutor(max_workers=2) as threads:
+            # The second job waits ~1.5 s in the queue; only its run time counts.
+            queued = [threads.submit(pool._run, time.sleep, 1.5) for _ in range(2)]
+            for future in queued:
+                future.result()
+        with pytest.raises(PdfRenderTimeoutError):
+            pool._run(time.sleep, 30)
+        assert pool._run(_worker_pid) == pid
+        stats = pool.stats()
+        assert (stats["in_flight"], stats["timeouts"], stats["failed"]) == (0, 1, 0)
+    finally:
+        pool.shutdown()
+
+
+def test_worker_that_ignores_its_alarm_is_killed():
+    pool = PdfRenderPool(
+        enabled=True,
+        workers=1,
+        max_queue=0,
+        job_timeout_seconds=1,
+        kill_grace_seconds=1,
+    )
+    try:
+        pid = pool._run(_worker_pid)
+        with pytest.raises(PdfRenderTimeoutError):
+            pool._run(_ignore_alarm_and_sleep, 30)
+        stats = pool.stats()
+        assert (stats["in_flight"], stats["timeouts"], stats["running"]) == (0, 1, False)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                os.kill(pid, 0)
+            except OSError:
+                break
+            time.sleep(0.1)
+        else:
+            pytest.fail("hung worker was not killed")
+        assert pool.render({"formNo": "POOL-3"}, []).startswith(b"%PDF")
+        assert pool.stats()["in_flight"] == 0
+    finally:
+        pool.shutdown()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import os
+from io import BytesIO
+
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from po_app.services import pdf as pdf_mod
+from po_app.services.pdf_template import PdfTemplate
+
+
+def _template(path, *labels: str) -> None:
+    pdf_canvas = canvas.Canvas(str(path), pagesize=A4)
+    for label in labels:
+        pdf_canvas.drawString(40, 800, label)
+        pdf_canvas.showPage()
+    pdf_canvas.save()
+
+
+def _page_texts(pdf_bytes: bytes) -> list[str]:
+    return [page.extract_text() for page in PdfReader(BytesIO(pdf_bytes)).pages]
+
+
+def test_template_is_parsed_once_and_reloaded_when_it_changes(tmp_path):
+    path = tmp_path / "PO.pdf"
+    template = PdfTemplate(path)
+    assert template.pages() == []
+
+    _template(path, "LETTERHEAD")
+    first = template.pages()
+    assert len(first) == 1
+    assert template.pages() is first
+
+    _template(path, "LETTERHEAD", "CONTINUATION")
+    os.utime(path, ns=(1, 1))
+    assert len(template.pages()) == 2
+    assert template.stats()["loads"] == 2
+
+
+def test_overlay_mode_merges_content_onto_template_pages(tmp_path, monkeypatch):
+    path = tmp_path / "PO.pdf"
+    _template(path, "LETTERHEAD", "CONTINUATION")
+    monkeypatch.setattr(pdf_mod, "PDF_TEMPLATE_MODE", "overlay")
+    monkeypatch.setattr(pdf_mod, "_pdf_template", PdfTemplate(path))
+
+    items = [{"item": f"Bolt {index}"} for index in range(80)]
+    texts = _page_texts(pdf_mod.build_pdf({"formNo": "TPL-1"}, items, {}, {}))
+    assert len(texts) > 1
+    assert "LETTERHEAD" in texts[0] and "TPL-1" in texts[0]
+    assert "PURCHASING ORDER" not in texts[0]
+    assert all("CONTINUATION" in text for text in texts[1:])
+
+    key = pdf_mod.pdf_cache_key({"formNo": "TPL-1"}, items, {}, {})
+    _template(path, "NEW LETTERHEAD")
+    os.utime(path, ns=(1, 1))
+    assert pdf_mod.pdf_cache_key({"formNo": "TPL-1"}, items, {}, {}) != key
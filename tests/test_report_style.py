@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+from reportlab.lib import colors
+
+from po_app.services.pdf import build_pdf, layout_pdf
+from po_app.services.report_style import ReportStyleResolver, ResolvedReportStyle
+
+
+def test_equal_styles_resolve_to_one_immutable_object():
+    resolver = ReportStyleResolver(max_entries=2)
+    first = resolver.resolve({"density": "compact", "tableTheme": "solid"})
+    second = resolver.resolve({"tableTheme": "solid", "density": "compact"})
+    assert first is second
+    assert resolver.resolve(first) is first
+    assert {first: 1}[second] == 1
+    with pytest.raises(AttributeError):
+        first.density = "normal"
+
+    resolver.resolve({"density": "normal"})
+    resolver.resolve({"density": "comfortable"})
+    stats = resolver.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 3, 1)
+
+
+def test_invalid_values_fall_back_to_defaults():
+    style = ReportStyleResolver(max_entries=0).resolve(
+        {
+            "density": "huge",
+            "fontScale": "big",
+            "logoScale": 999,
+            "paperColor": "#zzzzzz",
+            "tableTheme": "solid",
+            "tableRowOdd": "#eeeeee",
+            "showRowNumber": "off",
+        }
+    )
+    assert (style.density, style.font_scale, style.logo_scale) == ("normal", 100, 180)
+    assert style.paper_color == colors.HexColor("#FFFFFF")
+    assert style.table_row_even == style.table_row_odd == colors.HexColor("#EEEEEE")
+    assert [column.key for column in style.columns] == ["model", "item", "qty", "unit", "plan"]
+    assert len(style.col_x) == len(style.columns) + 1
+
+
+def test_renderer_accepts_a_resolved_style():
+    raw = {"density": "compact", "showSignatures": True}
+    resolved = ReportStyleResolver(max_entries=1).resolve(raw)
+    assert isinstance(resolved, ResolvedReportStyle)
+    items = [{"item": f"Bolt {index}"} for index in range(70)]
+    assert layout_pdf({}, items, resolved).to_dict() == layout_pdf({}, items, raw).to_dict()
+    assert build_pdf({"formNo": "RS-1"}, items, {}, resolved).startswith(b"%PDF-")
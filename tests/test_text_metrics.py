@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from po_app.services.text_metrics import fit_text, text_width, wrap_text
+
+
+def test_width_matches_reportlab():
+    for font in ("Helvetica", "Helvetica-Bold"):
+        for text in ("", "W", "Steel bolt M12 x 40", "Café — naïve"):
+            assert text_width(text, font, 9.35) == stringWidth(text, font, 9.35)
+
+
+def test_fit_text_keeps_longest_prefix_that_fits():
+    text = "Hex head bolt, zinc plated, M12 x 40"
+    fitted = fit_text(text, 60, "Helvetica", 9)
+    assert fitted.endswith("...")
+    assert stringWidth(fitted, "Helvetica", 9) <= 60
+    longer = text[: len(fitted) - 2] + "..."
+    assert stringWidth(longer, "Helvetica", 9) > 60
+    assert fit_text(text, 1000, "Helvetica", 9) == text
+    assert fit_text(text, 5, "Helvetica", 9) == ""
+
+
+def test_wrap_text_breaks_on_words_and_splits_long_words():
+    lines = wrap_text("alpha beta gamma " + "x" * 80, 60, "Helvetica", 9)
+    assert lines[0] == "alpha beta"
+    assert all(stringWidth(line, "Helvetica", 9) <= 60 for line in lines)
+    assert "".join(lines[2:]) == "x" * 80
+    assert wrap_text("   ", 60, "Helvetica", 9) == [""]
+
+
+def test_long_text_is_linear():
+    text = "x" * 50_000
+    fitted = fit_text(text, 200, "Helvetica", 9)
+    assert 0 < len(fitted) < 200
+    assert len(wrap_text(text, 200, "Helvetica", 9)) > 100
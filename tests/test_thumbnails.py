@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from po_app.services import pdf as pdf_mod
+from po_app.services import thumbnails as thumbnails_mod
+from po_app.services.pdf_pool import PdfRenderBusyError
+from po_app.services.thumbnails import ThumbnailService
+
+
+class _Repository:
+    def __init__(self, payloads: dict[int, dict]):
+        self.payloads = payloads
+
+    def get_po(self, po_id: int) -> dict | None:
+        return self.payloads.get(po_id)
+
+
+def _service(tmp_path, payloads: dict[int, dict]) -> ThumbnailService:
+    return ThumbnailService(
+        po_repository=_Repository(payloads),
+        cache_dir=tmp_path / "thumbs",
+        max_bytes=4 * 1024 * 1024,
+        width=120,
+        warm_interval_seconds=0,
+    )
+
+
+def test_warm_renders_only_missing_thumbnails(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_mod, "_pdf_cache", pdf_mod.PdfCache(tmp_path / "pdf", max_bytes=4 * 1024 * 1024))
+    payloads = {po_id: {"fields": {"formNo": f"W-{po_id}"}, "items": []} for po_id in (1, 2)}
+    service = _service(tmp_path, payloads)
+
+    assert service.warm([1, 2, 3]) == 2
+    assert service.warm([1, 2]) == 0
+    assert service.stats()["rendered"] == 2
+    assert service.store.has(service.thumbnail_key(payloads[1]))
+
+    assert service.invalidate(1)
+    assert not service.store.has(service.thumbnail_key(payloads[1]))
+
+
+def test_warm_backs_off_when_the_render_pool_is_busy(tmp_path, monkeypatch):
+    def busy(*args, **kwargs):
+        raise PdfRenderBusyError(retry_after=1)
+
+    monkeypatch.setattr(thumbnails_mod, "render_pdf_to_path", busy)
+    payloads = {po_id: {"fields": {"formNo": f"B-{po_id}"}, "items": []} for po_id in (1, 2)}
+    service = _service(tmp_path, payloads)
+
+    assert service.warm([1, 2]) == 0
+    assert service.stats()["warm_errors"] == 0